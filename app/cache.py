@@ -0,0 +1,392 @@
+"""Cache applicatif partageable entre réplicas.
+
+Deux stockages derrière la même interface, choisis par `CACHE_URL` :
+
+- `memory://` : LRU en mémoire du processus (défaut, une seule instance) ;
+- `redis://hôte:port/base` : tout serveur parlant le protocole Redis (RESP),
+  partagé par tous les pods. `scripts/cache_server.py` en fournit une
+  implémentation minimale pour le développement local.
+
+Les clés sont versionnées : `préfixe:CACHE_KEY_VERSION:espace:génération:clé`.
+Changer le format d'une valeur impose d'incrémenter `CACHE_KEY_VERSION` ;
+`Cache.invalidate(espace)` incrémente la génération de l'espace de noms, ce qui
+rend toutes ses anciennes clés inaccessibles (elles expirent ensuite d'elles-mêmes),
+et diffuse la nouvelle génération aux autres réplicas par pub/sub.
+
+Le cache ne doit jamais faire tomber une requête : toute erreur réseau est
+journalisée et traitée comme une absence de valeur.
+"""
+
+from __future__ import annotations
+
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+
+import orjson
+
+from .config import get_settings
+from .metrics import CACHE_ERRORS, CACHE_REQUESTS
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# À incrémenter quand le format d'une valeur en cache change
+CACHE_KEY_VERSION = 1
+
+T = TypeVar("T")
+
+
+class CacheError(RuntimeError):
+    """Erreur de communication avec le serveur de cache."""
+
+
+class MemoryBackend:
+    """LRU en mémoire du processus, avec durée de vie par entrée."""
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._listeners: List[Callable[[str, bytes], None]] = []
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] and entry[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else 0.0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        """Incrémente un compteur ; `ttl` fixe son expiration à sa création."""
+        with self._lock:
+            expires_at, current = self._data.get(key, (0.0, b"0"))
+            if expires_at and expires_at < time.monotonic():
+                expires_at, current = 0.0, b"0"
+            value = int(current) + 1
+            if value == 1 and ttl:
+                expires_at = time.monotonic() + ttl
+            self._data[key] = (expires_at, str(value).encode())
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+            return value
+
+    def publish(self, channel: str, message: bytes) -> None:
+        for listener in list(self._listeners):
+            listener(channel, message)
+
+    def subscribe(self, channel: str, callback: Callable[[str, bytes], None]) -> None:
+        # Un seul processus : la diffusion se limite aux instances de `Cache` locales
+        def listener(message_channel: str, message: bytes) -> None:
+            if message_channel == channel:
+                callback(message_channel, message)
+
+        self._listeners.append(listener)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+def _encode_command(*args: Any) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+class _Connection:
+    """Connexion RESP synchrone (une commande à la fois)."""
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def send(self, *args: Any) -> None:
+        self.sock.sendall(_encode_command(*args))
+
+    def read_reply(self) -> Any:
+        line = self.reader.readline()
+        if not line:
+            raise CacheError("Connexion au serveur de cache fermée")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise CacheError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [self.read_reply() for _ in range(length)]
+        raise CacheError(f"Réponse RESP inattendue : {line!r}")
+
+    def execute(self, *args: Any) -> Any:
+        self.send(*args)
+        return self.read_reply()
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisBackend:
+    """Client minimal du protocole Redis, avec un petit pool de connexions."""
+
+    def __init__(self, url: str, timeout: float = 0.5, pool_size: int = 8) -> None:
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._pool: List[_Connection] = []
+        self._pool_size = pool_size
+        self._lock = threading.Lock()
+
+    def _connect(self, timeout: Optional[float]) -> _Connection:
+        conn = _Connection(self.host, self.port, timeout)
+        if self.password:
+            conn.execute("AUTH", self.password)
+        if self.db:
+            conn.execute("SELECT", self.db)
+        return conn
+
+    def _execute(self, *args: Any) -> Any:
+        with self._lock:
+            conn = self._pool.pop() if self._pool else None
+        try:
+            if conn is None:
+                conn = self._connect(self.timeout)
+            reply = conn.execute(*args)
+        except (OSError, CacheError):
+            if conn is not None:
+                conn.close()
+            raise
+        with self._lock:
+            if len(self._pool) < self._pool_size:
+                self._pool.append(conn)
+                conn = None
+        if conn is not None:
+            conn.close()
+        return reply
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._execute("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if ttl:
+            self._execute("SET", key, value, "PX", int(ttl * 1000))
+        else:
+            self._execute("SET", key, value)
+
+    def delete(self, key: str) -> None:
+        self._execute("DEL", key)
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        value = self._execute("INCR", key)
+        if value == 1 and ttl:
+            self._execute("PEXPIRE", key, int(ttl * 1000))
+        return value
+
+    def publish(self, channel: str, message: bytes) -> None:
+        self._execute("PUBLISH", channel, message)
+
+    def subscribe(self, channel: str, callback: Callable[[str, bytes], None]) -> None:
+        """Écoute `channel` dans un thread dédié, avec reconnexion automatique."""
+
+        def listen() -> None:
+            while True:
+                try:
+                    # Pas de délai de lecture : la connexion attend les messages
+                    conn = self._connect(None)
+                    conn.send("SUBSCRIBE", channel)
+                    conn.read_reply()
+                    callback(channel, b"")  # (re)connexion : l'état local est à relire
+                    while True:
+                        reply = conn.read_reply()
+                        if isinstance(reply, list) and reply[:1] == [b"message"]:
+                            callback(reply[1].decode(), reply[2])
+                except (OSError, CacheError) as exc:
+                    logger.warning("Abonnement au cache interrompu (%s), nouvelle tentative", exc)
+                    time.sleep(1.0)
+
+        threading.Thread(target=listen, name="cache-invalidation", daemon=True).start()
+
+    def clear(self) -> None:
+        self._execute("FLUSHDB")
+
+
+class CacheStats:
+    """Compteurs de succès et d'échecs de lecture, par espace de noms."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, namespace: str, hit: bool) -> None:
+        CACHE_REQUESTS.labels(namespace, "hit" if hit else "miss").inc()
+        counters = self.hits if hit else self.misses
+        with self._lock:
+            counters[namespace] = counters.get(namespace, 0) + 1
+
+    def error(self) -> None:
+        CACHE_ERRORS.inc()
+        with self._lock:
+            self.errors += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+                "errors": self.errors,
+            }
+
+
+class Cache:
+    """Cache à espaces de noms versionnés, valeurs sérialisées en JSON."""
+
+    channel_suffix = "invalidate"
+
+    def __init__(self, backend, prefix: str = "lvn", default_ttl: float = 300.0) -> None:
+        self.backend = backend
+        self.prefix = f"{prefix}:{CACHE_KEY_VERSION}"
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+        self._generations: Dict[str, int] = {}
+        self._subscribed = False
+        self._lock = threading.Lock()
+
+    @property
+    def channel(self) -> str:
+        return f"{self.prefix}:{self.channel_suffix}"
+
+    def _on_invalidation(self, channel: str, message: bytes) -> None:
+        if not message:
+            self._generations.clear()
+            return
+        namespace, _, generation = message.decode().rpartition(":")
+        self._generations[namespace] = int(generation)
+
+    def _generation(self, namespace: str) -> int:
+        if not self._subscribed:
+            with self._lock:
+                if not self._subscribed:
+                    self.backend.subscribe(self.channel, self._on_invalidation)
+                    self._subscribed = True
+        generation = self._generations.get(namespace)
+        if generation is None:
+            raw = self.backend.get(f"{self.prefix}:{namespace}:generation")
+            generation = int(raw) if raw else 0
+            self._generations[namespace] = generation
+        return generation
+
+    def generation(self, namespace: str) -> Optional[int]:
+        """Génération courante d'un espace de noms (change à chaque invalidation).
+
+        Permet à un index local de savoir qu'il doit se resynchroniser ;
+        `None` si le serveur de cache est injoignable.
+        """
+        try:
+            return self._generation(namespace)
+        except (OSError, CacheError) as exc:
+            self.stats.error()
+            logger.warning("Lecture du cache impossible : %s", exc)
+            return None
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{self._generation(namespace)}:{key}"
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        try:
+            raw = self.backend.get(self._key(namespace, key))
+        except (OSError, CacheError) as exc:
+            self.stats.error()
+            logger.warning("Lecture du cache impossible : %s", exc)
+            return None
+        self.stats.record(namespace, raw is not None)
+        return None if raw is None else orjson.loads(raw)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            self.backend.set(self._key(namespace, key), orjson.dumps(value), ttl or self.default_ttl)
+        except (OSError, CacheError) as exc:
+            self.stats.error()
+            logger.warning("Écriture dans le cache impossible : %s", exc)
+
+    def get_or_set(self, namespace: str, key: str, factory: Callable[[], T], ttl: Optional[float] = None) -> T:
+        """Retourne la valeur en cache ou la calcule avec `factory` et la stocke."""
+        value = self.get(namespace, key)
+        if value is None:
+            value = factory()
+            self.set(namespace, key, value, ttl)
+        return value
+
+    def delete(self, namespace: str, key: str) -> None:
+        try:
+            self.backend.delete(self._key(namespace, key))
+        except (OSError, CacheError) as exc:
+            self.stats.error()
+            logger.warning("Suppression dans le cache impossible : %s", exc)
+
+    def invalidate(self, namespace: str) -> None:
+        """Invalide tout un espace de noms, sur toutes les réplicas."""
+        try:
+            generation = self.backend.incr(f"{self.prefix}:{namespace}:generation")
+            self._generations[namespace] = generation
+            self.backend.publish(self.channel, f"{namespace}:{generation}".encode())
+        except (OSError, CacheError) as exc:
+            self.stats.error()
+            logger.warning("Invalidation du cache impossible : %s", exc)
+
+
+def create_backend(url: str):
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryBackend(max_entries=settings.cache_max_entries)
+    if scheme == "redis":
+        return RedisBackend(url, timeout=settings.cache_timeout_seconds)
+    raise ValueError(f"CACHE_URL non pris en charge : {url}")
+
+
+cache = Cache(create_backend(settings.cache_url), default_ttl=settings.cache_default_ttl_seconds)
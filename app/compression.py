@@ -0,0 +1,198 @@
+"""Compression négociée des réponses (zstd, brotli, gzip).
+
+Middleware ASGI pur : le codage est choisi d'après `Accept-Encoding`, dans
+l'ordre de préférence de `COMPRESSION_ENCODINGS`. Sont laissées telles quelles
+les réponses déjà compressées (assets précompressés), les types non textuels,
+les corps d'un seul bloc sous `COMPRESSION_MINIMUM_SIZE` et les flux SSE.
+
+Les réponses en streaming (exports CSV, pages rendues au fil de l'eau) sont
+compressées bloc par bloc avec un vidage du compresseur après chaque bloc :
+le client reçoit chaque morceau dès qu'il est produit.
+
+`brotli` et `zstandard` sont optionnels : un codage dont le module est absent
+n'est simplement pas proposé.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Callable, Dict, Optional, Protocol, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .utils.assets import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    zstandard = None
+
+
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+class _Compressor(Protocol):
+    """Interface commune : `flush` rend tout ce qui a été reçu, `finish` clôt le flux."""
+
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class _GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_compressors(
+    gzip_level: int = 6, brotli_quality: int = 4, zstd_level: int = 3
+) -> Dict[str, Callable[[], _Compressor]]:
+    """Fabriques de compresseurs disponibles, par nom de codage HTTP."""
+    factories: Dict[str, Callable[[], _Compressor]] = {"gzip": lambda: _GzipCompressor(gzip_level)}
+    if brotli is not None:
+        factories["br"] = lambda: _BrotliCompressor(brotli_quality)
+    if zstandard is not None:
+        factories["zstd"] = lambda: _ZstdCompressor(zstd_level)
+    return factories
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type == "text/event-stream":
+        return False
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+class CompressionMiddleware:
+    """Compresse les réponses textuelles selon le codage accepté par le client."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Sequence[str] = ("zstd", "br", "gzip"),
+        minimum_size: int = 500,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        factories = available_compressors(gzip_level, brotli_quality, zstd_level)
+        self.factories = {name: factories[name] for name in encodings if name in factories}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.factories:
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        encoding = next((name for name in self.factories if name in accepted), None)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Retenu jusqu'au premier bloc : la décision dépend de sa taille
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if (
+                    start_message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or not is_compressible(headers.get("content-type", ""))
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = self.factories[encoding]()
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # Le corps transmis n'est plus identique octet pour octet
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["content-length"]
+                    await send(start_message)
+                else:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+            chunk = compressor.compress(body)
+            chunk += compressor.flush() if more_body else compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
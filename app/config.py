@@ -2,6 +2,7 @@
 
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -14,10 +15,59 @@ class Settings(BaseSettings):
 
     app_name: str = "La Vérité Si Je Note"
     secret_key: str = "change-me"
+    # Mode développement : en-têtes de diagnostic (X-DB-Queries…)
+    debug: bool = False
+    # Nombre de répétitions d'une même requête SQL au-delà duquel un N+1 est signalé
+    query_repeat_threshold: int = 5
     database_url: str = f"sqlite:///{BASE_DIR / 'data' / 'app.db'}"
+    # Réplicas en lecture seule, séparés par des virgules (vide : tout sur le primaire)
+    database_replica_urls: str = ""
+    # Après une écriture, le client lit sur le primaire pendant ce délai
+    replica_stickiness_seconds: float = 5.0
     session_cookie: str = "lvn_session"
     api_timeout_seconds: int = 10
     default_page_size: int = 24
+    # Migrations au démarrage ; à désactiver si un job dédié les applique
+    # (`python scripts/migrate.py`)
+    migrate_on_startup: bool = True
+    # Hachage des mots de passe (pbkdf2_sha256), exécuté dans un pool de processus
+    password_hash_rounds: int = 29000
+    password_hash_workers: int = 2
+    password_hash_max_concurrency: int = 8
+    password_hash_queue_timeout_seconds: float = 5.0
+    # Durée de vie du cache des utilisateurs connectés (0 pour le désactiver)
+    user_cache_ttl_seconds: float = 30.0
+    # Stockage des sessions : "cookie" (signé), "memory" ou "database"
+    session_backend: Literal["cookie", "memory", "database"] = "cookie"
+    session_max_age_seconds: int = 60 * 60 * 24 * 30  # 30 jours
+    # Cache applicatif : "memory://" (par processus) ou "redis://hôte:6379/0" (partagé)
+    cache_url: str = "memory://"
+    cache_default_ttl_seconds: float = 300.0
+    cache_max_entries: int = 10_000
+    cache_timeout_seconds: float = 0.5
+    # Compression des réponses, par ordre de préférence ("" pour la désactiver)
+    compression_encodings: str = "zstd,br,gzip"
+    compression_minimum_size: int = 500
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+    # Cache du bytecode Jinja2 partagé par les workers ("" pour le désactiver)
+    template_cache_dir: str = str(BASE_DIR / ".cache" / "jinja2")
+    # Rendu en streaming des grandes pages (catalogue, watchlist)
+    template_streaming: bool = True
+    # Limitation de débit : "MÉTHODE chemin=requêtes/secondes", séparées par des
+    # virgules ; un chemin terminé par `*` est un préfixe ("" pour la désactiver)
+    rate_limit_rules: str = (
+        "POST /login=10/60,POST /register=5/60,GET /tmdb/*=30/60,POST /tmdb/*=30/60,GET /films/partial=40/10"
+    )
+    # Seaux à jetons : "memory" (par processus) ou "cache" (CACHE_URL, partagé)
+    rate_limit_storage: Literal["memory", "cache"] = "memory"
+    # Délestage (503) : requêtes en cours et tâches en attente du pool de threads (0 : sans limite)
+    max_requests_in_flight: int = 200
+    max_threadpool_waiting: int = 40
+    overload_retry_after_seconds: float = 1.0
+    # Reconstruction complète de l'index des titres (titres modifiés, classement) ; 0 : jamais
+    title_index_refresh_seconds: float = 3600.0
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -1,33 +1,173 @@
-"""Initialisation de la base de données SQLModel/SQLAlchemy."""
+"""Initialisation de la base de données SQLModel/SQLAlchemy.
 
+Le moteur est créé à la première utilisation (`get_engine()`, ou l'attribut
+`engine` du module) : importer l'application reste rapide et n'ouvre aucune
+connexion tant qu'aucune requête n'en a besoin.
+
+Avec `DATABASE_REPLICA_URLS`, les requêtes de lecture (GET, HEAD) sont servies
+par un réplica, à tour de rôle, et toutes les autres par le primaire
+(`DATABASE_URL`). Un client dont la requête vient de valider une écriture
+(commit d'une session qui a écrit) reste sur le primaire pendant
+`REPLICA_STICKINESS_SECONDS` pour relire ses propres écritures malgré le
+retard de réplication. Un réplica injoignable est écarté quelques secondes.
+"""
+
+import itertools
+import threading
+import time
 from pathlib import Path
-from typing import Generator
+from typing import Dict, Generator, List, Optional
 
-from sqlalchemy.engine import make_url
-from sqlmodel import Session, SQLModel, create_engine
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlmodel import Session, create_engine
 
 from .config import get_settings
+from .metrics import DB_SESSIONS
 
 
 settings = get_settings()
-database_url = settings.database_url
-url = make_url(database_url)
-connect_args = {"check_same_thread": False} if url.get_backend_name() == "sqlite" else {}
 
-if url.database:
-    db_path = Path(url.database)
-    db_path.parent.mkdir(parents=True, exist_ok=True)
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Clé de session : instant (epoch) jusqu'auquel le client lit sur le primaire
+PRIMARY_UNTIL_KEY = "_db_primary_until"
+# Clés de `Session.info` : session HTTP à marquer, écriture en attente de commit
+_HTTP_SESSION_INFO = "http_session"
+_WROTE_INFO = "wrote"
+# Durée pendant laquelle un réplica injoignable n'est plus sollicité
+REPLICA_RETRY_SECONDS = 30.0
+
+_engine: Optional[Engine] = None
+_replicas: Optional[List[Engine]] = None
+_replica_down_until: Dict[Engine, float] = {}
+_replica_cursor = itertools.count()
+_engine_lock = threading.Lock()
+
+
+def _create_engine(database_url: str) -> Engine:
+    url = make_url(database_url)
+    connect_args = {"check_same_thread": False} if url.get_backend_name() == "sqlite" else {}
+    if url.get_backend_name() == "sqlite" and url.database:
+        Path(url.database).parent.mkdir(parents=True, exist_ok=True)
+    return create_engine(database_url, echo=False, connect_args=connect_args)
+
+
+def get_engine() -> Engine:
+    """Retourne le moteur du primaire, créé au premier appel."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(settings.database_url)
+    return _engine
+
+
+def _mark_replica_down(context) -> None:
+    if context.is_disconnect or context.connection is None:
+        _replica_down_until[context.engine] = time.monotonic() + REPLICA_RETRY_SECONDS
+
+
+def get_replica_engines() -> List[Engine]:
+    """Moteurs des réplicas configurés (liste vide sans réplica)."""
+    global _replicas
+    if _replicas is None:
+        with _engine_lock:
+            if _replicas is None:
+                engines = []
+                for replica_url in settings.database_replica_urls.split(","):
+                    if replica_url.strip():
+                        engine = _create_engine(replica_url.strip())
+                        event.listen(engine, "handle_error", _mark_replica_down)
+                        engines.append(engine)
+                _replicas = engines
+    return _replicas
+
+
+def get_read_engine() -> Engine:
+    """Un réplica disponible (à tour de rôle), ou le primaire à défaut."""
+    now = time.monotonic()
+    replicas = [engine for engine in get_replica_engines() if _replica_down_until.get(engine, 0.0) <= now]
+    if not replicas:
+        return get_engine()
+    return replicas[next(_replica_cursor) % len(replicas)]
+
+
+def _engine_for(request: Request) -> Engine:
+    if not get_replica_engines():
+        return get_engine()
+    # Pas de `request.session` : il lève une erreur sans middleware de session
+    session_data = request.scope.get("session")
+    if request.method not in READ_METHODS:
+        return get_engine()
+    if session_data and session_data.get(PRIMARY_UNTIL_KEY, 0) > time.time():
+        return get_engine()
+    return get_read_engine()
 
-engine = create_engine(database_url, echo=False, connect_args=connect_args)
 
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session: Session, flush_context) -> None:
+    session.info[_WROTE_INFO] = True
 
-def init_db() -> None:
-    """Crée les tables si elles n'existent pas."""
-    SQLModel.metadata.create_all(engine)
 
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dml(orm_execute_state) -> None:
+    # INSERT … ON CONFLICT, UPDATE et DELETE en masse ne passent pas par le flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WROTE_INFO] = True
 
-def get_session() -> Generator[Session, None, None]:
-    """Dépendance FastAPI pour ouvrir une session."""
+
+@event.listens_for(Session, "after_commit")
+def _stick_to_primary(session: Session) -> None:
+    """Après un commit qui a écrit, le client lit sur le primaire quelques secondes.
+
+    Une requête qui n'écrit rien (POST refusé, formulaire invalide, 422) ne
+    touche ni la session HTTP ni le cookie.
+    """
+    session_data = session.info.get(_HTTP_SESSION_INFO)
+    if session.info.pop(_WROTE_INFO, False) and session_data is not None:
+        session_data[PRIMARY_UNTIL_KEY] = int(time.time() + settings.replica_stickiness_seconds) + 1
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_writes(session: Session) -> None:
+    session.info.pop(_WROTE_INFO, None)
+
+
+def __getattr__(name: str):
+    # `from app.database import engine` reste possible (scripts) sans créer
+    # le moteur à l'import du module.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def init_db() -> list[int]:
+    """Applique les migrations de schéma manquantes (voir `app.migrations`)."""
+    from .migrations import run_migrations
+
+    return run_migrations(get_engine())
+
+
+def dialect_insert(session: Session, model):
+    """`INSERT` du dialecte courant, qui expose `on_conflict_do_nothing/do_update`.
+
+    SQLite et PostgreSQL partagent la même syntaxe `ON CONFLICT`, mais
+    SQLAlchemy la porte sur deux constructions distinctes.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def get_session(request: Request) -> Generator[Session, None, None]:
+    """Dépendance FastAPI pour ouvrir une session (primaire ou réplica)."""
+    engine = _engine_for(request)
+    target = "primary" if engine is get_engine() else "replica"
+    request.state.db_target = target
+    DB_SESSIONS.labels(target).inc()
     with Session(engine) as session:
+        if target == "primary" and get_replica_engines():
+            session.info[_HTTP_SESSION_INFO] = request.scope.get("session")
         yield session
-
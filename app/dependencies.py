@@ -6,22 +6,29 @@ from fastapi import Depends, HTTPException, Request, status
 from sqlmodel import Session
 
 from .database import get_session
-from .models import User
+from .services.users import CurrentUser, get_user
 
 
 def get_current_user(
     request: Request, session: Session = Depends(get_session)
-) -> Optional[User]:
-    """Retourne l'utilisateur courant si connecté."""
+) -> Optional[CurrentUser]:
+    """Retourne l'utilisateur courant si connecté.
+
+    Le résultat est mémorisé sur `request.state` : l'utilisateur n'est résolu
+    qu'une fois par requête, quel que soit le nombre de dépendances qui le demandent.
+    Servi depuis le cache, c'est un `UserSnapshot` en lecture seule (voir
+    `services.users`).
+    """
+    if hasattr(request.state, "current_user"):
+        return request.state.current_user
     user_id = request.session.get("user_id")
-    if not user_id:
-        return None
-    return session.get(User, user_id)
+    user = get_user(session, user_id) if user_id else None
+    request.state.current_user = user
+    return user
 
 
-def require_user(current_user: Optional[User] = Depends(get_current_user)) -> User:
+def require_user(current_user: Optional[CurrentUser] = Depends(get_current_user)) -> CurrentUser:
     """Force la présence d'un utilisateur connecté."""
     if current_user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentification requise.")
     return current_user
-
@@ -0,0 +1,88 @@
+"""Rendu économe des pages d'erreur (404, 403).
+
+Les robots qui enchaînent les 404 ne doivent pas coûter autant qu'une vraie
+page : aucune requête SQL, aucune écriture de session. La page anonyme est
+rendue une fois puis servie depuis un petit cache ; pour un visiteur connecté,
+l'en-tête est construit à partir des seules données de session.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse
+
+from .web import templates
+
+
+logger = logging.getLogger(__name__)
+
+ERROR_PAGES = {
+    404: (
+        "errors/404.html",
+        "Perdu dans le générique ?",
+        "On dirait que cette scène n'a jamais été tournée. Revenons au plateau principal.",
+    ),
+    403: (
+        "errors/403.html",
+        "Accès interdit",
+        "Même Rabbi Jacob ne passerait pas ce cordon de sécurité. Reprenez un ticket valide.",
+    ),
+}
+
+# Compteurs par code HTTP, exposés par `/health`
+error_counts: Counter = Counter()
+
+# Pages anonymes déjà rendues, par (code, URL de base). L'URL de base dépend de
+# l'en-tête Host : la taille est bornée pour qu'un client ne puisse pas la gonfler.
+_anonymous_cache: Dict[Tuple[int, str], bytes] = {}
+_ANONYMOUS_CACHE_SIZE = 16
+
+
+def _session_user(request: Request) -> Optional[SimpleNamespace]:
+    """Utilisateur minimal reconstruit depuis la session, sans base de données."""
+    user_id = request.session.get("user_id")
+    if not user_id:
+        return None
+    return SimpleNamespace(id=user_id, username=request.session.get("username", ""))
+
+
+def _render(request: Request, status_code: int, current_user: Optional[SimpleNamespace]) -> str:
+    template_name, title, message = ERROR_PAGES[status_code]
+    return templates.get_template(template_name).render(
+        {
+            "request": request,
+            "current_user": current_user,
+            "watchlist": [],
+            "watchlist_ids": set(),
+            # Inconnu sans requête SQL : l'en-tête affiche le lien sans compteur
+            "watchlist_count": None if current_user else 0,
+            # Les messages flash restent en session pour la prochaine vraie page
+            "messages": [],
+            "error_code": status_code,
+            "error_title": title,
+            "error_message": message,
+        }
+    )
+
+
+def render_error_page(request: Request, status_code: int) -> HTMLResponse:
+    """Réponse HTML d'erreur à coût borné."""
+    error_counts[status_code] += 1
+    current_user = _session_user(request)
+    if current_user is not None:
+        return HTMLResponse(_render(request, status_code, current_user), status_code=status_code)
+
+    key = (status_code, str(request.base_url))
+    body = _anonymous_cache.get(key)
+    if body is None:
+        body = _render(request, status_code, None).encode("utf-8")
+        if len(_anonymous_cache) < _ANONYMOUS_CACHE_SIZE:
+            _anonymous_cache[key] = body
+        else:
+            logger.debug("Cache des pages d'erreur plein, rendu sans mise en cache (%s)", key)
+    return HTMLResponse(body, status_code=status_code)
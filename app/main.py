@@ -1,24 +1,35 @@
 """Point d'entrée FastAPI."""
 
+import time
+
+# Référence du temps « import → prêt » exposé par `/health`
+_IMPORT_STARTED = time.perf_counter()
+
+import logging
 from pathlib import Path
-from typing import Any, Dict
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
-from fastapi.staticfiles import StaticFiles
-from sqlmodel import Session
-from starlette.middleware.sessions import SessionMiddleware
+from fastapi.responses import ORJSONResponse, RedirectResponse, Response
 
+from .cache import cache
+from .compression import CompressionMiddleware
 from .config import get_settings
-from .database import engine, init_db
-from .models import User
-from .routers import auth, films, watchlist, tmdb, profil
-from .services.watchlist import fetch_watchlist
-from .web import template_context, templates
+from .database import init_db
+from .errors import error_counts, render_error_page
+from .metrics import MetricsMiddleware, mark_process_dead, render_metrics
+from .ratelimit import RateLimitMiddleware, parse_rules
+from .routers import api, auth, exports, films, watchlist, tmdb, profil
+from .security import hashing_stats, shutdown_hashing_pool
+from .services.autocomplete import warm_title_index
+from .sessions import ServerSessionMiddleware
+from .utils.assets import AssetStaticFiles
 
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
+startup_timings: dict = {}
 # Active explicit documentation routes for Swagger UI and ReDoc
 app = FastAPI(
     title=settings.app_name,
@@ -30,7 +41,24 @@ app = FastAPI(
 
 @app.on_event("startup")
 def on_startup() -> None:
-    init_db()
+    imported = time.perf_counter()
+    if settings.migrate_on_startup:
+        init_db()
+    # Index des titres construit en tâche de fond, hors du temps de démarrage
+    warm_title_index()
+    ready = time.perf_counter()
+    startup_timings.update(
+        import_seconds=round(imported - _IMPORT_STARTED, 3),
+        migrations_seconds=round(ready - imported, 3),
+        ready_seconds=round(ready - _IMPORT_STARTED, 3),
+    )
+    logger.info("Application prête en %.0f ms", 1000 * startup_timings["ready_seconds"])
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    shutdown_hashing_pool()
+    mark_process_dead()
 
 
 app.add_middleware(
@@ -39,21 +67,43 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Sous la session : les seaux d'un utilisateur connecté le suivent d'une IP à l'autre
+app.add_middleware(
+    RateLimitMiddleware,
+    rules=parse_rules(settings.rate_limit_rules),
+    storage=settings.rate_limit_storage,
+    max_in_flight=settings.max_requests_in_flight,
+    max_threadpool_waiting=settings.max_threadpool_waiting,
+    overload_retry_after=settings.overload_retry_after_seconds,
+)
 app.add_middleware(
-    SessionMiddleware,
+    ServerSessionMiddleware,
     secret_key=settings.secret_key,
     session_cookie=settings.session_cookie,
-    max_age=60 * 60 * 24 * 30,  # 30 jours
+    max_age=settings.session_max_age_seconds,
+    backend=settings.session_backend,
 )
+app.add_middleware(
+    CompressionMiddleware,
+    encodings=[name.strip() for name in settings.compression_encodings.split(",") if name.strip()],
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+    zstd_level=settings.compression_zstd_level,
+)
+# Ajouté en dernier : le plus externe, il mesure aussi les autres middlewares
+app.add_middleware(MetricsMiddleware)
 
 static_dir = Path(__file__).resolve().parent / "static"
-app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+app.mount("/static", AssetStaticFiles(directory=str(static_dir)), name="static")
 
 app.include_router(auth.router)
 app.include_router(films.router)
 app.include_router(watchlist.router)
 app.include_router(tmdb.router)
 app.include_router(profil.router)
+app.include_router(api.router)
+app.include_router(exports.router)
 
 
 @app.get("/{prefix}/docs", include_in_schema=False)
@@ -69,46 +119,18 @@ def redirect_redoc_prefix(prefix: str):
     return RedirectResponse(url="/redoc")
 
 
-def _error_context(request: Request) -> Dict[str, Any]:
-    user = None
-    watchlist = []
-    watchlist_ids = set()
-    user_id = request.session.get("user_id")
-    if user_id:
-        with Session(engine) as session:
-            user = session.get(User, user_id)
-            if user:
-                watchlist = fetch_watchlist(session, user)
-                watchlist_ids = {film.id for film in watchlist}
-    return template_context(
-        request, current_user=user, watchlist=watchlist, watchlist_ids=watchlist_ids
-    )
-
-
 @app.exception_handler(404)
 async def not_found(request: Request, exc: Exception):
-    context = _error_context(request)
-    context.update(
-        {
-            "error_code": 404,
-            "error_title": "Perdu dans le générique ?",
-            "error_message": "On dirait que cette scène n'a jamais été tournée. Revenons au plateau principal.",
-        }
-    )
-    return templates.TemplateResponse("errors/404.html", context, status_code=404)
+    if request.url.path.startswith(api.router.prefix):
+        error_counts[404] += 1
+        detail = getattr(exc, "detail", "Not Found")
+        return ORJSONResponse({"detail": detail}, status_code=404)
+    return render_error_page(request, 404)
 
 
 @app.exception_handler(403)
 async def forbidden(request: Request, exc: Exception):
-    context = _error_context(request)
-    context.update(
-        {
-            "error_code": 403,
-            "error_title": "Accès interdit",
-            "error_message": "Même Rabbi Jacob ne passerait pas ce cordon de sécurité. Reprenez un ticket valide.",
-        }
-    )
-    return templates.TemplateResponse("errors/403.html", context, status_code=403)
+    return render_error_page(request, 403)
 
 
 @app.get("/")
@@ -118,5 +140,16 @@ def root() -> RedirectResponse:
 
 @app.get("/health")
 def healthcheck() -> dict:
-    return {"status": "ok"}
-
+    return {
+        "status": "ok",
+        "errors": dict(error_counts),
+        "password_hashing": hashing_stats.as_dict(),
+        "cache": cache.stats.as_dict(),
+        "startup": startup_timings,
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
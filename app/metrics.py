@@ -0,0 +1,184 @@
+"""Métriques Prometheus (`GET /metrics`).
+
+Avec plusieurs workers uvicorn, définir `PROMETHEUS_MULTIPROC_DIR` (répertoire
+vide, propre à chaque démarrage) : chaque processus écrit ses compteurs dans
+des fichiers mappés en mémoire, agrégés au moment de la collecte. Sans cette
+variable, les métriques sont celles du seul processus interrogé.
+
+Mesures exposées : latence par route (histogramme), requêtes en cours,
+occupation et file d'attente du pool de threads, requêtes refusées par la
+limitation de débit ou délestées, nombre et durée des requêtes SQL par requête
+HTTP, durée de rendu des templates, latence et erreurs des appels TMDb,
+succès et échecs du cache applicatif.
+
+Le même middleware signale les N+1 probables (voir `app.utils.queries`) et,
+en mode `DEBUG`, ajoute les en-têtes `X-DB-Queries`, `X-DB-Time` et
+`X-DB-Target` (primaire ou réplica).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+
+import anyio.to_thread
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+from .utils.queries import start_query_stats, stop_query_stats
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+REQUEST_DURATION = Histogram(
+    "lvn_http_request_duration_seconds",
+    "Durée des requêtes HTTP par route",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "lvn_http_requests_in_progress",
+    "Requêtes HTTP en cours de traitement",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_IN_USE = Gauge(
+    "lvn_threadpool_threads_in_use",
+    "Threads du pool anyio occupés (routes et dépendances synchrones)",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_WAITING = Gauge(
+    "lvn_threadpool_tasks_waiting",
+    "Tâches en attente d'un thread du pool anyio",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_SIZE = Gauge(
+    "lvn_threadpool_threads_total",
+    "Taille du pool de threads anyio",
+    multiprocess_mode="livesum",
+)
+DB_QUERIES = Histogram(
+    "lvn_db_queries_per_request",
+    "Requêtes SQL exécutées par requête HTTP",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_TIME = Histogram(
+    "lvn_db_time_per_request_seconds",
+    "Temps passé en base par requête HTTP",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+DB_SESSIONS = Counter(
+    "lvn_db_sessions_total", "Sessions de base ouvertes par requête HTTP, par cible", ["target"]
+)
+TEMPLATE_RENDER = Histogram(
+    "lvn_template_render_seconds",
+    "Durée de rendu des templates Jinja2",
+    ["template"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+TMDB_DURATION = Histogram(
+    "lvn_tmdb_request_duration_seconds",
+    "Latence des appels à l'API TMDb",
+    ["endpoint"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+TMDB_ERRORS = Counter("lvn_tmdb_errors_total", "Appels TMDb en échec", ["endpoint"])
+CACHE_REQUESTS = Counter(
+    "lvn_cache_requests_total", "Lectures du cache applicatif", ["namespace", "result"]
+)
+CACHE_ERRORS = Counter("lvn_cache_errors_total", "Erreurs du serveur de cache")
+RATE_LIMITED = Counter("lvn_rate_limited_total", "Requêtes refusées (429) par règle de limitation", ["rule"])
+LOAD_SHED = Counter("lvn_load_shed_total", "Requêtes délestées (503) par cause de surcharge", ["reason"])
+
+
+def _route_label(scope: Scope) -> str:
+    # Gabarit de la route (`/films/{film_id}`) : l'URL brute ferait exploser
+    # le nombre de séries.
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope["path"].startswith("/static/"):
+        return "/static"
+    return "<non routée>"
+
+
+class MetricsMiddleware:
+    """Mesure chaque requête HTTP (middleware ASGI pur, le plus externe)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        stats, token = start_query_stats()
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        REQUESTS_IN_PROGRESS.inc()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.debug:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Queries"] = str(stats.count)
+                    headers["X-DB-Time"] = f"{1000 * stats.seconds:.1f}ms"
+                    target = scope.get("state", {}).get("db_target")
+                    if target:
+                        headers["X-DB-Target"] = target
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+            THREADPOOL_IN_USE.set(limiter.borrowed_tokens)
+            THREADPOOL_WAITING.set(limiter.statistics().tasks_waiting)
+            THREADPOOL_SIZE.set(limiter.total_tokens)
+            stop_query_stats(token)
+            route = _route_label(scope)
+            for statement, repeats in stats.repeated(settings.query_repeat_threshold):
+                logger.warning(
+                    "N+1 probable sur %s %s : %d × %s", scope["method"], route, repeats, " ".join(statement.split())[:200]
+                )
+            REQUEST_DURATION.labels(scope["method"], route, str(status_code)).observe(
+                time.perf_counter() - started
+            )
+            DB_QUERIES.labels(route).observe(stats.count)
+            DB_TIME.labels(route).observe(stats.seconds)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Corps et type MIME de la réponse `/metrics`."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Retire les jauges « live » du worker qui s'arrête."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
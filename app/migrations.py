@@ -0,0 +1,310 @@
+"""Migrations de schéma versionnées.
+
+Chaque migration porte un numéro croissant et n'est appliquée qu'une fois ; les
+versions appliquées sont notées dans la table `schema_migrations`. Au démarrage :
+
+- si la base est à jour, une seule requête de lecture suffit (aucun verrou) ;
+- sinon, un verrou consultatif est pris (`pg_advisory_lock` sous PostgreSQL,
+  transaction `BEGIN IMMEDIATE` sous SQLite) : une seule réplica migre, les
+  autres attendent puis constatent que tout est déjà appliqué.
+
+Les migrations doivent rester idempotentes sur le schéma : la migration 1 crée
+les tables telles qu'elles étaient à sa publication, les suivantes complètent
+les bases créées avec une version antérieure (colonnes et index ajoutés « si
+absents »). Chaque migration décrit elle-même ses tables, colonnes et index
+(noms et colonnes) : elle ne lit jamais les modèles actuels, sans quoi un
+changement de modèle modifierait en silence ce qu'elle fait sur une base neuve.
+Pour faire évoluer le schéma, modifier les modèles et ajouter une fonction
+décorée par `@migration` avec le numéro suivant ; ne jamais modifier une
+migration déjà publiée.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Set
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    UniqueConstraint,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session
+from sqlmodel.sql.sqltypes import AutoString
+
+
+logger = logging.getLogger(__name__)
+
+# Clé arbitraire du verrou consultatif PostgreSQL (propre à cette application)
+ADVISORY_LOCK_KEY = 0x4C564E  # "LVN"
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+# Schéma créé par la migration 1, figé à sa publication
+_initial = MetaData()
+Table(
+    "user",
+    _initial,
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("username", String(80), nullable=False),
+    Column("email", String(255), nullable=False),
+    Column("hashed_password", AutoString, nullable=False),
+    Column("bio", AutoString(500)),
+    Index("ix_user_username", "username", unique=True),
+    Index("ix_user_email", "email", unique=True),
+)
+Table(
+    "tag",
+    _initial,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(80), nullable=False),
+    Index("ix_tag_name", "name", unique=True),
+)
+Table(
+    "film",
+    _initial,
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("external_id", AutoString),
+    Column("title", AutoString, nullable=False),
+    Column("overview", AutoString),
+    Column("release_year", Integer),
+    Column("poster_url", AutoString),
+    Column("backdrop_url", AutoString),
+    Column("runtime_minutes", Integer),
+    Column("director", AutoString),
+    Column("country", AutoString),
+    Column("primary_genre", AutoString(80)),
+    Column("review_count", Integer, nullable=False, server_default="0"),
+    Column("rating_sum", Integer, nullable=False, server_default="0"),
+    Index("ix_film_external_id", "external_id"),
+    Index("ix_film_release_year", "release_year"),
+    Index("ix_film_primary_genre", "primary_genre"),
+    Index("ix_film_title_release_year", "title", "release_year"),
+)
+Table(
+    "filmtaglink",
+    _initial,
+    Column("film_id", Integer, ForeignKey("film.id"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tag.id"), primary_key=True),
+)
+Table(
+    "review",
+    _initial,
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("rating", Integer, nullable=False),
+    Column("comment", AutoString(2000)),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("film_id", Integer, ForeignKey("film.id"), nullable=False),
+    UniqueConstraint("user_id", "film_id", name="uq_review_user_film"),
+    Index("ix_review_film_id", "film_id"),
+)
+Table(
+    "watchlistitem",
+    _initial,
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("film_id", Integer, ForeignKey("film.id"), nullable=False),
+    UniqueConstraint("user_id", "film_id", name="uq_watchlist_user_film"),
+    Index("ix_watchlistitem_user_id", "user_id"),
+    Index("ix_watchlistitem_film_id", "film_id"),
+)
+Table(
+    "websession",
+    _initial,
+    Column("id", AutoString(64), primary_key=True),
+    Column("data", AutoString, nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+    Index("ix_websession_expires_at", "expires_at"),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Enregistre une fonction `upgrade(conn)` comme migration numérotée."""
+
+    def register(func: Callable[[Connection], None]) -> Callable[[Connection], None]:
+        if MIGRATIONS and MIGRATIONS[-1].version >= version:
+            raise ValueError(f"Migration {version} déclarée hors ordre")
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+
+    return register
+
+
+def _add_column(conn: Connection, table_name: str, column: Column) -> bool:
+    """Ajoute une colonne si elle manque ; retourne True si ajoutée."""
+    existing = {row["name"] for row in inspect(conn).get_columns(table_name)}
+    if column.name in existing:
+        return False
+    preparer = conn.dialect.identifier_preparer
+    ddl = (
+        f"ALTER TABLE {preparer.quote(table_name)} "
+        f"ADD COLUMN {preparer.quote(column.name)} {column.type.compile(conn.dialect)}"
+    )
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+        if not column.nullable:
+            ddl += " NOT NULL"
+    conn.execute(text(ddl))
+    return True
+
+
+def _create_index(conn: Connection, table_name: str, name: str, *columns: str) -> None:
+    """Crée l'index `name` sur `table_name (columns…)` s'il n'existe pas."""
+    preparer = conn.dialect.identifier_preparer
+    column_list = ", ".join(preparer.quote(column) for column in columns)
+    conn.execute(
+        text(f"CREATE INDEX IF NOT EXISTS {preparer.quote(name)} ON {preparer.quote(table_name)} ({column_list})")
+    )
+
+
+@migration(1, "Schéma initial")
+def _initial_schema(conn: Connection) -> None:
+    _initial.create_all(conn, checkfirst=True)
+
+
+@migration(2, "Agrégats des films (nombre d'avis, somme des notes)")
+def _film_aggregates(conn: Connection) -> None:
+    added = [
+        _add_column(conn, "film", Column(name, Integer, nullable=False, server_default="0"))
+        for name in ("review_count", "rating_sum")
+    ]
+    if any(added):
+        from .services.aggregates import refresh_film_aggregates
+
+        with Session(bind=conn) as session:
+            refresh_film_aggregates(session)
+            session.flush()
+
+
+@migration(3, "Genre principal des films")
+def _film_primary_genre(conn: Connection) -> None:
+    if _add_column(conn, "film", Column("primary_genre", AutoString(80))):
+        from .services.aggregates import refresh_primary_genres
+
+        with Session(bind=conn) as session:
+            refresh_primary_genres(session)
+            session.flush()
+    # Index de `film` à cette version (absents des bases créées avant)
+    _create_index(conn, "film", "ix_film_external_id", "external_id")
+    _create_index(conn, "film", "ix_film_release_year", "release_year")
+    _create_index(conn, "film", "ix_film_primary_genre", "primary_genre")
+    _create_index(conn, "film", "ix_film_title_release_year", "title", "release_year")
+
+
+@migration(4, "Sessions HTTP côté serveur")
+def _web_sessions(conn: Connection) -> None:
+    _initial.tables["websession"].create(conn, checkfirst=True)
+    _create_index(conn, "websession", "ix_websession_expires_at", "expires_at")
+
+
+@migration(5, "Index composites des requêtes fréquentes")
+def _composite_indexes(conn: Connection) -> None:
+    _create_index(conn, "film", "ix_film_title_id", "title", "id")
+    _create_index(conn, "review", "ix_review_film_id_created_at", "film_id", "created_at", "id")
+    _create_index(conn, "review", "ix_review_user_id_created_at", "user_id", "created_at", "id")
+    _create_index(conn, "watchlistitem", "ix_watchlistitem_user_id_created_at", "user_id", "created_at", "id")
+    _create_index(conn, "filmtaglink", "ix_filmtaglink_tag_id_film_id", "tag_id", "film_id")
+    # Rendus redondants par les index composites qui commencent par la même colonne
+    for index_name in ("ix_review_film_id", "ix_watchlistitem_user_id"):
+        conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+
+def _applied_versions(conn: Connection) -> Set[int]:
+    if not inspect(conn).has_table(schema_migrations.name):
+        return set()
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending_migrations(bind: Engine) -> List[Migration]:
+    with bind.connect() as conn:
+        applied = _applied_versions(conn)
+    return [m for m in MIGRATIONS if m.version not in applied]
+
+
+def _apply_pending(conn: Connection) -> List[int]:
+    schema_migrations.create(conn, checkfirst=True)
+    applied = _applied_versions(conn)
+    done: List[int] = []
+    for item in MIGRATIONS:
+        if item.version in applied:
+            continue
+        started = time.perf_counter()
+        item.upgrade(conn)
+        conn.execute(
+            schema_migrations.insert().values(
+                version=item.version, description=item.description, applied_at=datetime.utcnow()
+            )
+        )
+        elapsed_ms = 1000 * (time.perf_counter() - started)
+        logger.info("Migration %s appliquée (%s) en %.0f ms", item.version, item.description, elapsed_ms)
+        done.append(item.version)
+    return done
+
+
+def run_migrations(bind: Engine) -> List[int]:
+    """Applique les migrations manquantes sous verrou ; retourne les versions appliquées."""
+    if not pending_migrations(bind):
+        return []
+
+    if bind.dialect.name == "postgresql":
+        with bind.connect() as conn:
+            # Verrou de session : il survit aux transactions jusqu'à l'unlock
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            conn.commit()
+            try:
+                done = _apply_pending(conn)
+                conn.commit()
+                return done
+            finally:
+                conn.rollback()
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                conn.commit()
+
+    with bind.connect() as conn:
+        if bind.dialect.name == "sqlite":
+            # Verrou d'écriture sur le fichier : les autres processus patientent
+            # jusqu'à une minute ; le DDL SQLite est transactionnel.
+            conn.exec_driver_sql("PRAGMA busy_timeout = 60000")
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        done = _apply_pending(conn)
+        conn.commit()
+        return done
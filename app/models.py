@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, String, UniqueConstraint
+from sqlalchemy import Column, Index, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlmodel import Field, Relationship, SQLModel
 
@@ -20,6 +20,9 @@ class TimestampedModel(SQLModel, table=False):
 class FilmTagLink(SQLModel, table=True):
     """Table de jointure film-tag."""
 
+    # La clé primaire (film_id, tag_id) ne sert pas les filtres par tag
+    __table_args__ = (Index("ix_filmtaglink_tag_id_film_id", "tag_id", "film_id"),)
+
     film_id: Optional[int] = Field(
         default=None, foreign_key="film.id", primary_key=True, nullable=False
     )
@@ -71,6 +74,13 @@ class Tag(SQLModel, table=True):
 class Film(TimestampedModel, table=True):
     """Information de base sur un film."""
 
+    __table_args__ = (
+        # Rapprochement par titre (+ année) lors des imports
+        Index("ix_film_title_release_year", "title", "release_year"),
+        # Catalogue trié par titre, pagination par curseur (titre, id)
+        Index("ix_film_title_id", "title", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     external_id: Optional[str] = Field(default=None, index=True)
     title: str
@@ -81,6 +91,14 @@ class Film(TimestampedModel, table=True):
     runtime_minutes: Optional[int] = Field(default=None)
     director: Optional[str] = Field(default=None)
     country: Optional[str] = Field(default=None)
+    # Colonnes dénormalisées, maintenues par `services.aggregates`.
+    primary_genre: Optional[str] = Field(default=None, max_length=80, index=True)
+    review_count: int = Field(
+        default=0, nullable=False, sa_column_kwargs={"server_default": "0"}
+    )
+    rating_sum: int = Field(
+        default=0, nullable=False, sa_column_kwargs={"server_default": "0"}
+    )
 
     tags: list[Tag] = Relationship(
         sa_relationship=relationship(
@@ -104,13 +122,18 @@ class Film(TimestampedModel, table=True):
 class Review(TimestampedModel, table=True):
     """Avis d'un utilisateur sur un film."""
 
-    __table_args__ = (UniqueConstraint("user_id", "film_id", name="uq_review_user_film"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "film_id", name="uq_review_user_film"),
+        # Avis d'un film / d'un utilisateur, du plus récent au plus ancien
+        Index("ix_review_film_id_created_at", "film_id", "created_at", "id"),
+        Index("ix_review_user_id_created_at", "user_id", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     rating: int = Field(ge=1, le=5, nullable=False)
     comment: Optional[str] = Field(default=None, max_length=2000)
     user_id: int = Field(foreign_key="user.id", nullable=False)
-    film_id: int = Field(foreign_key="film.id", nullable=False, index=True)
+    film_id: int = Field(foreign_key="film.id", nullable=False)
 
     user: Optional[User] = Relationship(
         sa_relationship=relationship("User", back_populates="reviews")
@@ -123,10 +146,14 @@ class Review(TimestampedModel, table=True):
 class WatchlistItem(TimestampedModel, table=True):
     """Association entre un utilisateur et un film de sa watchlist."""
 
-    __table_args__ = (UniqueConstraint("user_id", "film_id", name="uq_watchlist_user_film"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "film_id", name="uq_watchlist_user_film"),
+        # Watchlist par date d'ajout décroissante
+        Index("ix_watchlistitem_user_id_created_at", "user_id", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id", nullable=False, index=True)
+    user_id: int = Field(foreign_key="user.id", nullable=False)
     film_id: int = Field(foreign_key="film.id", nullable=False, index=True)
 
     user: Optional[User] = Relationship(
@@ -136,3 +163,11 @@ class WatchlistItem(TimestampedModel, table=True):
         sa_relationship=relationship("Film", back_populates="watchlist_items")
     )
 
+
+
+class WebSession(SQLModel, table=True):
+    """Session HTTP stockée côté serveur (`SESSION_BACKEND=database`)."""
+
+    id: str = Field(primary_key=True, max_length=64)
+    data: str = Field(nullable=False)
+    expires_at: datetime = Field(nullable=False, index=True)
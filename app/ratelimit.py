@@ -0,0 +1,231 @@
+"""Limitation de débit par client et délestage en cas de surcharge.
+
+Deux protections, appliquées avant le routage et sans accès à la base :
+
+- **limitation de débit** : un seau à jetons par règle et par client
+  (utilisateur connecté, sinon adresse IP). Les règles (`RATE_LIMIT_RULES`)
+  ciblent les routes coûteuses : connexion et inscription (hachage pbkdf2),
+  appels à TMDb (quota de la clé API partagé par tous), recherche du
+  catalogue. Au-delà : 429 avec `Retry-After`.
+- **délestage** : au-delà de `MAX_REQUESTS_IN_FLIGHT` requêtes en cours, ou
+  de `MAX_THREADPOOL_WAITING` tâches en attente d'un thread du pool anyio
+  (routes et dépendances synchrones), la requête est refusée aussitôt
+  (503 avec `Retry-After`) plutôt que de faire grimper la latence de toutes
+  les autres. `/health`, `/metrics` et `/static` ne sont jamais délestés.
+
+Les seaux sont en mémoire du processus par défaut (`RATE_LIMIT_STORAGE=memory`).
+Avec `cache`, les compteurs sont tenus par le cache applicatif (`CACHE_URL`),
+donc partagés par tous les workers et réplicas si c'est un serveur Redis ; le
+protocole minimal utilisé (INCR, PEXPIRE) impose alors des fenêtres fixes :
+jusqu'à deux rafales peuvent passer à cheval sur deux fenêtres. Comme le cache,
+ce stockage ne fait jamais tomber une requête : en cas d'erreur, elle passe.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+import anyio.to_thread
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .cache import CacheError, cache
+from .errors import error_counts
+from .metrics import LOAD_SHED, RATE_LIMITED
+
+
+logger = logging.getLogger(__name__)
+
+# Jamais délestés : sondes de santé, collecte des métriques, assets
+SHED_EXEMPT_PREFIXES = ("/health", "/metrics", "/static/")
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """`capacity` requêtes par `period` secondes, en rafale de `capacity` au plus."""
+
+    method: str
+    path: str
+    capacity: int
+    period: float
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+    def matches(self, method: str, path: str) -> bool:
+        if method != self.method:
+            return False
+        if self.path.endswith("*"):
+            return path.startswith(self.path[:-1])
+        return path.rstrip("/") == self.path.rstrip("/")
+
+
+def parse_rules(spec: str) -> List[RateLimitRule]:
+    """Lit `"POST /login=10/60, GET /tmdb/*=30/60"` (10 requêtes par 60 s…)."""
+    rules = []
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        target, _, limit = item.partition("=")
+        method, _, path = target.strip().partition(" ")
+        capacity, _, period = limit.partition("/")
+        if not path.strip() or not capacity.strip() or not period.strip():
+            raise ValueError(f"Règle de limitation invalide : {item.strip()!r}")
+        rules.append(RateLimitRule(method.upper(), path.strip(), int(capacity), float(period)))
+    return rules
+
+
+class MemoryBuckets:
+    """Seaux à jetons en mémoire du processus (LRU borné)."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 100_000) -> None:
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def take(self, key: str, rule: RateLimitRule) -> float:
+        """Consomme un jeton ; retourne 0 ou le délai (s) avant le prochain jeton."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(rule.capacity), now))
+            tokens = min(float(rule.capacity), tokens + (now - updated) * rule.refill_rate)
+            if tokens >= 1.0:
+                tokens -= 1.0
+                wait = 0.0
+            else:
+                wait = (1.0 - tokens) / rule.refill_rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # Un seau évincé repart plein : seuls les clients inactifs le sont
+            while len(self._buckets) > self._max_entries:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class CacheBuckets:
+    """Compteurs à fenêtre fixe dans le cache applicatif (partagé si Redis)."""
+
+    blocking = True
+
+    def take(self, key: str, rule: RateLimitRule) -> float:
+        now = time.time()
+        window = int(now // rule.period)
+        try:
+            count = cache.backend.incr(f"{cache.prefix}:ratelimit:{key}:{window}", ttl=rule.period)
+        except (OSError, CacheError) as exc:
+            cache.stats.error()
+            logger.warning("Limitation de débit indisponible : %s", exc)
+            return 0.0
+        if count <= rule.capacity:
+            return 0.0
+        return (window + 1) * rule.period - now
+
+
+RATE_LIMIT_STORES = {"memory": MemoryBuckets, "cache": CacheBuckets}
+
+
+def _client_key(scope: Scope) -> str:
+    # Utilisateur connecté si la session est chargée, sinon adresse du client
+    # (derrière Nginx, lancer uvicorn avec `--forwarded-allow-ips`)
+    session = scope.get("session") or {}
+    user_id = session.get("user_id")
+    if user_id:
+        return f"user:{user_id}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'inconnu'}"
+
+
+def _retry_after(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+class RateLimitMiddleware:
+    """Refuse vite (429 / 503) plutôt que de laisser la latence exploser."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rules: List[RateLimitRule],
+        storage: str = "memory",
+        max_in_flight: int = 0,
+        max_threadpool_waiting: int = 0,
+        overload_retry_after: float = 1.0,
+    ) -> None:
+        self.app = app
+        self.rules = rules
+        self.store = RATE_LIMIT_STORES[storage]()
+        self.max_in_flight = max_in_flight
+        self.max_threadpool_waiting = max_threadpool_waiting
+        self.overload_retry_after = overload_retry_after
+        self.in_flight = 0
+
+    def _overloaded(self) -> Optional[str]:
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return "in_flight"
+        if self.max_threadpool_waiting:
+            limiter = anyio.to_thread.current_default_thread_limiter()
+            if limiter.statistics().tasks_waiting >= self.max_threadpool_waiting:
+                return "threadpool"
+        return None
+
+    async def _take(self, key: str, rule: RateLimitRule) -> float:
+        if self.store.blocking:
+            return await anyio.to_thread.run_sync(self.store.take, key, rule)
+        return self.store.take(key, rule)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if not path.startswith(SHED_EXEMPT_PREFIXES):
+            reason = self._overloaded()
+            if reason is not None:
+                LOAD_SHED.labels(reason).inc()
+                response = self._reject(
+                    scope, 503, "Service surchargé, réessayez dans un instant.", self.overload_retry_after
+                )
+                await response(scope, receive, send)
+                return
+
+        method = scope["method"]
+        for rule in self.rules:
+            if rule.matches(method, path):
+                wait = await self._take(f"{rule.name}:{_client_key(scope)}", rule)
+                if wait > 0:
+                    RATE_LIMITED.labels(rule.name).inc()
+                    response = self._reject(scope, 429, "Trop de requêtes, réessayez plus tard.", wait)
+                    await response(scope, receive, send)
+                    return
+                break
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    @staticmethod
+    def _reject(scope: Scope, status_code: int, message: str, retry_after: float) -> Response:
+        error_counts[status_code] += 1
+        headers: Dict[str, str] = {"Retry-After": _retry_after(retry_after), "Cache-Control": "no-store"}
+        accept = Headers(scope=scope).get("accept", "")
+        if scope["path"].startswith("/api/") or "application/json" in accept:
+            return JSONResponse({"detail": message}, status_code=status_code, headers=headers)
+        return PlainTextResponse(message, status_code=status_code, headers=headers)
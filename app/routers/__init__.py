@@ -1,6 +1,6 @@
 """Routing package."""
 
-from . import auth, films, watchlist, tmdb, profil
+from . import api, auth, exports, films, watchlist, tmdb, profil
 
-__all__ = ["auth", "films", "watchlist", "tmdb", "profil"]
+__all__ = ["api", "auth", "exports", "films", "watchlist", "tmdb", "profil"]
 
@@ -0,0 +1,253 @@
+"""API JSON versionnée (`/api/v1`) pour le client mobile et les intégrations.
+
+Les requêtes ne sélectionnent que les colonnes demandées (pas de graphe
+d'objets ORM) et les réponses sont sérialisées avec orjson. Les listes sont
+paginées par curseur opaque sur la clé de tri.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import tuple_
+from sqlmodel import Session, select
+
+from ..config import get_settings
+from ..database import get_session
+from ..dependencies import require_user
+from ..models import Film, FilmTagLink, Review, Tag, User, WatchlistItem
+from ..services.aggregates import average_rating
+from ..services.catalogue import films_with_tags
+from ..services.stats import get_user_stats
+from ..services.users import CurrentUser
+from ..utils.pagination import decode_cursor, decode_datetime_cursor, encode_cursor, parse_fields
+
+
+router = APIRouter(prefix="/api/v1", tags=["api"], default_response_class=ORJSONResponse)
+settings = get_settings()
+
+FILM_COLUMNS = {
+    "id": Film.id,
+    "title": Film.title,
+    "overview": Film.overview,
+    "release_year": Film.release_year,
+    "poster_url": Film.poster_url,
+    "backdrop_url": Film.backdrop_url,
+    "runtime_minutes": Film.runtime_minutes,
+    "director": Film.director,
+    "country": Film.country,
+    "primary_genre": Film.primary_genre,
+    "review_count": Film.review_count,
+    "rating_sum": Film.rating_sum,
+}
+FILM_FIELDS = [name for name in FILM_COLUMNS if name != "rating_sum"] + ["avg_rating", "tags"]
+FILM_LIST_DEFAULT = ["id", "title", "release_year", "poster_url", "avg_rating", "review_count", "tags"]
+
+REVIEW_COLUMNS = {
+    "id": Review.id,
+    "rating": Review.rating,
+    "comment": Review.comment,
+    "created_at": Review.created_at,
+    "updated_at": Review.updated_at,
+    "user_id": Review.user_id,
+    "username": User.username,
+    "film_id": Review.film_id,
+    "film_title": Film.title,
+}
+FILM_REVIEW_FIELDS = ["id", "rating", "comment", "created_at", "updated_at", "user_id", "username"]
+MY_REVIEW_FIELDS = ["id", "rating", "comment", "created_at", "updated_at", "film_id", "film_title"]
+
+PageSize = Query(default=settings.default_page_size, ge=1, le=100)
+
+
+def _film_select(fields: List[str], *extra):
+    """`SELECT` des seules colonnes de `film` nécessaires aux champs demandés."""
+    names = {"id", "title"}
+    for name in fields:
+        if name == "avg_rating":
+            names.update(("rating_sum", "review_count"))
+        elif name in FILM_COLUMNS:
+            names.add(name)
+    columns = [FILM_COLUMNS[name].label(name) for name in FILM_COLUMNS if name in names]
+    return select(*columns, *extra)
+
+
+def _tags_by_film(session: Session, film_ids: List[int]) -> Dict[int, List[str]]:
+    """Noms des tags de plusieurs films, en une requête."""
+    tags: Dict[int, List[str]] = {film_id: [] for film_id in film_ids}
+    if not film_ids:
+        return tags
+    rows = session.exec(
+        select(FilmTagLink.film_id, Tag.name)
+        .join(Tag, Tag.id == FilmTagLink.tag_id)
+        .where(FilmTagLink.film_id.in_(film_ids))
+        .order_by(Tag.name)
+    ).all()
+    for film_id, name in rows:
+        tags[film_id].append(name)
+    return tags
+
+
+def _serialize_films(session: Session, rows, fields: List[str]) -> List[dict]:
+    mappings = [row._mapping for row in rows]
+    tags = _tags_by_film(session, [m["id"] for m in mappings]) if "tags" in fields else {}
+    items = []
+    for mapping in mappings:
+        item = {}
+        for name in fields:
+            if name == "avg_rating":
+                item[name] = average_rating(mapping["rating_sum"], mapping["review_count"])
+            elif name == "tags":
+                item[name] = tags[mapping["id"]]
+            else:
+                item[name] = mapping[name]
+        items.append(item)
+    return items
+
+
+def _page(rows: list, limit: int, cursor_of) -> tuple[list, Optional[str]]:
+    """Coupe la ligne sentinelle et calcule le curseur suivant."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(cursor_of(rows[-1]._mapping))
+
+
+@router.get("/films")
+def api_list_films(
+    q: Optional[str] = None,
+    tags: List[str] = Query(default_factory=list),
+    fields: Optional[str] = None,
+    limit: int = PageSize,
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_session),
+) -> ORJSONResponse:
+    """Catalogue trié par titre, filtrable par texte et par tags."""
+    selected = parse_fields(fields, FILM_FIELDS, FILM_LIST_DEFAULT)
+    stmt = _film_select(selected)
+    if q:
+        like = f"%{q.lower()}%"
+        stmt = stmt.where(Film.title.ilike(like) | Film.overview.ilike(like))
+    if tags:
+        stmt = stmt.where(Film.id.in_(films_with_tags(tags)))
+    after = decode_cursor(cursor, 2)
+    if after is not None:
+        stmt = stmt.where(tuple_(Film.title, Film.id) > tuple_(after[0], after[1]))
+    stmt = stmt.order_by(Film.title, Film.id).limit(limit + 1)
+
+    rows, next_cursor = _page(session.exec(stmt).all(), limit, lambda m: (m["title"], m["id"]))
+    return ORJSONResponse(
+        {"items": _serialize_films(session, rows, selected), "next_cursor": next_cursor}
+    )
+
+
+@router.get("/films/{film_id}")
+def api_film_detail(
+    film_id: int,
+    fields: Optional[str] = None,
+    session: Session = Depends(get_session),
+) -> ORJSONResponse:
+    """Fiche d'un film avec ses agrégats de notes."""
+    selected = parse_fields(fields, FILM_FIELDS, FILM_FIELDS)
+    row = session.exec(_film_select(selected).where(Film.id == film_id)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Film introuvable.")
+    return ORJSONResponse(_serialize_films(session, [row], selected)[0])
+
+
+@router.get("/films/{film_id}/reviews")
+def api_film_reviews(
+    film_id: int,
+    fields: Optional[str] = None,
+    limit: int = PageSize,
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_session),
+) -> ORJSONResponse:
+    """Avis d'un film, du plus récent au plus ancien."""
+    selected = parse_fields(fields, FILM_REVIEW_FIELDS, FILM_REVIEW_FIELDS)
+    stmt = (
+        select(*(REVIEW_COLUMNS[name].label(name) for name in FILM_REVIEW_FIELDS))
+        .join(User, User.id == Review.user_id)
+        .where(Review.film_id == film_id)
+    )
+    before = decode_datetime_cursor(cursor)
+    if before is not None:
+        stmt = stmt.where(tuple_(Review.created_at, Review.id) < tuple_(*before))
+    stmt = stmt.order_by(Review.created_at.desc(), Review.id.desc()).limit(limit + 1)
+
+    rows = session.exec(stmt).all()
+    if not rows and before is None and session.get(Film, film_id) is None:
+        raise HTTPException(status_code=404, detail="Film introuvable.")
+    rows, next_cursor = _page(rows, limit, lambda m: (m["created_at"], m["id"]))
+    items = [{name: row._mapping[name] for name in selected} for row in rows]
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
+
+
+@router.get("/me/reviews")
+def api_my_reviews(
+    fields: Optional[str] = None,
+    limit: int = PageSize,
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_session),
+    current_user: CurrentUser = Depends(require_user),
+) -> ORJSONResponse:
+    """Avis de l'utilisateur connecté, du plus récent au plus ancien."""
+    selected = parse_fields(fields, MY_REVIEW_FIELDS, MY_REVIEW_FIELDS)
+    stmt = (
+        select(*(REVIEW_COLUMNS[name].label(name) for name in MY_REVIEW_FIELDS))
+        .join(Film, Film.id == Review.film_id)
+        .where(Review.user_id == current_user.id)
+    )
+    before = decode_datetime_cursor(cursor)
+    if before is not None:
+        stmt = stmt.where(tuple_(Review.created_at, Review.id) < tuple_(*before))
+    stmt = stmt.order_by(Review.created_at.desc(), Review.id.desc()).limit(limit + 1)
+
+    rows, next_cursor = _page(session.exec(stmt).all(), limit, lambda m: (m["created_at"], m["id"]))
+    items = [{name: row._mapping[name] for name in selected} for row in rows]
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
+
+
+@router.get("/me/watchlist")
+def api_my_watchlist(
+    fields: Optional[str] = None,
+    limit: int = PageSize,
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_session),
+    current_user: CurrentUser = Depends(require_user),
+) -> ORJSONResponse:
+    """Watchlist de l'utilisateur connecté, par date d'ajout décroissante."""
+    selected = parse_fields(fields, FILM_FIELDS + ["added_at"], FILM_LIST_DEFAULT + ["added_at"])
+    stmt = (
+        _film_select(
+            selected,
+            WatchlistItem.id.label("item_id"),
+            WatchlistItem.created_at.label("added_at"),
+        )
+        .join(WatchlistItem, WatchlistItem.film_id == Film.id)
+        .where(WatchlistItem.user_id == current_user.id)
+    )
+    before = decode_datetime_cursor(cursor)
+    if before is not None:
+        stmt = stmt.where(tuple_(WatchlistItem.created_at, WatchlistItem.id) < tuple_(*before))
+    stmt = stmt.order_by(WatchlistItem.created_at.desc(), WatchlistItem.id.desc()).limit(limit + 1)
+
+    rows, next_cursor = _page(
+        session.exec(stmt).all(), limit, lambda m: (m["added_at"], m["item_id"])
+    )
+    return ORJSONResponse(
+        {"items": _serialize_films(session, rows, selected), "next_cursor": next_cursor}
+    )
+
+
+@router.get("/me/stats")
+def api_my_stats(
+    session: Session = Depends(get_session),
+    current_user: CurrentUser = Depends(require_user),
+) -> ORJSONResponse:
+    """Statistiques du profil de l'utilisateur connecté."""
+    stats = get_user_stats(session, current_user)
+    stats["genre_counts"] = [{"name": name, "count": count} for name, count in stats["genre_counts"]]
+    return ORJSONResponse(stats)
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 """Routes pour l'inscription et la connexion."""
 
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, Form, Request, Response, status
 from fastapi.responses import RedirectResponse
 from sqlmodel import Session, select
@@ -9,7 +11,8 @@ from sqlmodel import Session, select
 from ..database import get_session
 from ..dependencies import get_current_user
 from ..models import User
-from ..security import hash_password, verify_password
+from ..security import HashingBusyError, hash_password, verify_and_update_password
+from ..services.users import CurrentUser, find_user_by_email, invalidate_user
 from ..utils.flash import flash
 from ..web import template_context, templates
 
@@ -20,7 +23,7 @@ router = APIRouter(tags=["auth"])
 @router.get("/register")
 def register_form(
     request: Request,
-    current_user: User | None = Depends(get_current_user),
+    current_user: CurrentUser | None = Depends(get_current_user),
 ) -> Response:
     """Affiche le formulaire d'inscription."""
     if current_user:
@@ -59,7 +62,13 @@ def register_user(
         flash(request, "Ce nom d'utilisateur ou email est déjà pris.", "error")
         return RedirectResponse("/register", status_code=status.HTTP_303_SEE_OTHER)
 
-    user = User(username=username.strip(), email=email.strip().lower(), hashed_password=hash_password(password))
+    try:
+        hashed_password = hash_password(password)
+    except HashingBusyError:
+        flash(request, "Le service est très sollicité, réessayez dans quelques instants.", "error")
+        return RedirectResponse("/register", status_code=status.HTTP_303_SEE_OTHER)
+
+    user = User(username=username.strip(), email=email.strip().lower(), hashed_password=hashed_password)
     session.add(user)
     session.commit()
 
@@ -70,7 +79,7 @@ def register_user(
 @router.get("/login")
 def login_form(
     request: Request,
-    current_user: User | None = Depends(get_current_user),
+    current_user: CurrentUser | None = Depends(get_current_user),
 ) -> Response:
     """Affiche la page de connexion."""
     if current_user:
@@ -86,12 +95,31 @@ def login_user(
     session: Session = Depends(get_session),
 ) -> RedirectResponse:
     """Connexion utilisateur."""
-    user = session.exec(select(User).where(User.email == email.lower().strip())).first()
-    if not user or not verify_password(password, user.hashed_password):
+    user = find_user_by_email(session, email)
+    try:
+        valid, new_hash = (
+            verify_and_update_password(password, user.hashed_password) if user else (False, None)
+        )
+    except HashingBusyError:
+        flash(request, "Le service est très sollicité, réessayez dans quelques instants.", "error")
+        return RedirectResponse("/login", status_code=status.HTTP_303_SEE_OTHER)
+    if not valid:
         flash(request, "Identifiants invalides.", "error")
         return RedirectResponse("/login", status_code=status.HTTP_303_SEE_OTHER)
 
+    if new_hash:
+        # Paramètres de hachage modifiés depuis : on remplace le hash de manière transparente
+        user.hashed_password = new_hash
+        user.updated_at = datetime.utcnow()
+        session.add(user)
+        session.commit()
+        invalidate_user(user.id)
+
+    # Nouvel identifiant de session : celui d'avant la connexion est abandonné
+    request.session.regenerate()
     request.session["user_id"] = user.id
+    # Permet d'afficher l'en-tête des pages d'erreur sans requête SQL
+    request.session["username"] = user.username
     flash(request, f"Heureux de vous revoir, {user.username} !", "success")
     return RedirectResponse("/films", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -99,7 +127,9 @@ def login_user(
 @router.post("/logout")
 def logout_user(request: Request) -> RedirectResponse:
     """Déconnecte l'utilisateur."""
+    request.session.regenerate()
     request.session.pop("user_id", None)
+    request.session.pop("username", None)
     flash(request, "À bientôt !", "info")
     return RedirectResponse("/login", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -0,0 +1,48 @@
+"""Routes d'export en flux (CSV / NDJSON, gzip optionnel)."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends, Path, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from ..database import get_session
+from ..dependencies import require_user
+from ..services.exports import FORMATS, export_stream
+from ..services.users import CurrentUser
+
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+
+def _stream(engine: Engine, dataset: str, fmt: str, user_id: Optional[int], compress: bool) -> Iterator[bytes]:
+    # La session de la dépendance `get_session` est fermée avant l'envoi du
+    # corps de la réponse : le flux ouvre donc la sienne, sur la même base.
+    with Session(engine) as session:
+        yield from export_stream(session, dataset, fmt, user_id=user_id, compress=compress)
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: str = Path(..., regex="^(reviews|watchlist|films)$"),
+    format: str = Query(default="csv", regex="^(csv|ndjson)$"),
+    compress: bool = False,
+    session: Session = Depends(get_session),
+    current_user: CurrentUser = Depends(require_user),
+) -> StreamingResponse:
+    """Exporte ses avis, sa watchlist ou le catalogue complet."""
+    user_id = None if dataset == "films" else current_user.id
+    filename = f"lvn-{dataset}-{date.today().isoformat()}.{format}"
+    media_type = FORMATS[format]
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        _stream(session.get_bind(), dataset, format, user_id, compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
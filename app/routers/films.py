@@ -2,24 +2,58 @@ from __future__ import annotations
 
 """Routes liées aux films et aux notations."""
 
-from datetime import datetime
-from typing import List, Optional, Sequence
+from dataclasses import asdict, dataclass
+from typing import Iterator, List, Optional, Sequence
 
 from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, status
 from fastapi.responses import RedirectResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import exists, func, tuple_
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
+from ..config import get_settings
 from ..database import get_session
 from ..dependencies import get_current_user, require_user
-from ..models import Film, Review, Tag, User, WatchlistItem
-from ..services.watchlist import fetch_watchlist
+from ..models import Film, FilmTagLink, Review, Tag, User, WatchlistItem
+from ..services.aggregates import average_rating
+from ..services.autocomplete import autocomplete_titles
+from ..services.catalogue import films_with_tags, tag_names
+from ..services.reviews import ReviewInput, upsert_reviews
+from ..services.users import CurrentUser
+from ..services.watchlist import count_watchlist, fetch_watchlist_ids
 from ..utils.flash import flash
-from ..web import template_context, templates
+from ..utils.pagination import decode_datetime_cursor, encode_cursor
+from ..web import stream_template, template_context, templates
 
 
 router = APIRouter(prefix="/films", tags=["films"])
 
+settings = get_settings()
+
+MAX_BATCH_SIZE = 500
+# Films lus par lot pendant le rendu en streaming du catalogue
+CARD_BATCH_SIZE = 500
+# Longueur maximale du synopsis affiché sur une carte
+CARD_OVERVIEW_LENGTH = 300
+# Séparateur des noms de tags agrégés en SQL (caractère de contrôle, absent des noms)
+TAG_SEPARATOR = "\x1f"
+# Avis affichés par page sur la fiche d'un film
+REVIEWS_PAGE_SIZE = 20
+
+
+class ReviewBatchItem(BaseModel):
+    film_id: int
+    rating: int = Field(ge=1, le=5)
+    comment: str | None = Field(default=None, max_length=2000)
+
+
+class ReviewBatch(BaseModel):
+    """Avis à créer ou mettre à jour en une requête."""
+
+    reviews: list[ReviewBatchItem] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
 
 @router.get("/docs", include_in_schema=False)
 def redirect_docs() -> RedirectResponse:
@@ -40,36 +74,85 @@ def _apply_filters(statement, q: Optional[str], tags: List[str]):
             (Film.title.ilike(like)) | (Film.overview.ilike(like))
         )
     if tags:
-        statement = statement.join(Film.tags).where(Tag.name.in_(tags)).group_by(Film.id)
+        statement = statement.where(Film.id.in_(films_with_tags(tags)))
     return statement
 
 
-def _cards_payload(films: Sequence[Film], watchlist_ids: Optional[set[int]] = None):
+@dataclass(slots=True)
+class FilmCard:
+    """Ce qu'affiche une carte du catalogue, sans objet ORM ni colonne superflue."""
+
+    id: int
+    title: str
+    release_year: Optional[int]
+    poster_url: Optional[str]
+    overview: Optional[str]
+    tags: List[str]
+    avg_rating: Optional[float]
+    review_count: int
+    in_watchlist: bool
+
+
+def _card_statement(q: Optional[str], tags: List[str]):
+    # Noms des tags de chaque film agrégés dans la même requête
+    tag_list = (
+        select(func.aggregate_strings(Tag.name, TAG_SEPARATOR))
+        .join(FilmTagLink, FilmTagLink.tag_id == Tag.id)
+        .where(FilmTagLink.film_id == Film.id)
+        .correlate(Film)
+        .scalar_subquery()
+    )
+    stmt = select(
+        Film.id,
+        Film.title,
+        Film.release_year,
+        Film.poster_url,
+        # Un caractère de plus pour savoir s'il faut tronquer
+        func.substr(Film.overview, 1, CARD_OVERVIEW_LENGTH + 1).label("overview"),
+        Film.rating_sum,
+        Film.review_count,
+        tag_list.label("tags"),
+    ).order_by(Film.title)
+    return _apply_filters(stmt, q, tags)
+
+
+def _cards_payload(rows: Sequence, watchlist_ids: Optional[set[int]] = None) -> List[FilmCard]:
     watchlist_ids = watchlist_ids or set()
-    data = []
-    for film in films:
-        reviews = film.reviews or []
-        review_count = len(reviews)
-        avg_rating = round(sum(r.rating for r in reviews) / review_count, 1) if review_count else None
-        data.append(
-            {
-                "film": film,
-                "avg_rating": avg_rating,
-                "review_count": review_count,
-                "in_watchlist": film.id in watchlist_ids,
-            }
+    cards = []
+    for row in rows:
+        overview = row.overview
+        if overview and len(overview) > CARD_OVERVIEW_LENGTH:
+            overview = overview[:CARD_OVERVIEW_LENGTH].rstrip() + "…"
+        cards.append(
+            FilmCard(
+                row.id,
+                row.title,
+                row.release_year,
+                row.poster_url,
+                overview,
+                sorted(row.tags.split(TAG_SEPARATOR)) if row.tags else [],
+                average_rating(row.rating_sum, row.review_count),
+                row.review_count,
+                row.id in watchlist_ids,
+            )
         )
-    return data
+    return cards
 
 
-def _film_query(session: Session, q: Optional[str], tags: List[str]):
-    stmt = (
-        select(Film)
-        .options(selectinload(Film.tags), selectinload(Film.reviews))
-        .order_by(Film.title)
-    )
-    stmt = _apply_filters(stmt, q, tags)
-    return session.exec(stmt).all()
+def _iter_cards(engine: Engine, q: Optional[str], tags: List[str], watchlist_ids: set[int]) -> Iterator[FilmCard]:
+    # Consommé pendant l'envoi du corps, une fois la session de `get_session`
+    # fermée : le flux ouvre sa propre connexion (sur la même base) et lit les films par lots.
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=CARD_BATCH_SIZE).execute(_card_statement(q, tags))
+        for rows in result.partitions():
+            yield from _cards_payload(rows, watchlist_ids)
+
+
+def _catalogue_cards(session: Session, q: Optional[str], tags: List[str], watchlist_ids: set[int]):
+    """Cartes du catalogue : itérateur paresseux en streaming, liste sinon."""
+    if settings.template_streaming:
+        return _iter_cards(session.get_bind(), q, tags, watchlist_ids)
+    return _cards_payload(session.exec(_card_statement(q, tags)).all(), watchlist_ids)
 
 
 @router.get("")
@@ -78,22 +161,20 @@ def list_films(
     q: str | None = None,
     tags: List[str] = Query(default_factory=list),
     session: Session = Depends(get_session),
-    current_user: User | None = Depends(get_current_user),
+    current_user: CurrentUser | None = Depends(get_current_user),
 ):
     """Page d'index : liste des films avec filtres."""
-    films = _film_query(session, q, tags)
-    watchlist_films = fetch_watchlist(session, current_user)
-    watchlist_ids = {film.id for film in watchlist_films}
-    data = _cards_payload(films, watchlist_ids)
-    all_tags = session.exec(select(Tag).order_by(Tag.name)).all()
+    watchlist_ids = fetch_watchlist_ids(session, current_user)
+    data = _catalogue_cards(session, q, tags, watchlist_ids)
+    all_tags = tag_names(session)
 
-    return templates.TemplateResponse(
+    return stream_template(
         "films/index.html",
         template_context(
             request,
             current_user=current_user,
-            watchlist=watchlist_films,
             watchlist_ids=watchlist_ids,
+            watchlist_count=len(watchlist_ids),
             films=data,
             selected_query=q or "",
             selected_tags=tags,
@@ -108,67 +189,133 @@ def list_films_partial(
     q: str | None = None,
     tags: List[str] = Query(default_factory=list),
     session: Session = Depends(get_session),
-    current_user: User | None = Depends(get_current_user),
+    current_user: CurrentUser | None = Depends(get_current_user),
 ):
     """Rendu partiel utilisé pour la recherche dynamique."""
-    films = _film_query(session, q, tags)
-    watchlist_films = fetch_watchlist(session, current_user)
-    watchlist_ids = {film.id for film in watchlist_films}
-    data = _cards_payload(films, watchlist_ids)
-    return templates.TemplateResponse(
+    watchlist_ids = fetch_watchlist_ids(session, current_user)
+    data = _catalogue_cards(session, q, tags, watchlist_ids)
+    return stream_template(
         "films/_cards.html",
         {"request": request, "films": data, "watchlist_ids": watchlist_ids},
     )
 
 
+@router.get("/autocomplete")
+def autocomplete(
+    q: str = "",
+    limit: int = Query(8, ge=1, le=20),
+) -> list[dict]:
+    """Titres suggérés pendant la saisie (index en mémoire, sans requête SQL)."""
+    return [asdict(suggestion) for suggestion in autocomplete_titles(q, limit)]
+
+
+@router.post("/reviews/batch")
+def batch_reviews(
+    payload: ReviewBatch,
+    session: Session = Depends(get_session),
+    current_user: CurrentUser = Depends(require_user),
+) -> dict:
+    """Crée ou met à jour plusieurs avis en une seule transaction (API JSON)."""
+    result = upsert_reviews(
+        session,
+        current_user.id,
+        [ReviewInput(item.film_id, item.rating, item.comment) for item in payload.reviews],
+    )
+    session.commit()
+    return {
+        "success": True,
+        "saved": result.saved,
+        "unknown": result.unknown,
+        "removed_from_watchlist": result.removed_from_watchlist,
+    }
+
+
+def _reviews_page(session: Session, film_id: int, before) -> tuple[list, Optional[str]]:
+    """Une page d'avis du film, du plus récent au plus ancien, et le curseur suivant."""
+    stmt = (
+        select(Review.id, Review.rating, Review.comment, Review.created_at, User.username)
+        .join(User, User.id == Review.user_id)
+        .where(Review.film_id == film_id)
+    )
+    if before is not None:
+        stmt = stmt.where(tuple_(Review.created_at, Review.id) < tuple_(*before))
+    stmt = stmt.order_by(Review.created_at.desc(), Review.id.desc()).limit(REVIEWS_PAGE_SIZE + 1)
+    rows = session.exec(stmt).all()
+    if len(rows) <= REVIEWS_PAGE_SIZE:
+        return rows, None
+    rows = rows[:REVIEWS_PAGE_SIZE]
+    return rows, encode_cursor((rows[-1].created_at, rows[-1].id))
+
+
 @router.get("/{film_id}")
 def film_detail(
     film_id: int,
     request: Request,
+    cursor: str | None = None,
     session: Session = Depends(get_session),
-    current_user: User | None = Depends(get_current_user),
+    current_user: CurrentUser | None = Depends(get_current_user),
 ):
     """Page de détail d'un film."""
-    stmt = (
-        select(Film)
-        .where(Film.id == film_id)
-        .options(
-            selectinload(Film.tags),
-            selectinload(Film.reviews).selectinload(Review.user),
-        )
-    )
+    stmt = select(Film).where(Film.id == film_id).options(selectinload(Film.tags))
     film = session.exec(stmt).first()
     if not film:
         raise HTTPException(status_code=404, detail="Film introuvable.")
 
-    reviews = film.reviews or []
-    review_count = len(reviews)
-    avg_rating = round(sum(r.rating for r in reviews) / review_count, 1) if review_count else None
+    try:
+        before = decode_datetime_cursor(cursor)
+    except HTTPException:
+        # Lien de page HTML modifié ou périmé : première page plutôt qu'une erreur JSON
+        before = None
+    reviews, next_cursor = _reviews_page(session, film_id, before)
     user_review = None
     film_in_watchlist = None
-    watchlist_films = []
+    watchlist_count = None
     if current_user:
-        user_review = next((r for r in reviews if r.user_id == current_user.id), None)
-        watchlist_films = fetch_watchlist(session, current_user)
-        film_in_watchlist = any(f.id == film.id for f in watchlist_films)
+        user_review = session.exec(
+            select(Review).where(Review.user_id == current_user.id, Review.film_id == film_id)
+        ).first()
+        film_in_watchlist = session.exec(
+            select(
+                exists().where(WatchlistItem.user_id == current_user.id, WatchlistItem.film_id == film_id)
+            )
+        ).one()
+        watchlist_count = count_watchlist(session, current_user)
 
     return templates.TemplateResponse(
         "films/detail.html",
         template_context(
             request,
             current_user=current_user,
-            watchlist=watchlist_films,
-            watchlist_ids={f.id for f in watchlist_films},
+            watchlist_count=watchlist_count,
             film=film,
-            reviews=sorted(reviews, key=lambda r: r.created_at, reverse=True),
-            avg_rating=avg_rating,
-            review_count=review_count,
+            reviews=reviews,
+            next_cursor=next_cursor,
+            avg_rating=average_rating(film.rating_sum, film.review_count),
+            review_count=film.review_count,
             user_review=user_review,
             film_in_watchlist=film_in_watchlist,
         ),
     )
 
 
+@router.get("/{film_id}/reviews")
+def film_reviews_partial(
+    film_id: int,
+    request: Request,
+    cursor: str | None = None,
+    session: Session = Depends(get_session),
+):
+    """Page d'avis suivante, chargée par le lien « Plus d'avis » de la fiche."""
+    before = decode_datetime_cursor(cursor)
+    reviews, next_cursor = _reviews_page(session, film_id, before)
+    if not reviews and before is None and session.get(Film, film_id) is None:
+        raise HTTPException(status_code=404, detail="Film introuvable.")
+    return templates.TemplateResponse(
+        "films/_reviews.html",
+        {"request": request, "film_id": film_id, "reviews": reviews, "next_cursor": next_cursor},
+    )
+
+
 @router.post("/{film_id}/reviews")
 def submit_review(
     film_id: int,
@@ -176,45 +323,20 @@ def submit_review(
     rating: int = Form(..., ge=1, le=5),
     comment: str = Form(""),
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_user),
+    current_user: CurrentUser = Depends(require_user),
 ) -> RedirectResponse:
-    """Crée ou met à jour l'avis de l'utilisateur."""
-    film = session.get(Film, film_id)
-    if not film:
+    """Crée ou met à jour l'avis de l'utilisateur (une seule écriture atomique)."""
+    result = upsert_reviews(session, current_user.id, [ReviewInput(film_id, rating, comment)])
+    if result.unknown:
         raise HTTPException(status_code=404, detail="Film introuvable.")
+    session.commit()
 
-    review = session.exec(
-        select(Review).where(
-            (Review.user_id == current_user.id) & (Review.film_id == film_id)
-        )
-    ).first()
-
-    if review:
-        review.rating = rating
-        review.comment = comment.strip() or None
-        review.updated_at = datetime.utcnow()
-        flash(request, "Votre avis a été mis à jour.", "success")
-    else:
-        review = Review(
-            rating=rating,
-            comment=comment.strip() or None,
-            user_id=current_user.id,
-            film_id=film_id,
-        )
-        session.add(review)
+    if result.created:
         flash(request, "Merci pour votre avis !", "success")
-
-    # Auto-remove from watchlist if present
-    watchlist_item = session.exec(
-        select(WatchlistItem).where(
-            (WatchlistItem.user_id == current_user.id) & (WatchlistItem.film_id == film_id)
-        )
-    ).first()
-    if watchlist_item:
-        session.delete(watchlist_item)
-        flash(request, f"{film.title} a été retiré de votre watchlist.", "info")
-
-    session.commit()
+    else:
+        flash(request, "Votre avis a été mis à jour.", "success")
+    if result.removed_from_watchlist:
+        flash(request, f"{result.titles[film_id]} a été retiré de votre watchlist.", "info")
     return RedirectResponse(
         url=f"/films/{film_id}", status_code=status.HTTP_303_SEE_OTHER
     )
@@ -225,7 +347,7 @@ def toggle_watchlist(
     film_id: int,
     request: Request,
     session: Session = Depends(get_session),
-    current_user: User | None = Depends(get_current_user),
+    current_user: CurrentUser | None = Depends(get_current_user),
 ) -> RedirectResponse | dict:
     """Ajoute ou retire un film de la watchlist."""
     film = session.get(Film, film_id)
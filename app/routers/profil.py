@@ -2,83 +2,31 @@
 
 from __future__ import annotations
 
-from collections import Counter
+import io
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, File, Header, Query, Request, UploadFile, status
+from fastapi.responses import JSONResponse, RedirectResponse
 from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
 from ..database import get_session
 from ..dependencies import require_user
-from ..models import Film, Review, Tag, User
+from ..models import Film, Review
+from ..services.imports import import_ratings
+from ..services.stats import get_user_stats
+from ..services.users import CurrentUser
 from ..services.watchlist import fetch_watchlist
+from ..utils.flash import flash
 from ..web import template_context, templates
 
 
 router = APIRouter(prefix="/profil", tags=["profil"])
 
 
-def get_user_stats(session: Session, user: User) -> dict:
-    """Calcule les statistiques de l'utilisateur."""
-    # Récupérer tous les avis avec les films
-    stmt = (
-        select(Review)
-        .where(Review.user_id == user.id)
-        .options(selectinload(Review.film).selectinload(Film.tags))
-    )
-    reviews = session.exec(stmt).all()
-    
-    if not reviews:
-        return {
-            "total_films": 0,
-            "total_minutes": 0,
-            "total_hours": 0,
-            "avg_rating": None,
-            "favorite_genre": None,
-            "genre_counts": [],
-            "rating_distribution": {1: 0, 2: 0, 3: 0, 4: 0, 5: 0},
-        }
-    
-    # Nombre de films vus
-    total_films = len(reviews)
-    
-    # Minutes totales
-    total_minutes = sum(r.film.runtime_minutes or 0 for r in reviews)
-    total_hours = round(total_minutes / 60, 1)
-    
-    # Note moyenne donnée
-    avg_rating = round(sum(r.rating for r in reviews) / len(reviews), 1)
-    
-    # Distribution des notes
-    rating_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-    for r in reviews:
-        rating_distribution[r.rating] += 1
-    
-    # Genre préféré (basé sur les films notés 4-5)
-    genre_counter = Counter()
-    for review in reviews:
-        if review.film and review.film.tags:
-            for tag in review.film.tags:
-                genre_counter[tag.name] += 1
-    
-    genre_counts = genre_counter.most_common(5)
-    favorite_genre = genre_counts[0][0] if genre_counts else None
-    
-    return {
-        "total_films": total_films,
-        "total_minutes": total_minutes,
-        "total_hours": total_hours,
-        "avg_rating": avg_rating,
-        "favorite_genre": favorite_genre,
-        "genre_counts": genre_counts,
-        "rating_distribution": rating_distribution,
-    }
-
-
 def get_user_reviews(
     session: Session, 
-    user: User, 
+    user: CurrentUser, 
     search: Optional[str] = None,
     sort: str = "recent"
 ) -> list:
@@ -118,7 +66,7 @@ def profile_page(
     q: Optional[str] = None,
     sort: str = Query(default="recent"),
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_user),
+    current_user: CurrentUser = Depends(require_user),
 ):
     """Page de profil de l'utilisateur."""
     # Stats
@@ -151,3 +99,33 @@ def profile_page(
             current_sort=sort,
         ),
     )
+
+
+@router.post("/import", response_model=None)
+def import_ratings_csv(
+    request: Request,
+    file: UploadFile = File(...),
+    session: Session = Depends(get_session),
+    current_user: CurrentUser = Depends(require_user),
+    accept: str | None = Header(default=None),
+) -> RedirectResponse | JSONResponse:
+    """Importe des notes depuis un CSV (export Letterboxd), lu en flux."""
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        report = import_ratings(session, current_user.id, stream)
+    finally:
+        stream.detach()
+
+    if accept == "application/json":
+        return JSONResponse(content={"success": True, **report.as_dict()})
+
+    flash(
+        request,
+        f"Import terminé : {report.matched} film(s) noté(s), {report.unmatched} introuvable(s)"
+        f", {report.skipped} ligne(s) ignorée(s).",
+        "success" if report.matched else "info",
+    )
+    if report.unmatched_rows:
+        examples = ", ".join(title for title, _ in report.unmatched_rows[:5])
+        flash(request, f"Non trouvés dans le catalogue : {examples}…", "info")
+    return RedirectResponse(url="/profil", status_code=status.HTTP_303_SEE_OTHER)
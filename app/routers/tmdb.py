@@ -9,7 +9,9 @@ from sqlmodel import Session, select
 
 from ..database import get_session
 from ..dependencies import require_user
-from ..models import Film, Tag, User
+from ..models import Film, Tag
+from ..services.aggregates import primary_genre
+from ..services.catalogue import invalidate_catalogue
 from ..services.tmdb import (
     search_movies,
     get_movie_details,
@@ -17,6 +19,7 @@ from ..services.tmdb import (
     format_movie_for_display,
     extract_film_data,
 )
+from ..services.users import CurrentUser
 from ..utils.flash import flash
 from ..web import template_context, templates
 
@@ -43,7 +46,7 @@ def search_tmdb(
     q: str | None = None,
     page: int = Query(default=1, ge=1),
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_user),
+    current_user: CurrentUser = Depends(require_user),
 ):
     """Page de recherche de films sur TMDb."""
     results = []
@@ -88,7 +91,7 @@ def popular_tmdb(
     request: Request,
     page: int = Query(default=1, ge=1),
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_user),
+    current_user: CurrentUser = Depends(require_user),
 ):
     """Page des films populaires sur TMDb."""
     results = []
@@ -131,7 +134,7 @@ def import_from_tmdb(
     tmdb_id: int,
     request: Request,
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_user),
+    current_user: CurrentUser = Depends(require_user),
     accept: str | None = Header(default=None),
 ) -> Response:
     """Importe un film depuis TMDb vers la base locale."""
@@ -164,9 +167,11 @@ def import_from_tmdb(
         # Créer le film
         film = Film(**film_data)
         film.tags = tags
+        film.primary_genre = primary_genre(tag.name for tag in tags)
         session.add(film)
         session.commit()
         session.refresh(film)
+        invalidate_catalogue()
         
         flash(request, f"« {film.title} » a été ajouté avec succès !", "success")
         
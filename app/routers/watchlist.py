@@ -2,35 +2,53 @@ from __future__ import annotations
 
 """Routes dédiées à la watchlist."""
 
+import math
+
 from fastapi import APIRouter, Depends, Query, Request, status
 from fastapi.responses import RedirectResponse
+from pydantic import BaseModel, Field
 from sqlmodel import Session, select, delete
 
+from ..config import get_settings
 from ..database import get_session
 from ..dependencies import require_user
-from ..models import Film, User, WatchlistItem
-from ..services.watchlist import fetch_watchlist, fetch_watchlist_with_dates
+from ..models import Film, WatchlistItem
+from ..services.aggregates import average_rating
+from ..services.watchlist import (
+    add_to_watchlist,
+    count_watchlist,
+    fetch_watchlist_page,
+    remove_from_watchlist as remove_films_from_watchlist,
+)
+from ..services.users import CurrentUser
 from ..utils.flash import flash
-from ..web import template_context, templates
+from ..web import stream_template, template_context
 
 
 router = APIRouter(tags=["watchlist"])
+settings = get_settings()
+
+MAX_BATCH_SIZE = 500
+
+
+class WatchlistBatch(BaseModel):
+    """Films à ajouter et/ou retirer de la watchlist en une requête."""
+
+    add: list[int] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+    remove: list[int] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
 
 
-def _watchlist_cards_payload(watchlist_data: list, watchlist_ids: set[int]):
+def _watchlist_cards_payload(watchlist_data: list):
     """Build card data for watchlist view, including added_at date."""
     data = []
-    for film, watchlist_item in watchlist_data:
-        reviews = film.reviews or []
-        review_count = len(reviews)
-        avg_rating = round(sum(r.rating for r in reviews) / review_count, 1) if review_count else None
+    for film, added_at in watchlist_data:
         data.append(
             {
                 "film": film,
-                "avg_rating": avg_rating,
-                "review_count": review_count,
-                "in_watchlist": film.id in watchlist_ids,
-                "added_at": watchlist_item.created_at,
+                "avg_rating": average_rating(film.rating_sum, film.review_count),
+                "review_count": film.review_count,
+                "in_watchlist": True,
+                "added_at": added_at,
             }
         )
     return data
@@ -40,23 +58,32 @@ def _watchlist_cards_payload(watchlist_data: list, watchlist_ids: set[int]):
 def watchlist_page(
     request: Request,
     sort: str = Query(default="date", regex="^(date|title|year|genre)$"),
+    page: int = Query(default=1, ge=1),
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_user),
+    current_user: CurrentUser = Depends(require_user),
 ):
-    """Affiche la watchlist complète de l'utilisateur."""
-    watchlist_data = fetch_watchlist_with_dates(session, current_user, sort_by=sort)
+    """Affiche la watchlist de l'utilisateur, page par page."""
+    page_size = settings.default_page_size
+    total_count = count_watchlist(session, current_user)
+    total_pages = max(1, math.ceil(total_count / page_size))
+    page = min(page, total_pages)
+    watchlist_data = fetch_watchlist_page(
+        session, current_user, sort_by=sort, page=page, page_size=page_size
+    )
     watchlist_films = [film for film, _ in watchlist_data]
-    watchlist_ids = {film.id for film in watchlist_films}
-    cards = _watchlist_cards_payload(watchlist_data, watchlist_ids)
-    return templates.TemplateResponse(
+    cards = _watchlist_cards_payload(watchlist_data)
+    return stream_template(
         "films/watchlist.html",
         template_context(
             request,
             current_user=current_user,
             watchlist=watchlist_films,
-            watchlist_ids=watchlist_ids,
+            watchlist_ids={film.id for film in watchlist_films},
+            watchlist_count=total_count,
             films=cards,
             current_sort=sort,
+            current_page=page,
+            total_pages=total_pages,
         ),
     )
 
@@ -66,7 +93,7 @@ def remove_from_watchlist(
     film_id: int,
     request: Request,
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_user),
+    current_user: CurrentUser = Depends(require_user),
 ) -> RedirectResponse:
     """Retire un film de la watchlist (depuis la vue watchlist)."""
     film = session.get(Film, film_id)
@@ -92,7 +119,7 @@ def remove_from_watchlist(
 def clear_watchlist(
     request: Request,
     session: Session = Depends(get_session),
-    current_user: User = Depends(require_user),
+    current_user: CurrentUser = Depends(require_user),
 ) -> RedirectResponse:
     """Vide entièrement la watchlist de l'utilisateur."""
     statement = delete(WatchlistItem).where(WatchlistItem.user_id == current_user.id)
@@ -102,3 +129,20 @@ def clear_watchlist(
     flash(request, "Votre watchlist a été entièrement vidée.", "info")
     return RedirectResponse(url="/watchlist", status_code=status.HTTP_303_SEE_OTHER)
 
+
+@router.post("/watchlist/batch")
+def batch_watchlist(
+    payload: WatchlistBatch,
+    session: Session = Depends(get_session),
+    current_user: CurrentUser = Depends(require_user),
+) -> dict:
+    """Ajoute et retire plusieurs films en une seule transaction (API JSON)."""
+    removed = remove_films_from_watchlist(session, current_user.id, payload.remove)
+    added = add_to_watchlist(session, current_user.id, payload.add)
+    session.commit()
+    return {
+        "success": True,
+        "added": added,
+        "removed": removed,
+        "watchlist_count": count_watchlist(session, current_user),
+    }
@@ -1,17 +1,166 @@
-"""Outils liés à la sécurité (mots de passe)."""
+"""Outils liés à la sécurité (mots de passe).
+
+Un hachage pbkdf2 coûte plus de 100 ms de CPU. Pour ne pas affamer les autres
+requêtes lors d'un pic de connexions, les calculs partent dans un pool de
+processus dédié et borné. Un sémaphore limite le nombre de hachages en cours
+ou en attente ; au-delà du délai d'attente, `HashingBusyError` est levée.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
 
 from passlib.context import CryptContext
 
+from .config import get_settings
+
+
+settings = get_settings()
+
 # pbkdf2_sha256 ne dépend d'aucune extension système et évite les erreurs liées à bcrypt.
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# min/max = rounds : un hash calculé avec un autre nombre de tours est signalé
+# comme à mettre à jour, puis recalculé à la connexion suivante.
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=settings.password_hash_rounds,
+    pbkdf2_sha256__min_rounds=settings.password_hash_rounds,
+    pbkdf2_sha256__max_rounds=settings.password_hash_rounds,
+)
+
+T = TypeVar("T")
+
+
+class HashingBusyError(RuntimeError):
+    """Trop de hachages en attente : la requête doit être refusée."""
+
+
+class HashingStats:
+    """Compteurs du pool de hachage (temps d'attente et de calcul)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+        self.hash_seconds_total = 0.0
+
+    def reject(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def enter(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def leave(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def record(self, queue_seconds: float, hash_seconds: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.queue_seconds_total += queue_seconds
+            self.queue_seconds_max = max(self.queue_seconds_max, queue_seconds)
+            self.hash_seconds_total += hash_seconds
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "rejected": self.rejected,
+                "in_flight": self.in_flight,
+                "queue_seconds_avg": self.queue_seconds_total / self.calls if self.calls else 0.0,
+                "queue_seconds_max": self.queue_seconds_max,
+                "hash_seconds_avg": self.hash_seconds_total / self.calls if self.calls else 0.0,
+            }
+
+
+hashing_stats = HashingStats()
+
+_slots = threading.BoundedSemaphore(max(1, settings.password_hash_max_concurrency))
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    """Pool créé à la première utilisation ; `None` si désactivé (0 worker)."""
+    global _executor
+    if settings.password_hash_workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # `spawn` : ne pas dupliquer par fork un processus serveur multi-threadé
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _executor
+
+
+def shutdown_hashing_pool() -> None:
+    """Arrête les processus de hachage (à l'arrêt de l'application)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _timed(func: Callable[..., T], *args) -> Tuple[T, float, float]:
+    """Exécuté dans le worker : résultat, instant de début et durée du calcul."""
+    started = time.time()
+    result = func(*args)
+    return result, started, time.time() - started
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+def _run(func: Callable[..., T], *args) -> T:
+    submitted = time.time()
+    if not _slots.acquire(timeout=settings.password_hash_queue_timeout_seconds):
+        hashing_stats.reject()
+        raise HashingBusyError("Trop de calculs de mot de passe en attente.")
+    hashing_stats.enter()
+    try:
+        executor = _get_executor()
+        if executor is None:
+            result, started, duration = _timed(func, *args)
+        else:
+            result, started, duration = executor.submit(_timed, func, *args).result()
+        hashing_stats.record(max(0.0, started - submitted), duration)
+        return result
+    finally:
+        hashing_stats.leave()
+        _slots.release()
 
 
 def hash_password(password: str) -> str:
     """Retourne un hash sécurisé pour le mot de passe."""
-    return pwd_context.hash(password)
+    return _run(_hash, password)
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
     """Vérifie qu'un mot de passe correspond à son hash."""
-    return pwd_context.verify(password, hashed_password)
+    return _run(_verify, password, hashed_password)
+
 
+def verify_and_update_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Vérifie le mot de passe et retourne un nouveau hash si les paramètres ont changé."""
+    return _run(_verify_and_update, password, hashed_password)
@@ -0,0 +1,87 @@
+"""Agrégats dénormalisés stockés sur `Film` (notes et genre principal)."""
+
+from __future__ import annotations
+
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy import case, exists, func, update
+from sqlmodel import Session, select
+
+from ..models import Film, FilmTagLink, Review, Tag
+
+
+def average_rating(rating_sum: int, review_count: int) -> Optional[float]:
+    """Moyenne arrondie à une décimale, `None` si aucun avis."""
+    if not review_count:
+        return None
+    return round(rating_sum / review_count, 1)
+
+
+def primary_genre(tag_names: Iterable[str]) -> Optional[str]:
+    """Genre principal d'un film : le premier tag dans l'ordre alphabétique."""
+    names = [name for name in tag_names if name]
+    return min(names) if names else None
+
+
+def refresh_film_aggregates(session: Session, film_ids: Optional[Iterable[int]] = None) -> None:
+    """Recalcule `review_count` et `rating_sum` depuis la table des avis.
+
+    Sans `film_ids`, tout le catalogue est recalculé (utile après une migration).
+    """
+    count_subquery = (
+        select(func.count(Review.id)).where(Review.film_id == Film.id).scalar_subquery()
+    )
+    sum_subquery = (
+        select(func.coalesce(func.sum(Review.rating), 0))
+        .where(Review.film_id == Film.id)
+        .scalar_subquery()
+    )
+    statement = update(Film).values(review_count=count_subquery, rating_sum=sum_subquery)
+    if film_ids is not None:
+        ids = list(film_ids)
+        if not ids:
+            return
+        statement = statement.where(Film.id.in_(ids))
+    session.exec(statement.execution_options(synchronize_session=False))
+
+
+def apply_review_ratings(session: Session, user_id: int, ratings: Mapping[int, int]) -> None:
+    """Ajuste `review_count` et `rating_sum` pour les avis que `user_id` va écrire.
+
+    À exécuter juste avant l'écriture des avis, dans la même transaction et
+    films verrouillés : l'ancienne note de l'utilisateur (s'il en avait une)
+    est retirée de la somme et la nouvelle ajoutée, sans relire tous les avis
+    du film comme le fait `refresh_film_aggregates`.
+    """
+    if not ratings:
+        return
+    own_review = (Review.film_id == Film.id) & (Review.user_id == user_id)
+    previous_rating = select(Review.rating).where(own_review).scalar_subquery()
+    statement = (
+        update(Film)
+        .where(Film.id.in_(list(ratings)))
+        .values(
+            review_count=Film.review_count + case((exists().where(own_review), 0), else_=1),
+            rating_sum=Film.rating_sum
+            + case(dict(ratings), value=Film.id)
+            - func.coalesce(previous_rating, 0),
+        )
+    )
+    session.exec(statement.execution_options(synchronize_session=False))
+
+
+def refresh_primary_genres(session: Session, film_ids: Optional[Iterable[int]] = None) -> None:
+    """Recalcule `primary_genre` depuis les tags associés."""
+    genre_subquery = (
+        select(func.min(Tag.name))
+        .join(FilmTagLink, FilmTagLink.tag_id == Tag.id)
+        .where(FilmTagLink.film_id == Film.id)
+        .scalar_subquery()
+    )
+    statement = update(Film).values(primary_genre=genre_subquery)
+    if film_ids is not None:
+        ids = list(film_ids)
+        if not ids:
+            return
+        statement = statement.where(Film.id.in_(ids))
+    session.exec(statement.execution_options(synchronize_session=False))
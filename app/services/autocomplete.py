@@ -0,0 +1,381 @@
+"""Autocomplétion des titres de films, servie depuis un index en mémoire.
+
+Les titres sont normalisés (minuscules, accents retirés, ponctuation réduite à
+des espaces). Structures construites une fois par processus :
+
+- deux listes triées : les titres, et leurs suffixes commençant à chaque mot
+  suivant (« parrain » pour « le parrain »). Un préfixe y délimite un
+  intervalle par dichotomie ; un arbre de segments sur la popularité (nombre
+  d'avis au chargement) en extrait les meilleurs films sans parcourir tout
+  l'intervalle, même pour une seule lettre tapée ;
+- un index de trigrammes, pour tolérer les fautes de frappe quand les
+  préfixes ne suffisent pas. Seules les listes des trigrammes les plus rares
+  de la requête fournissent des candidats (filtrage par préfixe), et seuls
+  les plus prometteurs sont vérifiés.
+
+Le stockage repose sur des `array` (identifiants, années, popularité, arbres,
+listes de trigrammes) : quelques octets par entrée au lieu d'un objet Python.
+
+L'index est construit au démarrage, dans un thread, à partir de la base
+principale ; les recherches ne renvoient rien tant qu'il n'est pas prêt.
+Il suit la génération de l'espace de noms `catalogue` du cache : après un
+import (`invalidate_catalogue`), seuls les films plus récents que le dernier
+chargé sont lus, en tâche de fond eux aussi. Ils rejoignent une petite liste
+parcourue linéairement, fusionnée dans les listes triées quand elle dépasse
+`MERGE_THRESHOLD` entrées. Les titres modifiés et le classement par nombre
+d'avis ne sont rafraîchis que par la reconstruction complète, toutes les
+`TITLE_INDEX_REFRESH_SECONDS`.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from ..cache import cache
+from ..config import get_settings
+from ..database import get_engine
+from ..models import Film
+from .catalogue import CATALOGUE_NAMESPACE
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Part minimale des trigrammes de la requête présents dans le titre
+MIN_SIMILARITY = 0.5
+# Candidats approchés vérifiés au plus (les plus riches en trigrammes rares)
+MAX_FUZZY_CANDIDATES = 64
+# Entrées de listes de trigrammes lues au plus par recherche approchée (part du
+# catalogue), en commençant par les trigrammes les plus rares
+FUZZY_POSTING_BUDGET = 0.02
+# Taille de la liste des ajouts récents avant fusion dans les listes triées
+MERGE_THRESHOLD = 512
+
+_SEPARATORS = re.compile(r"[^0-9a-z]+")
+
+Row = Tuple[int, str, Optional[int], int]
+
+
+def normalize(text: str) -> str:
+    """`"L'Été meurtrier"` → `"l ete meurtrier"`."""
+    folded = text.casefold()
+    if not folded.isascii():
+        decomposed = unicodedata.normalize("NFKD", folded)
+        folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _SEPARATORS.sub(" ", folded).strip()
+
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = f" {normalized} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _suffixes(normalized: str) -> List[str]:
+    """Suffixes commençant aux mots qui suivent le premier."""
+    return [normalized[match.start() + 1 :] for match in re.finditer(" ", normalized)]
+
+
+@dataclass
+class Suggestion:
+    id: int
+    title: str
+    release_year: Optional[int]
+
+
+class _RankedKeys:
+    """Clés triées et arbre de segments du meilleur emplacement par intervalle."""
+
+    def __init__(self, entries: List[Tuple[str, int]], popularity: array) -> None:
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.slots = array("i", (slot for _, slot in entries))
+        self._popularity = popularity
+        self._size = 1 << max(1, len(entries) - 1).bit_length()
+        # Feuille `size + i` : position i ; nœud interne : position la plus populaire
+        tree = array("i", [-1]) * (2 * self._size)
+        tree[self._size : self._size + len(entries)] = array("i", range(len(entries)))
+        for node in range(self._size - 1, 0, -1):
+            tree[node] = self._better(tree[2 * node], tree[2 * node + 1])
+        self._tree = tree
+
+    def _better(self, left: int, right: int) -> int:
+        if left < 0 or (right >= 0 and self._popularity[self.slots[right]] > self._popularity[self.slots[left]]):
+            return right
+        return left
+
+    def _best(self, lo: int, hi: int) -> int:
+        """Position la plus populaire de `[lo, hi)`, en O(log n)."""
+        best = -1
+        lo += self._size
+        hi += self._size
+        while lo < hi:
+            if lo & 1:
+                best = self._better(best, self._tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = self._better(best, self._tree[hi])
+            lo >>= 1
+            hi >>= 1
+        return best
+
+    def top(self, prefix: str, limit: int, seen: Set[int]) -> List[int]:
+        """Jusqu'à `limit` emplacements (hors `seen`) dont une clé commence par `prefix`."""
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\x7f", lo)
+        heap: List[Tuple[int, int, int, int]] = []
+
+        def push(start: int, end: int) -> None:
+            if start < end:
+                position = self._best(start, end)
+                heapq.heappush(heap, (-self._popularity[self.slots[position]], position, start, end))
+
+        push(lo, hi)
+        found: List[int] = []
+        while heap and len(found) < limit:
+            _, position, start, end = heapq.heappop(heap)
+            slot = self.slots[position]
+            if slot not in seen:
+                seen.add(slot)
+                found.append(slot)
+            push(start, position)
+            push(position + 1, end)
+        return found
+
+
+class TitleIndex:
+    """Index des titres d'un processus ; lectures et ajouts sous verrou."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._reset()
+        # Génération de l'espace `catalogue` au dernier chargement
+        self.generation: Optional[int] = None
+        # Instant (monotone) de la dernière construction complète
+        self.built_at = 0.0
+        # Synchronisation en tâche de fond lancée (voir `warm_title_index`)
+        self.warming = False
+
+    def _reset(self) -> None:
+        # Colonnes indexées par emplacement (un par film)
+        self._ids = array("l")
+        self._years = array("h")
+        self._popularity = array("i")
+        self._titles: List[str] = []
+        self._normalized: List[str] = []
+        self._postings: Dict[str, array] = {}
+        self._heads = _RankedKeys([], self._popularity)
+        self._tails = _RankedKeys([], self._popularity)
+        # Ajouts récents pas encore fusionnés : (clé, emplacement, début de titre)
+        self._recent: List[Tuple[str, int, bool]] = []
+        self.max_id = 0
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _append(self, row: Row, postings: Dict[str, list]) -> Optional[int]:
+        film_id, title, release_year, popularity = row
+        normalized = normalize(title)
+        if not normalized:
+            return None
+        slot = len(self._ids)
+        self._ids.append(film_id)
+        self._years.append(release_year or 0)
+        self._popularity.append(popularity or 0)
+        self._titles.append(title)
+        self._normalized.append(normalized)
+        for gram in trigrams(normalized):
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array("i") if postings is self._postings else []
+            posting.append(slot)
+        self.max_id = max(self.max_id, film_id)
+        return slot
+
+    def _rebuild_keys(self) -> None:
+        heads = [(normalized, slot) for slot, normalized in enumerate(self._normalized)]
+        tails = [(key, slot) for slot, normalized in enumerate(self._normalized) for key in _suffixes(normalized)]
+        self._heads = _RankedKeys(heads, self._popularity)
+        self._tails = _RankedKeys(tails, self._popularity)
+        self._recent = []
+
+    def load(self, rows: Iterable[Row]) -> None:
+        """Construction complète depuis des lignes `(id, titre, année, popularité)`.
+
+        Construit à part puis substitué d'un bloc : pendant une reconstruction,
+        les recherches continuent sur l'ancien contenu.
+        """
+        fresh = TitleIndex()
+        postings: Dict[str, list] = {}
+        for row in rows:
+            fresh._append(row, postings)
+        fresh._postings = {gram: array("i", slots) for gram, slots in postings.items()}
+        fresh._rebuild_keys()
+        fresh.loaded = True
+        with self._lock:
+            for name in _CONTENT:
+                setattr(self, name, getattr(fresh, name))
+            self.built_at = time.monotonic()
+
+    def add(self, rows: Iterable[Row]) -> None:
+        """Ajout incrémental, fusionné dans les listes triées par paquets."""
+        with self._lock:
+            for row in rows:
+                slot = self._append(row, self._postings)
+                if slot is not None:
+                    normalized = self._normalized[slot]
+                    self._recent.append((normalized, slot, True))
+                    self._recent.extend((key, slot, False) for key in _suffixes(normalized))
+            if len(self._recent) > MERGE_THRESHOLD:
+                self._rebuild_keys()
+
+    def _recent_matches(self, query: str, head: bool, seen: Set[int]) -> List[int]:
+        slots = {slot for key, slot, is_head in self._recent if is_head == head and key.startswith(query)}
+        return sorted(slots - seen, key=lambda slot: -self._popularity[slot])
+
+    def _prefix_matches(self, query: str, limit: int) -> List[int]:
+        """Titres commençant par `query`, puis titres dont un mot suivant commence par `query`."""
+        seen: Set[int] = set()
+        ranked: List[int] = []
+        for keys, head in ((self._heads, True), (self._tails, False)):
+            if len(ranked) >= limit:
+                break
+            found = keys.top(query, limit - len(ranked), seen)
+            if self._recent:
+                found = sorted(found + self._recent_matches(query, head, seen), key=lambda slot: -self._popularity[slot])
+                seen.update(found)
+            ranked += found[: limit - len(ranked)]
+        return ranked
+
+    def _fuzzy_matches(self, query: str, limit: int) -> List[int]:
+        """Titres partageant au moins `MIN_SIMILARITY` des trigrammes de `query`."""
+        query_grams = trigrams(query)
+        required = math.ceil(MIN_SIMILARITY * len(query_grams))
+        budget = max(MAX_FUZZY_CANDIDATES, int(FUZZY_POSTING_BUDGET * len(self._ids)))
+        grams = sorted(query_grams, key=lambda gram: len(self._postings.get(gram, ())))
+        # Un titre qui partage `required` trigrammes en partage au moins un
+        # parmi les `len(grams) - required + 1` plus rares
+        hits: Counter = Counter()
+        for gram in grams[: len(grams) - required + 1]:
+            if budget <= 0:
+                break
+            posting = self._postings.get(gram, ())
+            hits.update(posting[:budget])
+            budget -= len(posting)
+        scores: Dict[int, float] = {}
+        for slot, _ in hits.most_common(MAX_FUZZY_CANDIDATES):
+            # Recherche de sous-chaînes : bien moins chère qu'un ensemble de trigrammes
+            padded = f" {self._normalized[slot]} "
+            shared = sum(gram in padded for gram in grams)
+            if shared >= required:
+                # Part de la requête retrouvée, puis proximité des longueurs
+                scores[slot] = shared / len(query_grams) + shared / (len(query_grams) + len(padded) - 2 - shared) / 10
+        return sorted(scores, key=lambda slot: (-scores[slot], -self._popularity[slot]))[:limit]
+
+    def search(self, text: str, limit: int = 8) -> List[Suggestion]:
+        """Meilleurs titres pour `text` : par préfixe, à défaut titres proches."""
+        query = normalize(text)
+        if not query:
+            return []
+        with self._lock:
+            ranked = self._prefix_matches(query, limit)
+            if not ranked and len(query) >= 3:
+                ranked = self._fuzzy_matches(query, limit)
+            return [Suggestion(self._ids[slot], self._titles[slot], self._years[slot] or None) for slot in ranked]
+
+
+# Attributs remplacés par une construction complète
+_CONTENT = (
+    "_ids", "_years", "_popularity", "_titles", "_normalized", "_postings",
+    "_heads", "_tails", "_recent", "max_id", "loaded",
+)
+
+title_index = TitleIndex()
+_sync_lock = threading.Lock()
+# Protège `TitleIndex.warming` : une seule synchronisation lancée à la fois
+_warming_lock = threading.Lock()
+
+
+def _rows(after_id: int = 0):
+    """Films lus sur la base principale.
+
+    Un réplica en retard ferait retenir la nouvelle génération du catalogue
+    sans les films importés : ils ne seraient plus jamais ajoutés.
+    """
+    statement = select(Film.id, Film.title, Film.release_year, Film.review_count).order_by(Film.id)
+    if after_id:
+        statement = statement.where(Film.id > after_id)
+    with Session(get_engine()) as session:
+        return session.exec(statement).all()
+
+
+def _rebuild_due(index: TitleIndex) -> bool:
+    """Reconstruction complète attendue : titres et popularité (nombre d'avis)
+    ne changent pas par ajout de films, seule une relecture les met à jour."""
+    period = settings.title_index_refresh_seconds
+    return not index.loaded or (period > 0 and time.monotonic() - index.built_at > period)
+
+
+def _stale(index: TitleIndex, generation: Optional[int]) -> bool:
+    return _rebuild_due(index) or (generation is not None and generation != index.generation)
+
+
+def sync_title_index(index: TitleIndex = title_index) -> TitleIndex:
+    """Charge l'index, ajoute les films importés depuis, le reconstruit périodiquement."""
+    generation = cache.generation(CATALOGUE_NAMESPACE)
+    if not _stale(index, generation):
+        return index
+    with _sync_lock:
+        if _rebuild_due(index):
+            index.load(_rows())
+        elif generation != index.generation:
+            index.add(_rows(index.max_id))
+        index.generation = generation
+    return index
+
+
+def _sync_in_background(index: TitleIndex) -> None:
+    try:
+        sync_title_index(index)
+    except Exception:
+        logger.exception("Synchronisation de l'index des titres impossible")
+    finally:
+        with _warming_lock:
+            index.warming = False
+
+
+def warm_title_index(index: TitleIndex = title_index) -> None:
+    """Synchronise l'index dans un thread, sauf si une synchronisation est en cours.
+
+    Appelée au démarrage, puis par les recherches qui voient l'index absent ou
+    périmé : aucune requête n'attend la construction.
+    """
+    with _warming_lock:
+        if index.warming:
+            return
+        index.warming = True
+    threading.Thread(target=_sync_in_background, args=(index,), name="title-index", daemon=True).start()
+
+
+def autocomplete_titles(text: str, limit: int = 8, index: TitleIndex = title_index) -> List[Suggestion]:
+    """Suggestions de l'index tel qu'il est ; aucune tant qu'il n'est pas chargé."""
+    if _stale(index, cache.generation(CATALOGUE_NAMESPACE)):
+        warm_title_index(index)
+    if not index.loaded:
+        return []
+    return index.search(text, limit)
@@ -0,0 +1,40 @@
+"""Données de catalogue partagées par toutes les pages (liste des tags)."""
+
+from __future__ import annotations
+
+from typing import List, Sequence
+
+from sqlmodel import Session, select
+
+from ..cache import cache
+from ..models import FilmTagLink, Tag
+
+
+CATALOGUE_NAMESPACE = "catalogue"
+
+
+def tag_names(session: Session) -> List[str]:
+    """Noms de tous les tags, triés, servis depuis le cache."""
+    return cache.get_or_set(
+        CATALOGUE_NAMESPACE,
+        "tag_names",
+        lambda: list(session.exec(select(Tag.name).order_by(Tag.name)).all()),
+    )
+
+
+def films_with_tags(names: Sequence[str]):
+    """Identifiants des films portant l'un des tags, pour `Film.id.in_(…)`.
+
+    Part des tags (index `ix_tag_name`, puis `ix_filmtaglink_tag_id_film_id`) :
+    le coût suit le nombre de films du tag, pas la taille du catalogue.
+    """
+    return (
+        select(FilmTagLink.film_id)
+        .join(Tag, Tag.id == FilmTagLink.tag_id)
+        .where(Tag.name.in_(names))
+    )
+
+
+def invalidate_catalogue() -> None:
+    """À appeler après la création de tags (import TMDb, scripts)."""
+    cache.invalidate(CATALOGUE_NAMESPACE)
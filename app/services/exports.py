@@ -0,0 +1,147 @@
+"""Exports CSV/NDJSON en flux des avis, watchlists et du catalogue.
+
+Les lignes sont lues par lots via un curseur côté serveur (`yield_per`) et
+encodées au fil de l'eau : la mémoire utilisée ne dépend pas du volume exporté.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import zlib
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import Float, cast, func
+from sqlmodel import Session, select
+
+from ..models import Film, Review, User, WatchlistItem
+
+
+DATASETS = ("reviews", "watchlist", "films")
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+BATCH_SIZE = 1000
+# Taille visée des morceaux envoyés au client / écrits sur disque
+CHUNK_SIZE = 64 * 1024
+
+
+def _dataset_statement(dataset: str, user_id: Optional[int]):
+    """Requête projetée d'un jeu de données ; `user_id=None` exporte tous les utilisateurs."""
+    if dataset == "reviews":
+        columns = [
+            Review.id.label("review_id"),
+            Review.film_id,
+            Film.title.label("film_title"),
+            Film.release_year,
+            Review.rating,
+            Review.comment,
+            Review.created_at,
+            Review.updated_at,
+        ]
+        if user_id is None:
+            columns[1:1] = [Review.user_id, User.username]
+        stmt = select(*columns).join(Film, Film.id == Review.film_id)
+        if user_id is None:
+            stmt = stmt.join(User, User.id == Review.user_id)
+        else:
+            stmt = stmt.where(Review.user_id == user_id)
+        return stmt.order_by(Review.id)
+    if dataset == "watchlist":
+        columns = [
+            WatchlistItem.film_id,
+            Film.title.label("film_title"),
+            Film.release_year,
+            WatchlistItem.created_at.label("added_at"),
+        ]
+        if user_id is None:
+            columns.insert(0, WatchlistItem.user_id)
+        stmt = select(*columns).join(Film, Film.id == WatchlistItem.film_id)
+        if user_id is not None:
+            stmt = stmt.where(WatchlistItem.user_id == user_id)
+        return stmt.order_by(WatchlistItem.id)
+    if dataset == "films":
+        avg_rating = func.round(
+            cast(Film.rating_sum, Float) / func.nullif(Film.review_count, 0), 1
+        )
+        return select(
+            Film.id,
+            Film.title,
+            Film.release_year,
+            Film.director,
+            Film.country,
+            Film.runtime_minutes,
+            Film.primary_genre,
+            Film.review_count,
+            avg_rating.label("avg_rating"),
+            Film.poster_url,
+            Film.overview,
+        ).order_by(Film.id)
+    raise ValueError(f"Jeu de données inconnu : {dataset}")
+
+
+def iter_rows(
+    session: Session, dataset: str, user_id: Optional[int] = None, batch_size: int = BATCH_SIZE
+) -> Tuple[List[str], Iterator[tuple]]:
+    """Retourne les noms de colonnes et un itérateur paresseux sur les lignes."""
+    stmt = _dataset_statement(dataset, user_id)
+    result = session.exec(
+        stmt.execution_options(stream_results=True, yield_per=batch_size)
+    )
+    return list(result.keys()), (tuple(row) for row in result)
+
+
+def encode_csv(columns: List[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    """Encode en CSV (UTF-8, en-tête inclus) par morceaux d'environ `CHUNK_SIZE`."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def encode_ndjson(columns: List[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    """Encode un objet JSON par ligne, par morceaux d'environ `CHUNK_SIZE`."""
+    chunk = bytearray()
+    for row in rows:
+        chunk += orjson.dumps(dict(zip(columns, row)))
+        chunk += b"\n"
+        if len(chunk) >= CHUNK_SIZE:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson}
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compresse un flux à la volée au format gzip."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(
+    session: Session,
+    dataset: str,
+    fmt: str = "csv",
+    user_id: Optional[int] = None,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """Flux d'octets prêt à écrire : lecture par lots, encodage, compression éventuelle."""
+    columns, rows = iter_rows(session, dataset, user_id)
+    chunks = ENCODERS[fmt](columns, rows)
+    return gzip_stream(chunks) if compress else chunks
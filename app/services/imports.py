@@ -0,0 +1,142 @@
+"""Import en masse de notes depuis un CSV externe (export Letterboxd et assimilés).
+
+Colonnes reconnues : `Name` (titre), `Year`, `Rating` (0.5 à 5, demi-étoiles
+acceptées) et, si présente, `Review` pour le commentaire. Le fichier est lu
+en flux et traité par lots : un `SELECT` indexé pour rapprocher titres et
+années du catalogue, puis une écriture groupée des avis par lot.
+"""
+
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from ..models import Film
+from .reviews import ReviewInput, upsert_reviews
+
+
+BATCH_SIZE = 500
+# Nombre maximal de lignes non rapprochées détaillées dans le rapport
+MAX_REPORTED_UNMATCHED = 200
+
+
+@dataclass
+class RatingRow:
+    title: str
+    year: Optional[int]
+    rating: int
+    comment: Optional[str] = None
+
+
+@dataclass
+class ImportReport:
+    """Bilan d'un import : lignes rapprochées, non rapprochées et ignorées."""
+
+    matched: int = 0
+    unmatched: int = 0
+    skipped: int = 0
+    removed_from_watchlist: int = 0
+    unmatched_rows: List[Tuple[str, Optional[int]]] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "matched": self.matched,
+            "unmatched": self.unmatched,
+            "skipped": self.skipped,
+            "removed_from_watchlist": self.removed_from_watchlist,
+            "unmatched_rows": [{"title": title, "year": year} for title, year in self.unmatched_rows],
+        }
+
+
+def _parse_rating(value: str) -> Optional[int]:
+    """Convertit une note sur 5 (demi-étoiles comprises) en entier de 1 à 5."""
+    try:
+        rating = float(value.replace(",", "."))
+    except (AttributeError, ValueError):
+        return None
+    if rating <= 0:
+        return None
+    return max(1, min(5, int(rating + 0.5)))
+
+
+def _parse_year(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def parse_ratings(stream: IO[str], report: ImportReport) -> Iterator[RatingRow]:
+    """Lit le CSV ligne à ligne ; les lignes sans titre ou sans note sont ignorées."""
+    for raw in csv.DictReader(stream):
+        title = (raw.get("Name") or raw.get("Title") or "").strip()
+        rating = _parse_rating(raw.get("Rating") or "")
+        if not title or rating is None:
+            report.skipped += 1
+            continue
+        comment = (raw.get("Review") or "").strip() or None
+        yield RatingRow(title=title, year=_parse_year(raw.get("Year")), rating=rating, comment=comment)
+
+
+def _batches(rows: Iterable[RatingRow], size: int) -> Iterator[List[RatingRow]]:
+    batch: List[RatingRow] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def match_films(session: Session, rows: List[RatingRow]) -> Dict[int, int]:
+    """Associe chaque ligne (par position) à un film du catalogue.
+
+    Une seule requête par lot, servie par l'index `(title, release_year)`. À
+    titre égal, l'année départage ; si l'une des deux années est inconnue, le
+    titre suffit lorsqu'il est unique dans le catalogue.
+    """
+    titles = {row.title for row in rows}
+    candidates: Dict[str, List[Tuple[int, Optional[int]]]] = {}
+    for film_id, title, year in session.exec(
+        select(Film.id, Film.title, Film.release_year).where(Film.title.in_(titles))
+    ).all():
+        candidates.setdefault(title, []).append((film_id, year))
+
+    matches: Dict[int, int] = {}
+    for position, row in enumerate(rows):
+        films = candidates.get(row.title, [])
+        same_year = [film_id for film_id, year in films if year == row.year]
+        if same_year:
+            matches[position] = same_year[0]
+        elif len(films) == 1 and (row.year is None or films[0][1] is None):
+            matches[position] = films[0][0]
+    return matches
+
+
+def import_ratings(
+    session: Session, user_id: int, stream: IO[str], batch_size: int = BATCH_SIZE
+) -> ImportReport:
+    """Importe les notes d'un CSV pour un utilisateur, un commit par lot."""
+    report = ImportReport()
+    for batch in _batches(parse_ratings(stream, report), batch_size):
+        matches = match_films(session, batch)
+        entries = [
+            ReviewInput(matches[position], row.rating, row.comment)
+            for position, row in enumerate(batch)
+            if position in matches
+        ]
+        for position, row in enumerate(batch):
+            if position not in matches:
+                report.unmatched += 1
+                if len(report.unmatched_rows) < MAX_REPORTED_UNMATCHED:
+                    report.unmatched_rows.append((row.title, row.year))
+        if entries:
+            result = upsert_reviews(session, user_id, entries)
+            report.matched += len(entries)
+            report.removed_from_watchlist += len(result.removed_from_watchlist)
+        session.commit()
+    return report
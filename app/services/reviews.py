@@ -0,0 +1,97 @@
+"""Écritures groupées sur les avis."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlmodel import Session, select
+
+from ..database import dialect_insert
+from ..models import Film, Review
+from .aggregates import apply_review_ratings
+from .watchlist import remove_from_watchlist
+
+
+@dataclass
+class ReviewInput:
+    """Avis à enregistrer pour un film."""
+
+    film_id: int
+    rating: int
+    comment: Optional[str] = None
+
+
+@dataclass
+class ReviewUpsertResult:
+    """Bilan d'une écriture groupée d'avis."""
+
+    saved: List[int] = field(default_factory=list)
+    # Parmi `saved`, les films que l'utilisateur n'avait pas encore notés
+    created: List[int] = field(default_factory=list)
+    unknown: List[int] = field(default_factory=list)
+    removed_from_watchlist: List[int] = field(default_factory=list)
+    titles: Dict[int, str] = field(default_factory=dict)
+
+
+def upsert_reviews(
+    session: Session, user_id: int, entries: Sequence[ReviewInput]
+) -> ReviewUpsertResult:
+    """Crée ou met à jour plusieurs avis d'un utilisateur dans la transaction courante.
+
+    Les films concernés sont verrouillés (`FOR UPDATE`, ignoré par SQLite qui
+    sérialise déjà les écritures), puis les avis sont écrits en un seul
+    `INSERT ... ON CONFLICT (user_id, film_id) DO UPDATE` et les films notés
+    quittent la watchlist par un seul `DELETE`. Les agrégats de notes sont
+    ajustés juste avant l'upsert, d'après l'ancienne note. Le verrou (sous
+    SQLite : cette première écriture) garantit que deux envois simultanés
+    du même avis ne comptent pas deux fois. Le commit reste à la charge de
+    l'appelant.
+    """
+    # En cas de doublon dans la requête, le dernier avis l'emporte.
+    by_film = {entry.film_id: entry for entry in entries}
+    result = ReviewUpsertResult()
+    if not by_film:
+        return result
+
+    result.titles = dict(
+        session.exec(
+            select(Film.id, Film.title)
+            .where(Film.id.in_(by_film))
+            .order_by(Film.id)
+            .with_for_update()
+        ).all()
+    )
+    known = set(result.titles)
+    result.unknown = sorted(set(by_film) - known)
+    result.saved = sorted(known)
+    if not known:
+        return result
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "film_id": film_id,
+            "rating": by_film[film_id].rating,
+            "comment": (by_film[film_id].comment or "").strip() or None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for film_id in result.saved
+    ]
+    apply_review_ratings(session, user_id, {film_id: by_film[film_id].rating for film_id in result.saved})
+    stmt = dialect_insert(session, Review).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "film_id"],
+        set_={
+            "rating": stmt.excluded.rating,
+            "comment": stmt.excluded.comment,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    ).returning(Review.film_id, Review.created_at)
+    # Un avis mis à jour garde sa date de création d'origine
+    result.created = sorted(film_id for film_id, created_at in session.exec(stmt).all() if created_at == now)
+    result.removed_from_watchlist = remove_from_watchlist(session, user_id, result.saved)
+    return result
@@ -0,0 +1,66 @@
+"""Statistiques utilisateur calculées par agrégats SQL."""
+
+from __future__ import annotations
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from ..models import Film, FilmTagLink, Review, Tag
+from .users import CurrentUser
+
+
+def get_user_stats(session: Session, user: CurrentUser) -> dict:
+    """Calcule les statistiques de l'utilisateur sans charger les avis ni les films."""
+    totals = session.exec(
+        select(
+            func.count(Review.id),
+            func.coalesce(func.sum(Film.runtime_minutes), 0),
+            func.avg(Review.rating),
+        )
+        .join(Film, Film.id == Review.film_id)
+        .where(Review.user_id == user.id)
+    ).one()
+    total_films, total_minutes, avg_rating = totals
+
+    rating_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+    if not total_films:
+        return {
+            "total_films": 0,
+            "total_minutes": 0,
+            "total_hours": 0,
+            "avg_rating": None,
+            "favorite_genre": None,
+            "genre_counts": [],
+            "rating_distribution": rating_distribution,
+        }
+
+    for rating, count in session.exec(
+        select(Review.rating, func.count(Review.id))
+        .where(Review.user_id == user.id)
+        .group_by(Review.rating)
+    ).all():
+        rating_distribution[rating] = count
+
+    # Genres les plus représentés parmi les films notés
+    genre_counts = [
+        (name, count)
+        for name, count in session.exec(
+            select(Tag.name, func.count(FilmTagLink.film_id).label("n"))
+            .join(FilmTagLink, FilmTagLink.tag_id == Tag.id)
+            .join(Review, Review.film_id == FilmTagLink.film_id)
+            .where(Review.user_id == user.id)
+            .group_by(Tag.name)
+            .order_by(func.count(FilmTagLink.film_id).desc(), Tag.name)
+            .limit(5)
+        ).all()
+    ]
+
+    return {
+        "total_films": total_films,
+        "total_minutes": total_minutes,
+        "total_hours": round(total_minutes / 60, 1),
+        "avg_rating": round(float(avg_rating), 1),
+        "favorite_genre": genre_counts[0][0] if genre_counts else None,
+        "genre_counts": genre_counts,
+        "rating_distribution": rating_distribution,
+    }
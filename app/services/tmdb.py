@@ -3,65 +3,67 @@
 from __future__ import annotations
 
 import os
+import time
 from typing import List, Optional
 
-import requests
-
+from ..cache import cache
 from ..config import get_settings
+from ..metrics import TMDB_DURATION, TMDB_ERRORS
 
 
 TMDB_API_KEY = os.environ.get("TMDB_API_KEY", "11c76c77d46467911ba085973c464050")
 BASE_URL = "https://api.themoviedb.org/3"
 IMAGE_BASE_URL = "https://image.tmdb.org/t/p/w500"
+# Les réponses TMDb changent peu : elles sont partagées entre réplicas une heure
+TMDB_CACHE_TTL_SECONDS = 3600
 
 
 settings = get_settings()
 
 
+def _get(path: str, endpoint: str, **params) -> dict:
+    # `requests` coûte ~100 ms à l'import : il n'est chargé qu'au premier appel
+    import requests
+
+    started = time.perf_counter()
+    try:
+        resp = requests.get(
+            f"{BASE_URL}{path}",
+            params={"api_key": TMDB_API_KEY, "language": "fr-FR", **params},
+            timeout=settings.api_timeout_seconds,
+        )
+        resp.raise_for_status()
+        return resp.json()
+    except Exception:
+        TMDB_ERRORS.labels(endpoint).inc()
+        raise
+    finally:
+        TMDB_DURATION.labels(endpoint).observe(time.perf_counter() - started)
+
+
+def _cached(key: str, fetch) -> dict:
+    return cache.get_or_set("tmdb", key, fetch, ttl=TMDB_CACHE_TTL_SECONDS)
+
+
 def search_movies(query: str, page: int = 1) -> dict:
     """Recherche des films par titre sur TMDb."""
-    resp = requests.get(
-        f"{BASE_URL}/search/movie",
-        params={
-            "api_key": TMDB_API_KEY,
-            "query": query,
-            "language": "fr-FR",
-            "page": page,
-        },
-        timeout=settings.api_timeout_seconds,
+    return _cached(
+        f"search:{page}:{query.strip().lower()}",
+        lambda: _get("/search/movie", "search", query=query, page=page),
     )
-    resp.raise_for_status()
-    return resp.json()
 
 
 def get_movie_details(tmdb_id: int) -> dict:
     """Récupère les détails complets d'un film depuis TMDb."""
-    resp = requests.get(
-        f"{BASE_URL}/movie/{tmdb_id}",
-        params={
-            "api_key": TMDB_API_KEY,
-            "language": "fr-FR",
-            "append_to_response": "credits",
-        },
-        timeout=settings.api_timeout_seconds,
+    return _cached(
+        f"movie:{tmdb_id}",
+        lambda: _get(f"/movie/{tmdb_id}", "details", append_to_response="credits"),
     )
-    resp.raise_for_status()
-    return resp.json()
 
 
 def get_popular_movies(page: int = 1) -> dict:
     """Récupère les films populaires."""
-    resp = requests.get(
-        f"{BASE_URL}/movie/popular",
-        params={
-            "api_key": TMDB_API_KEY,
-            "language": "fr-FR",
-            "page": page,
-        },
-        timeout=settings.api_timeout_seconds,
-    )
-    resp.raise_for_status()
-    return resp.json()
+    return _cached(f"popular:{page}", lambda: _get("/movie/popular", "popular", page=page))
 
 
 def format_movie_for_display(movie: dict) -> dict:
@@ -0,0 +1,79 @@
+"""Lecture des utilisateurs avec un petit cache à durée de vie courte.
+
+`get_current_user` est appelé à chaque requête (y compris chaque frappe de la
+recherche dynamique). Les champs de profil de l'utilisateur (jamais le hash du
+mot de passe : le cache peut être un Redis partagé) sont gardés quelques
+secondes dans le cache applicatif. Servi depuis le cache, l'utilisateur est un
+`UserSnapshot` en lecture seule, détaché de toute session : il ne peut pas être
+réécrit en base par erreur. Pour modifier un utilisateur, le relire avec
+`session.get(User, …)`, puis appeler `invalidate_user`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Optional, Union
+
+from sqlmodel import Session, select
+
+from ..cache import cache
+from ..config import get_settings
+from ..models import User
+
+
+settings = get_settings()
+
+# Renommé quand la forme des entrées change : les anciennes ne sont jamais relues
+USER_NAMESPACE = "user-profile"
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Champs de profil d'un utilisateur, tels que conservés dans le cache."""
+
+    id: int
+    username: str
+    email: str
+    bio: Optional[str]
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(user.id, user.username, user.email, user.bio, user.created_at)
+
+
+# Utilisateur de la requête : entité ORM, ou instantané servi par le cache.
+# Seuls les champs de `UserSnapshot` sont garantis ; pas de `session.add`.
+CurrentUser = Union[User, UserSnapshot]
+
+
+def get_user(session: Session, user_id: int) -> Optional[CurrentUser]:
+    """Équivalent de `session.get(User, user_id)`, servi depuis le cache si possible."""
+    ttl = settings.user_cache_ttl_seconds
+    if ttl <= 0:
+        return session.get(User, user_id)
+
+    data = cache.get(USER_NAMESPACE, str(user_id))
+    if data is not None:
+        return UserSnapshot(**{**data, "created_at": datetime.fromisoformat(data["created_at"])})
+
+    user = session.get(User, user_id)
+    if user is not None:
+        data = asdict(UserSnapshot.from_user(user))
+        cache.set(USER_NAMESPACE, str(user_id), {**data, "created_at": user.created_at.isoformat()}, ttl)
+    return user
+
+
+def find_user_by_email(session: Session, email: str) -> Optional[User]:
+    """Utilisateur d'une adresse email (connexion), insensible à la casse saisie."""
+    return session.exec(select(User).where(User.email == email.lower().strip())).first()
+
+
+def invalidate_user(user_id: int) -> None:
+    """Retire un utilisateur du cache (profil ou mot de passe modifié)."""
+    cache.delete(USER_NAMESPACE, str(user_id))
+
+
+def clear_user_cache() -> None:
+    cache.invalidate(USER_NAMESPACE)
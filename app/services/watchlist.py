@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
-from typing import List, Optional, Tuple
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
 
+from sqlalchemy import delete, func, literal
 from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
-from ..models import Film, Tag, User, WatchlistItem
+from ..database import dialect_insert
+from ..models import Film, WatchlistItem
+from .users import CurrentUser
 
 
-def fetch_watchlist(session: Session, user: Optional[User]) -> List[Film]:
+def fetch_watchlist(session: Session, user: Optional[CurrentUser]) -> List[Film]:
     """Retourne la liste des films ajoutés par l'utilisateur."""
     if not user:
         return []
@@ -24,31 +28,88 @@ def fetch_watchlist(session: Session, user: Optional[User]) -> List[Film]:
     return session.exec(stmt).all()
 
 
-def fetch_watchlist_with_dates(
-    session: Session, user: Optional[User], sort_by: str = "date"
-) -> List[Tuple[Film, WatchlistItem]]:
-    """Retourne les films de la watchlist avec leurs métadonnées (date d'ajout, etc.)."""
+def fetch_watchlist_ids(session: Session, user: Optional[CurrentUser]) -> Set[int]:
+    """Identifiants des films de la watchlist, sans charger les films ni leurs tags."""
+    if not user:
+        return set()
+    return set(session.exec(select(WatchlistItem.film_id).where(WatchlistItem.user_id == user.id)).all())
+
+
+def count_watchlist(session: Session, user: Optional[CurrentUser]) -> int:
+    """Nombre de films dans la watchlist, sans charger les films."""
+    if not user:
+        return 0
+    stmt = select(func.count(WatchlistItem.id)).where(WatchlistItem.user_id == user.id)
+    return session.exec(stmt).one()
+
+
+def fetch_watchlist_page(
+    session: Session,
+    user: Optional[CurrentUser],
+    sort_by: str = "date",
+    page: int = 1,
+    page_size: int = 24,
+) -> List[Tuple[Film, datetime]]:
+    """Retourne une page de la watchlist : couples (film, date d'ajout).
+
+    Le tri et la pagination sont faits en base. Le tri par genre s'appuie sur
+    `Film.primary_genre` (précalculé) : une ligne par film, quel que soit le nombre
+    de tags. Seuls les tags des films de la page sont chargés.
+    """
     if not user:
         return []
     stmt = (
-        select(WatchlistItem, Film)
-        .join(Film)
+        select(Film, WatchlistItem.created_at)
+        .join(WatchlistItem, WatchlistItem.film_id == Film.id)
         .where(WatchlistItem.user_id == user.id)
-        .options(selectinload(Film.tags), selectinload(Film.reviews))
+        .options(selectinload(Film.tags))
     )
-    
-    # Apply sorting
+
     if sort_by == "title":
         stmt = stmt.order_by(Film.title.asc())
     elif sort_by == "year":
-        stmt = stmt.order_by(Film.release_year.desc().nullslast())
+        stmt = stmt.order_by(Film.release_year.desc().nullslast(), Film.title.asc())
     elif sort_by == "genre":
-        # Sort by first tag name alphabetically
-        stmt = stmt.outerjoin(Tag, Film.tags).order_by(Tag.name.asc().nullslast(), Film.title.asc())
+        stmt = stmt.order_by(Film.primary_genre.asc().nullslast(), Film.title.asc())
     else:  # default: date (most recent first)
         stmt = stmt.order_by(WatchlistItem.created_at.desc())
-    
-    results = session.exec(stmt).all()
-    # Return as list of (film, watchlist_item) tuples
-    return [(film, item) for item, film in results]
+    # Départage stable pour que les pages ne se chevauchent pas
+    stmt = stmt.order_by(WatchlistItem.id.desc())
+
+    stmt = stmt.offset((page - 1) * page_size).limit(page_size)
+    return [(film, added_at) for film, added_at in session.exec(stmt).all()]
 
+
+def add_to_watchlist(session: Session, user_id: int, film_ids: Iterable[int]) -> List[int]:
+    """Ajoute plusieurs films en un seul `INSERT ... SELECT ... ON CONFLICT DO NOTHING`.
+
+    Les identifiants inconnus sont ignorés par le `SELECT` sur `film`. Retourne
+    les films réellement ajoutés (ceux déjà présents ne sont pas renvoyés).
+    """
+    ids = sorted(set(film_ids))
+    if not ids:
+        return []
+    now = datetime.utcnow()
+    source = select(
+        literal(now), literal(now), literal(user_id), Film.id
+    ).where(Film.id.in_(ids))
+    stmt = (
+        dialect_insert(session, WatchlistItem)
+        .from_select(["created_at", "updated_at", "user_id", "film_id"], source)
+        .on_conflict_do_nothing(index_elements=["user_id", "film_id"])
+        .returning(WatchlistItem.film_id)
+    )
+    return sorted(session.exec(stmt).scalars().all())
+
+
+def remove_from_watchlist(session: Session, user_id: int, film_ids: Iterable[int]) -> List[int]:
+    """Retire plusieurs films en un seul `DELETE`. Retourne les films retirés."""
+    ids = sorted(set(film_ids))
+    if not ids:
+        return []
+    stmt = (
+        delete(WatchlistItem)
+        .where(WatchlistItem.user_id == user_id, WatchlistItem.film_id.in_(ids))
+        .returning(WatchlistItem.film_id)
+    )
+    return sorted(session.exec(stmt).scalars().all())
@@ -0,0 +1,274 @@
+"""Sessions HTTP avec écriture paresseuse du cookie et stockage côté serveur.
+
+Remplace `starlette.middleware.sessions.SessionMiddleware`, qui re-signe et
+renvoie le cookie à chaque réponse dès que la session n'est pas vide. Ici, le
+cookie n'est émis que si la session a réellement changé (ou s'il approche de
+son expiration). Trois stockages sont disponibles (`SESSION_BACKEND`) :
+
+- `cookie` : données signées dans le cookie, comme avant (défaut) ;
+- `memory` : données en mémoire du processus, le cookie ne porte qu'un
+  identifiant opaque (une seule instance / un seul worker) ;
+- `database` : table `websession`, partagée par tous les workers et réplicas.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+import typing
+from base64 import b64decode, b64encode
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import anyio
+import itsdangerous
+import orjson
+from itsdangerous.exc import BadSignature
+from sqlmodel import Session, delete, select
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .models import WebSession
+
+
+_MISSING = object()
+
+
+class SessionData(dict):
+    """Dictionnaire de session qui retient s'il a été modifié.
+
+    Seules les écritures de premier niveau sont détectées : une liste stockée en
+    session doit être réaffectée (`session[key] = valeur`) après modification.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.modified = False
+        self.regenerated = False
+
+    def regenerate(self) -> None:
+        """Change l'identifiant de session à la réponse (connexion, déconnexion).
+
+        L'ancienne entrée est supprimée du stockage : un identifiant connu avant
+        la connexion (fixation de session) ne donne pas accès au compte. Sans
+        effet avec le stockage `cookie`, qui n'a pas d'identifiant.
+        """
+        self.regenerated = True
+        self.modified = True
+
+    def __setitem__(self, key, value) -> None:
+        self.modified = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key) -> None:
+        self.modified = True
+        super().__delitem__(key)
+
+    def pop(self, key, default=_MISSING):
+        if key in self:
+            self.modified = True
+            return super().pop(key)
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def popitem(self):
+        self.modified = True
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.modified = True
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs) -> None:
+        self.modified = True
+        super().update(*args, **kwargs)
+
+    def clear(self) -> None:
+        if self:
+            self.modified = True
+        super().clear()
+
+
+class MemorySessionStore:
+    """Sessions en mémoire du processus (développement, instance unique)."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 100_000) -> None:
+        self._data: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def load(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._data.get(session_id)
+        if entry is None or entry[0] < time.time():
+            return None
+        return orjson.loads(entry[1])
+
+    def save(self, session_id: str, data: dict, max_age: int) -> None:
+        with self._lock:
+            if len(self._data) >= self._max_entries and session_id not in self._data:
+                self._data.pop(next(iter(self._data)))
+            self._data[session_id] = (time.time() + max_age, orjson.dumps(data))
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._data.pop(session_id, None)
+
+
+class DatabaseSessionStore:
+    """Sessions dans la table `websession`, partagées entre réplicas."""
+
+    blocking = True
+    # Purge des sessions expirées toutes les N écritures
+    purge_every = 500
+
+    def __init__(self, engine=None) -> None:
+        self._writes = 0
+        # Base principale par défaut, résolue au premier accès
+        self._bind = engine
+
+    def _engine(self):
+        from .database import get_engine
+
+        return self._bind or get_engine()
+
+    def load(self, session_id: str) -> Optional[dict]:
+        with Session(self._engine()) as session:
+            row = session.exec(
+                select(WebSession.data).where(
+                    WebSession.id == session_id, WebSession.expires_at > datetime.utcnow()
+                )
+            ).first()
+        return orjson.loads(row) if row else None
+
+    def save(self, session_id: str, data: dict, max_age: int) -> None:
+        from .database import dialect_insert
+
+        expires_at = datetime.utcnow() + timedelta(seconds=max_age)
+        payload = orjson.dumps(data).decode()
+        with Session(self._engine()) as session:
+            stmt = dialect_insert(session, WebSession).values(
+                id=session_id, data=payload, expires_at=expires_at
+            )
+            session.exec(
+                stmt.on_conflict_do_update(
+                    index_elements=["id"],
+                    set_={"data": stmt.excluded.data, "expires_at": stmt.excluded.expires_at},
+                )
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                session.exec(delete(WebSession).where(WebSession.expires_at < datetime.utcnow()))
+            session.commit()
+
+    def delete(self, session_id: str) -> None:
+        with Session(self._engine()) as session:
+            session.exec(delete(WebSession).where(WebSession.id == session_id))
+            session.commit()
+
+
+SESSION_STORES = {"memory": MemorySessionStore, "database": DatabaseSessionStore}
+
+
+class ServerSessionMiddleware:
+    """Middleware de session à écriture paresseuse (voir la docstring du module)."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        secret_key: str,
+        session_cookie: str = "session",
+        max_age: int = 14 * 24 * 60 * 60,
+        backend: str = "cookie",
+        path: str = "/",
+        same_site: typing.Literal["lax", "strict", "none"] = "lax",
+        https_only: bool = False,
+    ) -> None:
+        self.app = app
+        self.signer = itsdangerous.TimestampSigner(str(secret_key))
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.store = SESSION_STORES[backend]() if backend != "cookie" else None
+        self.path = path
+        self.security_flags = "httponly; samesite=" + same_site
+        if https_only:
+            self.security_flags += "; secure"
+
+    async def _call_store(self, method, *args):
+        if self.store.blocking:
+            return await anyio.to_thread.run_sync(method, *args)
+        return method(*args)
+
+    async def _load(self, cookie: Optional[str]) -> Tuple[SessionData, Optional[str], bool]:
+        """Retourne (session, identifiant, à rafraîchir)."""
+        if not cookie:
+            return SessionData(), None, False
+        try:
+            value, signed_at = self.signer.unsign(
+                cookie.encode("utf-8"), max_age=self.max_age, return_timestamp=True
+            )
+        except BadSignature:
+            return SessionData(), None, False
+        # À mi-vie, le cookie est réémis pour prolonger une session active
+        stale = (time.time() - signed_at.timestamp()) > self.max_age / 2
+        if self.store is None:
+            return SessionData(orjson.loads(b64decode(value))), None, stale
+        session_id = value.decode("utf-8")
+        data = await self._call_store(self.store.load, session_id)
+        if data is None:
+            return SessionData(), None, False
+        return SessionData(data), session_id, stale
+
+    def _cookie_header(self, value: Optional[str]) -> str:
+        if value is None:
+            return (
+                f"{self.session_cookie}=null; path={self.path}; "
+                f"expires=Thu, 01 Jan 1970 00:00:00 GMT; {self.security_flags}"
+            )
+        return (
+            f"{self.session_cookie}={value}; path={self.path}; "
+            f"Max-Age={self.max_age}; {self.security_flags}"
+        )
+
+    async def _persist(self, session: SessionData, session_id: Optional[str], had_cookie: bool) -> Optional[str]:
+        """Enregistre la session et retourne l'en-tête `Set-Cookie` éventuel."""
+        if session.regenerated and session_id is not None:
+            await self._call_store(self.store.delete, session_id)
+            session_id = None
+
+        if not session:
+            if session_id is not None:
+                await self._call_store(self.store.delete, session_id)
+            return self._cookie_header(None) if had_cookie else None
+
+        if self.store is None:
+            payload = b64encode(orjson.dumps(dict(session)))
+            return self._cookie_header(self.signer.sign(payload).decode("utf-8"))
+
+        new_id = session_id or secrets.token_urlsafe(32)
+        await self._call_store(self.store.save, new_id, dict(session), self.max_age)
+        return self._cookie_header(self.signer.sign(new_id.encode("utf-8")).decode("utf-8"))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        cookie = HTTPConnection(scope).cookies.get(self.session_cookie)
+        session, session_id, stale = await self._load(cookie)
+        scope["session"] = session
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and (session.modified or (stale and session)):
+                header = await self._persist(session, session_id, had_cookie=cookie is not None)
+                if header:
+                    MutableHeaders(scope=message).append("Set-Cookie", header)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -56,6 +56,98 @@ document.addEventListener("DOMContentLoaded", () => {
     filtersForm.addEventListener("change", runSearch);
   }
 
+  // Suggestions de titres : accès direct à la fiche sans attendre les cartes
+  const searchInput = filtersForm?.querySelector('input[name="q"]');
+  const suggestions = document.getElementById("title-suggestions");
+  if (searchInput && suggestions) {
+    let active = -1;
+    const links = () => suggestions.querySelectorAll("a");
+    const hideSuggestions = () => {
+      suggestions.hidden = true;
+      active = -1;
+    };
+    const highlight = (index) => {
+      links().forEach((link, i) => link.classList.toggle("active", i === index));
+      active = index;
+    };
+
+    const fetchSuggestions = debounce(() => {
+      const query = searchInput.value.trim();
+      if (!query) {
+        hideSuggestions();
+        return;
+      }
+      fetch(`/films/autocomplete?${new URLSearchParams({ q: query, limit: 8 })}`)
+        .then((response) => response.json())
+        .then((films) => {
+          if (searchInput.value.trim() !== query) return;
+          suggestions.replaceChildren(
+            ...films.map((film) => {
+              const item = document.createElement("li");
+              const link = document.createElement("a");
+              link.href = `/films/${film.id}`;
+              link.textContent = film.title;
+              if (film.release_year) {
+                const year = document.createElement("small");
+                year.textContent = film.release_year;
+                link.append(year);
+              }
+              item.append(link);
+              return item;
+            })
+          );
+          active = -1;
+          suggestions.hidden = films.length === 0;
+        })
+        .catch(() => {
+          // Échec silencieux : la recherche dans les cartes reste disponible
+        });
+    }, 120);
+
+    searchInput.addEventListener("input", fetchSuggestions);
+    searchInput.addEventListener("keydown", (e) => {
+      const count = links().length;
+      if (suggestions.hidden || !count) return;
+      if (e.key === "ArrowDown" || e.key === "ArrowUp") {
+        e.preventDefault();
+        highlight((active + (e.key === "ArrowDown" ? 1 : count - 1)) % count);
+      } else if (e.key === "Enter" && active >= 0) {
+        e.preventDefault();
+        window.location.href = links()[active].href;
+      } else if (e.key === "Escape") {
+        hideSuggestions();
+      }
+    });
+    document.addEventListener("click", (e) => {
+      if (!suggestions.contains(e.target) && e.target !== searchInput) {
+        hideSuggestions();
+      }
+    });
+  }
+
+  // Avis suivants : le lien « Plus d'avis » est remplacé par la page suivante
+  const comments = document.getElementById("comments");
+  if (comments) {
+    comments.addEventListener("click", (e) => {
+      const link = e.target.closest("a[data-fragment]");
+      if (!link) return;
+      e.preventDefault();
+      link.classList.add("loading");
+      fetch(link.dataset.fragment, { headers: { "X-Requested-With": "fetch" } })
+        .then((response) => {
+          if (!response.ok) throw new Error(response.statusText);
+          return response.text();
+        })
+        .then((html) => {
+          link.replaceWith(document.createRange().createContextualFragment(html));
+        })
+        .catch(() => {
+          // À défaut, page complète à partir du curseur
+          window.location.href = link.href;
+        });
+    });
+  }
+
   // Dropdown tags avec checkboxes
   const tagsToggle = document.getElementById("tags-toggle");
   const tagsMenu = document.getElementById("tags-menu");
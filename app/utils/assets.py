@@ -0,0 +1,103 @@
+"""Assets statiques empreintés et précompressés.
+
+`scripts/build_static.py` copie chaque fichier de `app/static` dans
+`app/static/dist` sous un nom contenant l'empreinte de son contenu
+(`css/style.3f2a9c1b0d.css`), écrit à côté ses variantes `.gz` et `.br`, puis
+le manifeste `dist/manifest.json` (chemin source → chemin empreinté).
+
+`asset_path` traduit un chemin source via ce manifeste ; sans build, il le
+renvoie tel quel (développement). `AssetStaticFiles` sert la variante
+compressée acceptée par le client et marque les fichiers empreintés
+`immutable` : leur URL change dès que leur contenu change.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import os
+import stat
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Set
+
+import anyio.to_thread
+import orjson
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+
+STATIC_DIR = Path(__file__).resolve().parents[1] / "static"
+BUILD_DIRNAME = "dist"
+MANIFEST_NAME = "manifest.json"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Variantes précompressées, par ordre de préférence
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+@lru_cache(maxsize=1)
+def load_manifest() -> Dict[str, str]:
+    """Manifeste du dernier build (vide si les assets n'ont pas été construits)."""
+    try:
+        return orjson.loads((STATIC_DIR / BUILD_DIRNAME / MANIFEST_NAME).read_bytes())
+    except FileNotFoundError:
+        return {}
+
+
+def asset_path(path: str) -> str:
+    """Chemin à servir sous `/static` pour l'asset source `path`."""
+    hashed = load_manifest().get(path)
+    return f"{BUILD_DIRNAME}/{hashed}" if hashed else path
+
+
+def accepted_encodings(header: str) -> Set[str]:
+    """Codages acceptés d'après un en-tête `Accept-Encoding` (hors `q=0`)."""
+    encodings = set()
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        quality = params.strip().lower().replace(" ", "")
+        if quality in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name.strip():
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+class AssetStaticFiles(StaticFiles):
+    """`StaticFiles` qui sert les variantes précompressées des assets du build."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        hashed = path.startswith(BUILD_DIRNAME + os.sep)
+        response = None
+        if hashed and scope["method"] in ("GET", "HEAD"):
+            response = await self._precompressed_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        if hashed and response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    async def _precompressed_response(self, path: str, scope: Scope) -> Response | None:
+        request_headers = Headers(scope=scope)
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding not in accepted:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            # Type MIME du fichier d'origine, pas celui de l'archive
+            media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            response = FileResponse(
+                full_path,
+                stat_result=stat_result,
+                media_type=media_type,
+                headers={"Content-Encoding": encoding},
+            )
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+        return None
@@ -0,0 +1,57 @@
+"""Curseurs opaques et sélection de champs pour l'API JSON."""
+
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence
+
+import orjson
+from fastapi import HTTPException, status
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode la clé de tri du dernier élément d'une page."""
+    return base64.urlsafe_b64encode(orjson.dumps(list(values))).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[list]:
+    """Décode un curseur produit par `encode_cursor` (400 s'il est invalide)."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = orjson.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Curseur invalide.")
+    return values
+
+
+def decode_datetime_cursor(cursor: Optional[str]) -> Optional[tuple[datetime, int]]:
+    """Décode un curseur `(created_at, id)` des listes triées par date."""
+    values = decode_cursor(cursor, 2)
+    if values is None:
+        return None
+    try:
+        return datetime.fromisoformat(values[0]), int(values[1])
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Curseur invalide.")
+
+
+def parse_fields(
+    fields: Optional[str], allowed: Iterable[str], default: Iterable[str]
+) -> List[str]:
+    """Valide le paramètre `fields=a,b,c` (sélection clairsemée des champs)."""
+    if not fields:
+        return list(default)
+    allowed = set(allowed)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Champs inconnus : {', '.join(unknown)}.",
+        )
+    return list(dict.fromkeys(requested))
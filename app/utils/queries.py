@@ -0,0 +1,92 @@
+"""Comptage des requêtes SQL par requête HTTP et détection des N+1.
+
+Les événements `before/after_cursor_execute` de tous les moteurs alimentent le
+`QueryStats` de la requête HTTP en cours (posé par `MetricsMiddleware`). Une
+même instruction SQL répétée au moins `QUERY_REPEAT_THRESHOLD` fois dans une
+requête est journalisée : c'est presque toujours une relation chargée
+paresseusement dans une boucle.
+
+`assert_max_queries` sert à verrouiller le nombre de requêtes d'un endpoint
+(voir `tests/test_query_counts.py`) :
+
+    with assert_max_queries(3):
+        client.get("/watchlist")
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class QueryStats:
+    """Requêtes SQL exécutées pendant une requête HTTP."""
+
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Instructions exécutées au moins `threshold` fois (N+1 probables)."""
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> tuple[QueryStats, Token]:
+    stats = QueryStats()
+    return stats, _query_stats.set(stats)
+
+
+def stop_query_stats(token: Token) -> None:
+    _query_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started"].pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+        stats.statements[statement] += 1
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, engine: Optional[Engine] = None) -> Iterator[List[str]]:
+    """Échoue si le bloc exécute plus de `max_queries` instructions SQL.
+
+    Compte au niveau du moteur (et non de la requête HTTP) : fonctionne avec
+    `TestClient`, dont l'application tourne dans un autre thread.
+    """
+    if engine is None:
+        from ..database import get_engine
+
+        engine = get_engine()
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    if len(statements) > max_queries:
+        listing = "\n".join(f"  {index + 1}. {statement}" for index, statement in enumerate(statements))
+        raise AssertionError(f"{len(statements)} requêtes SQL exécutées (maximum {max_queries}) :\n{listing}")
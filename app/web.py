@@ -1,19 +1,99 @@
 """Configuration partagée pour les templates Jinja2."""
 
+import logging
 import os
+import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 
 from fastapi import Request
+from fastapi.responses import StreamingResponse
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache, Template
+from starlette.responses import Response
 
 from .config import get_settings
-from .models import User
+from .metrics import TEMPLATE_RENDER
+from .services.users import CurrentUser
+from .utils.assets import asset_path
 from .utils.flash import pop_flashed_messages
 
 
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Taille des blocs envoyés par `stream_template` : assez gros pour ne pas
+# multiplier les allers-retours vers le pool de threads, assez petit pour que
+# le navigateur reçoive l'en-tête de la page tout de suite.
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+class TimedTemplate(Template):
+    """Template dont la durée de rendu alimente `lvn_template_render_seconds`."""
+
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            TEMPLATE_RENDER.labels(self.name or "<inline>").observe(time.perf_counter() - started)
+
+    def generate_chunks(self, context: Dict[str, Any], size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """Comme `generate`, mais par blocs encodés d'au moins `size` caractères.
+
+        Seul le temps passé à produire les blocs est compté, pas celui pendant
+        lequel le client les consomme.
+        """
+        elapsed = 0.0
+        buffer: list[str] = []
+        buffered = 0
+        started = time.perf_counter()
+        try:
+            for piece in self.generate(context):
+                buffer.append(piece)
+                buffered += len(piece)
+                if buffered >= size:
+                    chunk = "".join(buffer).encode("utf-8")
+                    buffer.clear()
+                    buffered = 0
+                    elapsed += time.perf_counter() - started
+                    yield chunk
+                    started = time.perf_counter()
+            elapsed += time.perf_counter() - started
+            if buffer:
+                yield "".join(buffer).encode("utf-8")
+        finally:
+            TEMPLATE_RENDER.labels(self.name or "<inline>").observe(elapsed)
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """Cache du bytecode compilé, partagé par les workers et les redémarrages."""
+    if not settings.template_cache_dir:
+        return None
+    directory = Path(settings.template_cache_dir)
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        pass
+    if not os.access(directory, os.W_OK):
+        logger.warning("Cache de templates désactivé : %s n'est pas accessible en écriture", directory)
+        return None
+    return FileSystemBytecodeCache(str(directory))
+
+
 templates = Jinja2Templates(directory=str(Path(__file__).resolve().parent / "templates"))
-templates.env.globals["settings"] = get_settings()
+templates.env.template_class = TimedTemplate
+templates.env.bytecode_cache = _bytecode_cache()
+templates.env.globals["settings"] = settings
+
+
+def precompile_templates() -> int:
+    """Compile tous les templates dans le cache de bytecode (build de l'image)."""
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
 
 
 def static_url(request: Request, path: str) -> str:
@@ -26,9 +106,12 @@ def static_url(request: Request, path: str) -> str:
 
     On corrige en préfixant avec `KUBE_PROXY_BASE_PATH` quand on détecte le
     cas `kubectl proxy`.
+
+    Après `scripts/build_static.py`, l'URL désigne la version empreintée de
+    l'asset (mise en cache définitive par le navigateur).
     """
 
-    clean_path = path.lstrip("/")
+    clean_path = asset_path(path.lstrip("/"))
     proxy_base = os.getenv("KUBE_PROXY_BASE_PATH")
 
     if proxy_base:
@@ -43,9 +126,10 @@ templates.env.globals["static_url"] = static_url
 def template_context(
     request: Request,
     *,
-    current_user: Optional[User] = None,
+    current_user: Optional[CurrentUser] = None,
     watchlist: Optional[list] = None,
     watchlist_ids: Optional[set[int]] = None,
+    watchlist_count: Optional[int] = None,
     **extra: Any,
 ) -> Dict[str, Any]:
     """Aide pour éviter de répéter les mêmes clés dans chaque rendu."""
@@ -55,8 +139,23 @@ def template_context(
         "current_user": current_user,
         "watchlist": watchlist_list,
         "watchlist_ids": watchlist_ids or {getattr(film, "id", None) for film in watchlist_list if getattr(film, "id", None)},
+        "watchlist_count": len(watchlist_list) if watchlist_count is None else watchlist_count,
         "messages": pop_flashed_messages(request),
     }
     context.update(extra)
     return context
 
+
+def stream_template(name: str, context: Dict[str, Any], status_code: int = 200) -> Response:
+    """Rend un template au fil de l'eau (`TimedTemplate.generate_chunks`).
+
+    Le début de la page part avant que la liste soit entièrement rendue, et la
+    mémoire ne dépend plus de sa longueur si le contexte fournit un itérateur.
+    Une erreur pendant le rendu ne peut plus produire de page 500 (l'en-tête
+    est déjà parti) : la réponse est tronquée. `TEMPLATE_STREAMING=false`
+    revient au rendu complet en mémoire.
+    """
+    if not settings.template_streaming:
+        return templates.TemplateResponse(name, context, status_code=status_code)
+    template = templates.get_template(name)
+    return StreamingResponse(template.generate_chunks(context), status_code=status_code, media_type="text/html")
@@ -0,0 +1,124 @@
+"""Latence et empreinte mémoire de l'index d'autocomplétion des titres.
+
+Construit `TitleIndex` sur un catalogue synthétique (titres du jeu de données
+des benchmarks, plus les titres réels de `data/app.db` en lecture seule), puis
+mesure la recherche pour plusieurs formes de saisie : préfixe court, préfixe
+long, mot du milieu du titre, faute de frappe. Affiche aussi le temps de
+construction, le coût d'un ajout incrémental et la mémoire de l'index.
+
+Usage :
+    python benchmarks/autocomplete.py
+    python benchmarks/autocomplete.py --films 200000 --queries 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from app.services.autocomplete import TitleIndex  # noqa: E402
+from dataset import WORDS  # noqa: E402
+
+
+# Mots courants des titres, puis un vocabulaire de pseudo-mots de fréquence zipfienne
+COMMON_WORDS = ["the", "of", "a", "le", "la", "les", "de", "and", "in", "night", "love", "man", "last"]
+SYLLABLES = [onset + vowel + coda for onset in "bcdfglmnprstv" for vowel in "aeiou" for coda in ("", "n", "r", "s")]
+
+
+def _titles(films: int, rng: random.Random) -> list[str]:
+    real = []
+    database = ROOT_DIR / "data" / "app.db"
+    if database.exists():
+        with sqlite3.connect(f"file:{database}?mode=ro", uri=True) as conn:
+            real = [title for (title,) in conn.execute("SELECT title FROM film")]
+    vocabulary = sorted(
+        {"".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(30_000)} | set(WORDS)
+    )
+    rng.shuffle(vocabulary)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    synthetic = []
+    for _ in range(films - len(real)):
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(1, 4))
+        if rng.random() < 0.4:
+            words.insert(rng.randrange(len(words)), rng.choice(COMMON_WORDS))
+        synthetic.append(" ".join(words).capitalize())
+    return real + synthetic
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word
+    position = rng.randrange(1, len(word) - 1)
+    return word[: position - 1] + word[position] + word[position - 1] + word[position + 1 :]
+
+
+def _queries(titles: list[str], count: int, rng: random.Random) -> dict[str, list[str]]:
+    sample = [rng.choice(titles) for _ in range(count)]
+    return {
+        "préfixe 2 lettres": [title[:2] for title in sample],
+        "préfixe 6 lettres": [title[:6] for title in sample],
+        "mot du milieu": [title.split()[-2] if len(title.split()) > 1 else title for title in sample],
+        "faute de frappe": [" ".join(_typo(word, rng) for word in title.split()[:2]) for title in sample],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latence de l'autocomplétion des titres")
+    parser.add_argument("--films", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    titles = _titles(args.films, rng)
+    rows = [(film_id, title, 2000, rng.randint(0, 500)) for film_id, title in enumerate(titles, start=1)]
+
+    started = time.perf_counter()
+    index = TitleIndex()
+    index.load(rows)
+    build = time.perf_counter() - started
+    tracemalloc.start()
+    measured = TitleIndex()
+    measured.load(rows)
+    memory, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del measured
+
+    started = time.perf_counter()
+    index.add([(len(rows) + 1, "Le Fabuleux Destin d'Amélie Poulain", 2001, 0)])
+    increment = time.perf_counter() - started
+
+    print(
+        f"{len(index)} titres : construction {build:.2f} s, {memory / 1e6:.1f} Mo "
+        f"({peak / 1e6:.1f} Mo pendant la construction), ajout {1000 * increment:.2f} ms"
+    )
+    print(f"{'saisie':<20} {'p50':>8} {'p99':>8} {'max':>8} {'trouvés':>8}")
+    for name, queries in _queries(titles, args.queries, rng).items():
+        durations = []
+        found = 0
+        for query in queries:
+            started = time.perf_counter()
+            results = index.search(query, args.limit)
+            durations.append(time.perf_counter() - started)
+            found += bool(results)
+        durations.sort()
+        print(
+            f"{name:<20} {1e6 * durations[len(durations) // 2]:6.0f}µs {1e6 * durations[int(len(durations) * 0.99)]:6.0f}µs "
+            f"{1e6 * durations[-1]:6.0f}µs {100 * found / len(queries):7.0f}%"
+        )
+    for query in ("amelie", "godfathr", "star wrs", "ratatouile", "harry poter"):
+        print(f"{query!r} → {[suggestion.title for suggestion in index.search(query, 3)]}")
+
+
+if __name__ == "__main__":
+    main()
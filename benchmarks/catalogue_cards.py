@@ -0,0 +1,107 @@
+"""Coût par carte du catalogue : entités ORM contre lignes projetées.
+
+Sur une base synthétique (SQLite temporaire, synopsis allongés à la taille de
+ceux de TMDb), construit les données des cartes de `/films` de deux façons :
+
+- **entités ORM** : `select(Film)` avec `selectinload(Film.tags)`, comme avant
+  l'introduction de `FilmCard` (toutes les colonnes, carte d'identité de la
+  session, objets `Tag`) ;
+- **lignes projetées** : la requête des routes (`_card_statement`), qui ne lit
+  que les colonnes affichées, tronque le synopsis et agrège les noms de tags
+  en SQL, vers des `FilmCard` à slots.
+
+Affiche le temps (meilleur de plusieurs passes) et la mémoire par carte :
+retenue une fois la liste construite, et de pointe pendant la construction.
+
+Usage :
+    python benchmarks/catalogue_cards.py
+    python benchmarks/catalogue_cards.py --films 20000 --overview 800
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+
+def _orm_cards(session):
+    from sqlalchemy.orm import selectinload
+    from sqlmodel import select
+
+    from app.models import Film
+    from app.services.aggregates import average_rating
+
+    films = session.exec(select(Film).options(selectinload(Film.tags)).order_by(Film.title)).all()
+    return [
+        {
+            "film": film,
+            "avg_rating": average_rating(film.rating_sum, film.review_count),
+            "review_count": film.review_count,
+            "in_watchlist": False,
+        }
+        for film in films
+    ]
+
+
+def _projected_cards(session):
+    from app.routers.films import _card_statement, _cards_payload
+
+    return _cards_payload(session.exec(_card_statement(None, [])).all())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Coût par carte du catalogue, ORM ou projection")
+    parser.add_argument("--films", type=int, default=8_000)
+    parser.add_argument("--overview", type=int, default=600, help="Longueur des synopsis (caractères)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='lvn-cards-')}/bench.db"
+    from sqlalchemy import text
+    from sqlmodel import Session
+
+    from app.database import get_engine, init_db
+    from dataset import DatasetSize, seed  # noqa: E402
+
+    init_db()
+    engine = get_engine()
+    seed(engine, DatasetSize(films=args.films, users=10, reviews=args.films, watchlist=10))
+    with engine.begin() as conn:
+        # Synopsis répétés jusqu'à la longueur voulue
+        while conn.execute(text("SELECT min(length(overview)) FROM film")).scalar() < args.overview:
+            conn.execute(text("UPDATE film SET overview = overview || ' ' || overview"))
+        conn.execute(text("UPDATE film SET overview = substr(overview, 1, :n)"), {"n": args.overview})
+
+    print(f"{args.films} films, synopsis de {args.overview} caractères")
+    print(f"{'lecture':<18} {'temps':>10} {'retenue':>10} {'pointe':>10}")
+    for name, build in (("entités ORM", _orm_cards), ("lignes projetées", _projected_cards)):
+        durations = []
+        for _ in range(args.repeat):
+            with Session(engine) as session:
+                started = time.perf_counter()
+                build(session)
+                durations.append(time.perf_counter() - started)
+        gc.collect()
+        with Session(engine) as session:
+            tracemalloc.start()
+            cards = build(session)
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            count = len(cards)
+            del cards
+        print(
+            f"{name:<18} {1e6 * min(durations) / count:7.1f}µs/c {retained / count:7.0f}o/c {peak / count:7.0f}o/c"
+        )
+
+
+if __name__ == "__main__":
+    main()
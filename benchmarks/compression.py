@@ -0,0 +1,95 @@
+"""Compromis CPU / octets de la compression des réponses.
+
+Rend les pages les plus lourdes (`/films`, `/films/partial`) sur un jeu
+synthétique, puis les compresse avec chaque codage et plusieurs niveaux, avec
+les compresseurs du middleware (`app.compression`). Affiche la taille obtenue,
+le temps de compression par réponse et le coût du mode streaming (vidage
+après chaque bloc de 8 Ko).
+
+Usage :
+    python benchmarks/compression.py
+    python benchmarks/compression.py --films 5000 --rounds 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 6), "zstd": (1, 3, 9)}
+STREAM_CHUNK = 8192
+
+
+def _pages(args: argparse.Namespace) -> dict[str, bytes]:
+    from fastapi.testclient import TestClient
+
+    from app.database import get_engine, init_db
+    from dataset import BENCH_PASSWORD, DatasetSize, seed
+
+    init_db()
+    seed(get_engine(), DatasetSize(args.films, users=10, reviews=args.films, watchlist=10), args.seed)
+
+    from app.main import app
+
+    with TestClient(app, headers={"Accept-Encoding": "identity"}) as client:
+        client.post("/login", data={"email": "seed1@example.com", "password": BENCH_PASSWORD})
+        return {
+            "/films": client.get("/films").content,
+            "/films/partial?q=a": client.get("/films/partial", params={"q": "a"}).content,
+        }
+
+
+def _measure(factory, body: bytes, rounds: int, streaming: bool) -> tuple[int, float]:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        compressor = factory()
+        if streaming:
+            size = 0
+            for offset in range(0, len(body), STREAM_CHUNK):
+                size += len(compressor.compress(body[offset : offset + STREAM_CHUNK]) + compressor.flush())
+            size += len(compressor.finish())
+        else:
+            size = len(compressor.compress(body) + compressor.finish())
+    return size, (time.perf_counter() - started) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compromis CPU/octets de la compression des réponses")
+    parser.add_argument("--films", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rounds", type=int, default=10, help="Compressions mesurées par configuration")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='lvn-compression-')}/bench.db"
+    os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+    from app.compression import available_compressors
+
+    for name, body in _pages(args).items():
+        print(f"\n{name} : {len(body) / 1024:.1f} Ko non compressés")
+        print(f"{'codage':<10} {'taille':>10} {'ratio':>7} {'ms/réponse':>11} {'Mo/s':>8} {'streaming':>16}")
+        for encoding, levels in LEVELS.items():
+            for level in levels:
+                settings = {"gzip": "gzip_level", "br": "brotli_quality", "zstd": "zstd_level"}[encoding]
+                factories = available_compressors(**{settings: level})
+                if encoding not in factories:
+                    print(f"{encoding:<10} module absent")
+                    break
+                size, seconds = _measure(factories[encoding], body, args.rounds, streaming=False)
+                stream_size, stream_seconds = _measure(factories[encoding], body, args.rounds, streaming=True)
+                print(
+                    f"{encoding + '-' + str(level):<10} {size / 1024:8.1f}Ko {len(body) / size:6.1f}x "
+                    f"{1000 * seconds:10.2f} {len(body) / seconds / 1e6:8.1f} "
+                    f"{stream_size / 1024:6.1f}Ko {1000 * stream_seconds:5.2f}ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""Jeu de données synthétique réaliste, inséré en masse.
+
+Utilisé par `scripts/seed_data.py` et `benchmarks/http_suite.py`. Les
+distributions suivent une loi de Zipf : quelques films concentrent l'essentiel
+des avis et des ajouts en watchlist, quelques utilisateurs très actifs en
+écrivent beaucoup et la plupart très peu. La génération est déterministe
+(graine fixe).
+
+Les lignes sont écrites par gros lots avec le pilote directement
+(`executemany` sous SQLite, `COPY` sous PostgreSQL) et les agrégats des films
+sont calculés pendant la génération, sans requête de recalcul. Tous les comptes
+partagent le même mot de passe, haché une seule fois :
+`seed{n}@example.com` / `BENCH_PASSWORD`.
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import Index, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+from sqlmodel import SQLModel
+
+from app.models import Film, Review, User, WatchlistItem
+from app.security import pwd_context
+
+
+BENCH_PASSWORD = "benchmark-password"
+BATCH_SIZE = 50_000
+
+GENRES = [
+    "Drame", "Comédie", "Thriller", "Action", "Romance", "Documentaire", "Crime",
+    "Aventure", "Science-Fiction", "Horreur", "Animation", "Familial", "Fantastique",
+    "Mystère", "Histoire", "Musique", "Guerre", "Western",
+]
+WORDS = [
+    "nuit", "soleil", "retour", "dernier", "grand", "secret", "voyage", "ombre", "rouge",
+    "ville", "silence", "mer", "étoile", "hiver", "jardin", "cœur", "train", "mémoire",
+    "fleuve", "été", "loup", "miroir", "lettre", "frontière", "orage", "île", "bal",
+]
+COMMENTS = [
+    "Un classique.", "Trop long à mon goût.", "Magnifique photographie.", "Je n'ai pas accroché.",
+    "À revoir !", "Les acteurs sont excellents.", "Scénario prévisible.", "Coup de cœur.",
+]
+# Répartition des notes de 1 à 5 (les notes moyennes-hautes dominent)
+RATING_TABLE = [1] * 4 + [2] * 9 + [3] * 22 + [4] * 38 + [5] * 27
+# Un avis sur cinq porte un commentaire
+COMMENT_TABLE = [None] * (4 * len(COMMENTS)) + COMMENTS
+# Index secondaires construits après le chargement (plus rapide qu'au fil de l'eau)
+DEFERRED_INDEX_TABLES = ("review", "watchlistitem", "filmtaglink")
+
+
+@dataclass
+class DatasetSize:
+    films: int = 2_000
+    users: int = 500
+    reviews: int = 20_000
+    watchlist: int = 10_000
+
+
+@dataclass
+class SeedReport:
+    films: int = 0
+    tags: int = 0
+    users: int = 0
+    reviews: int = 0
+    watchlist: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.films + self.tags + self.users + self.reviews + self.watchlist
+
+
+class Zipf:
+    """Tirage d'indices 0..n-1 de poids 1/(rang+1)^s, rangs mélangés.
+
+    Les tirages passent par une table de correspondance (chaque indice y figure
+    proportionnellement à son poids) : un tirage coûte un accès à une liste au
+    lieu d'une recherche dichotomique dans les poids cumulés.
+    """
+
+    TABLE_SIZE = 1 << 22
+
+    def __init__(self, rng: random.Random, n: int, s: float) -> None:
+        self.rng = rng
+        self.n = n
+        self.weights = [1.0 / (rank + 1) ** s for rank in range(n)]
+        self.total = sum(self.weights)
+        # Le film le plus populaire n'est pas forcément le n°1
+        self.order = list(range(n))
+        rng.shuffle(self.order)
+        size = max(self.TABLE_SIZE, 8 * n)
+        self.table: List[int] = []
+        for rank, weight in enumerate(self.weights):
+            self.table.extend([self.order[rank]] * max(1, round(size * weight / self.total)))
+
+    def shares(self, total: int, cap: int) -> List[int]:
+        """Répartit `total` entre les n éléments selon la loi, plafonné à `cap`."""
+        shares = [0] * self.n
+        for rank, weight in enumerate(self.weights):
+            shares[self.order[rank]] = min(cap, round(total * weight / self.total))
+        # Ce que le plafond et les arrondis ont retiré est redonné, par ordre de rang
+        missing = min(total, cap * self.n) - sum(shares)
+        while missing > 0:
+            for index in self.order:
+                if shares[index] < cap:
+                    shares[index] += 1
+                    missing -= 1
+                    if not missing:
+                        break
+        return shares
+
+    def sample(self, k: int) -> List[int]:
+        return self.rng.choices(self.table, k=k)
+
+
+def _distinct(zipf: Zipf, rng: random.Random, count: int, exclude: set) -> set:
+    """`count` indices distincts (hors `exclude`) tirés selon la popularité."""
+    chosen: set = set()
+    attempts = 0
+    while len(chosen) < count and attempts < 4:
+        chosen.update(index for index in zipf.sample(2 * (count - len(chosen))) if index not in exclude)
+        attempts += 1
+    while len(chosen) < count:
+        index = rng.randrange(zipf.n)
+        if index not in exclude:
+            chosen.add(index)
+    return set(itertools.islice(chosen, count)) if len(chosen) > count else chosen
+
+
+class _Writer:
+    """Insertion en masse par le pilote : `COPY` (PostgreSQL) ou `executemany`."""
+
+    def __init__(self, engine: Engine) -> None:
+        self.dialect = engine.dialect
+        self.postgres = engine.dialect.name == "postgresql"
+        self.raw = engine.raw_connection()
+        self.cursor = self.raw.cursor()
+        if engine.dialect.name == "sqlite":
+            # Chargement initial : pas de fsync à chaque page, index en mémoire
+            self.cursor.execute("PRAGMA synchronous = OFF")
+            self.cursor.execute("PRAGMA cache_size = -262144")
+
+    def timestamp(self, value: datetime):
+        # Sous SQLite, l'adaptateur datetime du pilote coûte plus cher que
+        # l'insertion : les horodatages sont formatés une fois pour toutes.
+        return value if self.postgres else value.isoformat(" ")
+
+    def write(self, table: str, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        written = 0
+        if self.postgres:
+            with self.cursor.copy(f'COPY "{table}" ({quoted}) FROM STDIN') as copy:
+                for row in rows:
+                    copy.write_row(row)
+                    written += 1
+            return written
+        statement = f'INSERT INTO "{table}" ({quoted}) VALUES ({", ".join("?" for _ in columns)})'
+        iterator = iter(rows)
+        while batch := list(itertools.islice(iterator, BATCH_SIZE)):
+            self.cursor.executemany(statement, batch)
+            written += len(batch)
+        return written
+
+    def drop_indexes(self, tables: Iterable[str]) -> List[Index]:
+        """Supprime les index non uniques des tables ; retourne ceux à recréer."""
+        dropped = [index for table in tables for index in SQLModel.metadata.tables[table].indexes if not index.unique]
+        for index in dropped:
+            self.cursor.execute(f'DROP INDEX IF EXISTS "{index.name}"')
+        return dropped
+
+    def create_indexes(self, indexes: Iterable[Index]) -> None:
+        for index in indexes:
+            self.cursor.execute(str(CreateIndex(index).compile(dialect=self.dialect)))
+
+    def update_many(self, statement: str, rows: List[tuple]) -> None:
+        if self.postgres:
+            statement = statement.replace("?", "%s")
+        for start in range(0, len(rows), BATCH_SIZE):
+            self.cursor.executemany(statement, rows[start : start + BATCH_SIZE])
+
+    def reset_sequences(self, tables: Iterable[str]) -> None:
+        if self.postgres:
+            for table in tables:
+                self.cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), (SELECT MAX(id) FROM \"{table}\"))"
+                )
+
+    def commit(self) -> None:
+        self.raw.commit()
+
+    def close(self) -> None:
+        self.cursor.close()
+        self.raw.close()
+
+
+def _ensure_empty(engine: Engine) -> None:
+    with engine.connect() as conn:
+        for model in (Film, User, Review, WatchlistItem):
+            if conn.execute(select(func.count()).select_from(model)).scalar():
+                raise RuntimeError(
+                    f"La table « {model.__tablename__} » n'est pas vide : le remplissage exige une base vierge."
+                )
+
+
+def seed(
+    engine: Engine,
+    size: DatasetSize,
+    seed_value: int = 42,
+    zipf_s: float = 1.0,
+    password: str = BENCH_PASSWORD,
+) -> SeedReport:
+    """Remplit une base vierge (schéma déjà migré) et retourne le bilan."""
+    _ensure_empty(engine)
+    started = time.perf_counter()
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    shared_hash = pwd_context.hash(password)
+    report = SeedReport()
+
+    film_popularity = Zipf(rng, size.films, zipf_s)
+    genre_popularity = Zipf(rng, len(GENRES), zipf_s)
+    user_activity = Zipf(rng, size.users, zipf_s)
+    film_tags = [sorted({GENRES[g] for g in genre_popularity.sample(rng.randint(1, 3))}) for _ in range(size.films)]
+
+    writer = _Writer(engine)
+    now_value = writer.timestamp(now)
+    # Pool d'horodatages précalculés : générer un datetime par ligne coûte cher
+    timestamps = [
+        writer.timestamp(now - timedelta(seconds=rng.randint(0, 3 * 365 * 86400))) for _ in range(4096)
+    ]
+    try:
+        deferred = writer.drop_indexes(DEFERRED_INDEX_TABLES)
+        report.tags = writer.write("tag", ("id", "name"), ((index + 1, name) for index, name in enumerate(GENRES)))
+        genre_ids = {name: index + 1 for index, name in enumerate(GENRES)}
+        report.films = writer.write(
+            "film",
+            ("id", "title", "overview", "release_year", "runtime_minutes", "primary_genre",
+             "review_count", "rating_sum", "created_at", "updated_at"),
+            (
+                (
+                    film_id,
+                    f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {film_id}",
+                    " ".join(rng.choices(WORDS, k=30)),
+                    rng.randint(1950, 2024),
+                    rng.randint(75, 180),
+                    film_tags[film_id - 1][0],
+                    0,
+                    0,
+                    now_value,
+                    now_value,
+                )
+                for film_id in range(1, size.films + 1)
+            ),
+        )
+        writer.write(
+            "filmtaglink",
+            ("film_id", "tag_id"),
+            ((index + 1, genre_ids[name]) for index, names in enumerate(film_tags) for name in names),
+        )
+        report.users = writer.write(
+            "user",
+            ("id", "username", "email", "hashed_password", "created_at", "updated_at"),
+            (
+                (user_id, f"seed{user_id}", f"seed{user_id}@example.com", shared_hash, now_value, now_value)
+                for user_id in range(1, size.users + 1)
+            ),
+        )
+
+        # Avis et watchlist générés ensemble, utilisateur par utilisateur : un
+        # film noté n'est pas aussi dans la watchlist.
+        review_shares = user_activity.shares(size.reviews, cap=size.films // 2)
+        watchlist_shares = user_activity.shares(size.watchlist, cap=size.films // 4)
+        review_count = [0] * size.films
+        rating_sum = [0] * size.films
+        watchlist_rows: List[tuple] = []
+
+        def reviews() -> Iterator[tuple]:
+            # Tirages groupés par utilisateur : un appel à `choices` par ligne
+            # coûterait plus que l'insertion elle-même.
+            for user_index in range(size.users):
+                user_id = user_index + 1
+                reviewed = _distinct(film_popularity, rng, review_shares[user_index], set())
+                wanted = _distinct(film_popularity, rng, watchlist_shares[user_index], reviewed)
+                count = len(reviewed)
+                ratings = rng.choices(RATING_TABLE, k=count)
+                comments = rng.choices(COMMENT_TABLE, k=count)
+                stamps = rng.choices(timestamps, k=count)
+                for film_index, rating, comment, stamp in zip(reviewed, ratings, comments, stamps):
+                    review_count[film_index] += 1
+                    rating_sum[film_index] += rating
+                    yield (user_id, film_index + 1, rating, comment, stamp, stamp)
+                for film_index, stamp in zip(wanted, rng.choices(timestamps, k=len(wanted))):
+                    watchlist_rows.append((user_id, film_index + 1, stamp, stamp))
+
+        report.reviews = writer.write(
+            "review", ("user_id", "film_id", "rating", "comment", "created_at", "updated_at"), reviews()
+        )
+        report.watchlist = writer.write(
+            "watchlistitem", ("user_id", "film_id", "created_at", "updated_at"), watchlist_rows
+        )
+        writer.update_many(
+            'UPDATE "film" SET review_count = ?, rating_sum = ? WHERE id = ?',
+            [(count, total, index + 1) for index, (count, total) in enumerate(zip(review_count, rating_sum)) if count],
+        )
+        writer.create_indexes(deferred)
+        writer.reset_sequences(("tag", "film", "user"))
+        writer.commit()
+    finally:
+        writer.close()
+
+    report.seconds = time.perf_counter() - started
+    return report
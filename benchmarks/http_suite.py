@@ -0,0 +1,245 @@
+"""Benchmark HTTP reproductible des pages principales.
+
+Crée une base SQLite temporaire remplie d'un jeu synthétique (`dataset.py`),
+puis envoie pour chaque scénario un nombre fixe de requêtes concurrentes, soit
+directement à l'application ASGI (en mémoire, sans réseau), soit à un serveur
+uvicorn local. Affiche p50/p95/p99 et le débit par scénario, et compare à une
+référence enregistrée.
+
+Usage :
+    pip install -r requirements-dev.txt
+    python benchmarks/http_suite.py --save-baseline benchmarks/results/baseline.json
+    python benchmarks/http_suite.py --baseline benchmarks/results/baseline.json
+    python benchmarks/http_suite.py --films 100000 --users 50000 --reviews 5000000 --mode uvicorn
+    python benchmarks/http_suite.py --database-url sqlite:////tmp/grosse.db --no-seed
+    python benchmarks/http_suite.py --accept-encoding identity   # sans compression
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _scenarios(films: int) -> list[tuple[str, Callable[[random.Random], dict]]]:
+    """(nom, fabrique d'arguments `httpx.request`) pour chaque scénario."""
+    film = lambda rng: rng.randint(1, films)  # noqa: E731
+    return [
+        ("GET /films", lambda rng: {"method": "GET", "url": "/films"}),
+        ("GET /films/partial", lambda rng: {"method": "GET", "url": "/films/partial", "params": {"q": rng.choice("aeiounrst")}}),
+        ("GET /films/{id}", lambda rng: {"method": "GET", "url": f"/films/{film(rng)}"}),
+        ("GET /profil", lambda rng: {"method": "GET", "url": "/profil"}),
+        ("GET /watchlist", lambda rng: {"method": "GET", "url": "/watchlist"}),
+        (
+            "POST /films/{id}/reviews",
+            lambda rng: {"method": "POST", "url": f"/films/{film(rng)}/reviews", "data": {"rating": rng.randint(1, 5)}},
+        ),
+        (
+            "POST /watchlist/batch",
+            lambda rng: {"method": "POST", "url": "/watchlist/batch", "json": {"add": [film(rng)], "remove": [film(rng)]}},
+        ),
+    ]
+
+
+async def _run_scenario(client, build: Callable[[random.Random], dict], args: argparse.Namespace, seed: int) -> dict:
+    rng = random.Random(seed)
+    requests = [build(rng) for _ in range(args.requests)]
+    latencies: list[float] = []
+    wire_bytes = 0
+    errors = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(kwargs: dict) -> None:
+        nonlocal errors, wire_bytes
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(**kwargs, follow_redirects=False)
+            latencies.append(time.perf_counter() - started)
+            wire_bytes += response.num_bytes_downloaded
+            if response.status_code >= 400:
+                errors += 1
+
+    for kwargs in requests[: args.warmup]:
+        await one(kwargs)
+    latencies.clear()
+    wire_bytes = 0
+    errors = 0
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(kwargs) for kwargs in requests))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": 1000 * _percentile(latencies, 50),
+        "p95_ms": 1000 * _percentile(latencies, 95),
+        "p99_ms": 1000 * _percentile(latencies, 99),
+        # Octets reçus par requête (corps compressé s'il l'est)
+        "kb_per_request": wire_bytes / 1024 / max(1, len(latencies)),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_ready(client, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+        await asyncio.sleep(0.2)
+
+
+async def _bench(args: argparse.Namespace) -> dict:
+    import httpx
+
+    from dataset import BENCH_PASSWORD
+
+    server: Optional[subprocess.Popen] = None
+    headers = {"Accept-Encoding": args.accept_encoding}
+    if args.mode == "uvicorn":
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+             "--workers", str(args.workers)],
+            cwd=ROOT_DIR,
+            env=dict(os.environ),
+        )
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60, headers=headers)
+    else:
+        from app.main import app
+
+        await app.router.startup()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60, headers=headers
+        )
+
+    results: dict = {}
+    try:
+        async with client:
+            await _wait_until_ready(client)
+            login = await client.post(
+                "/login", data={"email": "seed1@example.com", "password": BENCH_PASSWORD}, follow_redirects=False
+            )
+            if login.headers.get("location") != "/films":
+                raise SystemExit("Connexion du compte de benchmark impossible (base non remplie ?)")
+            for index, (name, build) in enumerate(_scenarios(args.films)):
+                if args.only and not any(token in name for token in args.only):
+                    continue
+                results[name] = await _run_scenario(client, build, args, seed=args.seed + index)
+                result = results[name]
+                print(
+                    f"{name:<28} {result['rps']:8.1f} req/s   p50 {result['p50_ms']:7.1f} ms   "
+                    f"p95 {result['p95_ms']:7.1f} ms   p99 {result['p99_ms']:7.1f} ms   "
+                    f"{result['kb_per_request']:7.1f} Ko/req   erreurs {result['errors']}"
+                )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return results
+
+
+def _compare(results: dict, baseline_path: Path, tolerance: float) -> int:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    regressions = 0
+    print(f"\nComparaison avec {baseline_path} (tolérance {tolerance:.0%}) :")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        p95_delta = result["p95_ms"] / reference["p95_ms"] - 1 if reference["p95_ms"] else 0.0
+        rps_delta = result["rps"] / reference["rps"] - 1 if reference["rps"] else 0.0
+        regressed = p95_delta > tolerance or rps_delta < -tolerance
+        regressions += regressed
+        flag = "RÉGRESSION" if regressed else "ok"
+        print(f"{name:<28} p95 {p95_delta:+7.1%}   débit {rps_delta:+7.1%}   {flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark HTTP sur un jeu de données synthétique")
+    parser.add_argument("--films", type=int, default=2_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--reviews", type=int, default=20_000)
+    parser.add_argument("--watchlist", type=int, default=10_000, help="Entrées de watchlist au total")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du jeu de données et des requêtes")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes mesurées par scénario")
+    parser.add_argument("--warmup", type=int, default=20, help="Requêtes de préchauffage (non mesurées)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mode", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument(
+        "--accept-encoding", default="br, zstd, gzip", help="En-tête Accept-Encoding envoyé (identity : sans compression)"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Workers uvicorn (mode uvicorn)")
+    parser.add_argument("--only", nargs="*", help="Ne lancer que les scénarios contenant ces fragments")
+    parser.add_argument("--database-url", help="Base existante (sinon SQLite temporaire)")
+    parser.add_argument("--no-seed", action="store_true", help="Ne pas remplir la base (déjà remplie)")
+    parser.add_argument("--baseline", type=Path, help="Fichier de référence à comparer")
+    parser.add_argument("--save-baseline", type=Path, help="Enregistre les résultats comme référence")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Écart toléré avant de signaler une régression")
+    args = parser.parse_args()
+
+    # La configuration est lue à l'import de l'application : on la fixe avant.
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='lvn-bench-')}/bench.db"
+    os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+    # Mesurer les routes, pas la limitation de débit ni le délestage
+    os.environ.setdefault("RATE_LIMIT_RULES", "")
+    os.environ.setdefault("MAX_REQUESTS_IN_FLIGHT", "0")
+    os.environ.setdefault("MAX_THREADPOOL_WAITING", "0")
+
+    if not args.no_seed:
+        from app.database import get_engine, init_db
+        from dataset import DatasetSize, seed
+
+        init_db()
+        report = seed(get_engine(), DatasetSize(args.films, args.users, args.reviews, args.watchlist), args.seed)
+        print(
+            f"Jeu de données : {report.films} films, {report.users} utilisateurs, {report.reviews} avis, "
+            f"{report.watchlist} entrées de watchlist ({report.seconds:.1f}s)\n"
+        )
+
+    results = asyncio.run(_bench(args))
+
+    meta = {"mode": args.mode, "accept_encoding": args.accept_encoding, "films": args.films, "users": args.users, "reviews": args.reviews,
+            "concurrency": args.concurrency, "requests": args.requests}
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(json.dumps({"meta": meta, "results": results}, indent=2), encoding="utf-8")
+        print(f"\nRéférence enregistrée dans {args.save_baseline}")
+    if args.baseline:
+        if _compare(results, args.baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Benchmark du débit de connexion (`POST /login`) et de son impact sur les pages.
+
+Lance l'application en mémoire (ASGI, sans réseau) sur une base SQLite
+temporaire, envoie une rafale de connexions concurrentes et mesure en parallèle
+la latence d'une page légère (`/health`) pour voir si les hachages l'affament.
+
+Usage :
+    pip install httpx
+    python benchmarks/login_throughput.py --requests 200 --concurrency 16 --workers 2
+    python benchmarks/login_throughput.py --workers 0   # hachage dans le thread de la requête
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _run(args: argparse.Namespace) -> None:
+    import httpx
+    from sqlmodel import Session
+
+    from app.database import engine, init_db
+    from app.main import app
+    from app.models import User
+    from app.security import hashing_stats, pwd_context, shutdown_hashing_pool
+
+    init_db()
+    # Un seul hash précalculé pour tous les comptes : le seeding reste instantané
+    shared_hash = pwd_context.hash(args.password)
+    with Session(engine) as session:
+        for index in range(args.users):
+            session.add(
+                User(username=f"bench{index}", email=f"bench{index}@example.com", hashed_password=shared_hash)
+            )
+        session.commit()
+
+    transport = httpx.ASGITransport(app=app)
+    login_latencies: list[float] = []
+    page_latencies: list[float] = []
+    failures = 0
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def login(index: int) -> None:
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/login",
+                    data={"email": f"bench{index % args.users}@example.com", "password": args.password},
+                    follow_redirects=False,
+                )
+                login_latencies.append(time.perf_counter() - started)
+                if response.headers.get("location") != "/films":
+                    failures += 1
+
+        async def probe_pages() -> None:
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/health")
+                page_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        # Préchauffage du pool de processus
+        await login(0)
+        login_latencies.clear()
+
+        prober = asyncio.create_task(probe_pages())
+        started = time.perf_counter()
+        await asyncio.gather(*(login(index) for index in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    shutdown_hashing_pool()
+    stats = hashing_stats.as_dict()
+    print(f"Connexions      : {args.requests} en {elapsed:.2f}s -> {args.requests / elapsed:.1f}/s ({failures} échecs)")
+    print(
+        "Latence login   : p50 {:.0f} ms · p95 {:.0f} ms · p99 {:.0f} ms".format(
+            *(1000 * _percentile(login_latencies, p) for p in (50, 95, 99))
+        )
+    )
+    if page_latencies:
+        print(
+            "Latence /health : p50 {:.1f} ms · p95 {:.1f} ms · max {:.1f} ms ({} sondes)".format(
+                1000 * statistics.median(page_latencies),
+                1000 * _percentile(page_latencies, 95),
+                1000 * max(page_latencies),
+                len(page_latencies),
+            )
+        )
+    print(
+        "Pool de hachage : attente moy. {:.1f} ms · max {:.1f} ms · calcul moy. {:.1f} ms · refus {}".format(
+            1000 * stats["queue_seconds_avg"],
+            1000 * stats["queue_seconds_max"],
+            1000 * stats["hash_seconds_avg"],
+            stats["rejected"],
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark du débit de connexion")
+    parser.add_argument("--users", type=int, default=20, help="Nombre de comptes créés")
+    parser.add_argument("--requests", type=int, default=200, help="Nombre de connexions envoyées")
+    parser.add_argument("--concurrency", type=int, default=16, help="Connexions simultanées")
+    parser.add_argument("--workers", type=int, help="Processus de hachage (PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--rounds", type=int, help="Tours pbkdf2 (PASSWORD_HASH_ROUNDS)")
+    parser.add_argument("--max-concurrency", type=int, help="Hachages simultanés (PASSWORD_HASH_MAX_CONCURRENCY)")
+    parser.add_argument("--password", default="benchmark-password")
+    args = parser.parse_args()
+
+    # La configuration est lue à l'import de l'application : on la fixe avant.
+    tmp_dir = tempfile.mkdtemp(prefix="lvn-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+    # Mesurer le hachage, pas la limitation de débit ni le délestage
+    os.environ.setdefault("RATE_LIMIT_RULES", "")
+    os.environ.setdefault("MAX_REQUESTS_IN_FLIGHT", "0")
+    os.environ.setdefault("MAX_THREADPOOL_WAITING", "0")
+    if args.workers is not None:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    if args.rounds is not None:
+        os.environ["PASSWORD_HASH_ROUNDS"] = str(args.rounds)
+    if args.max_concurrency is not None:
+        os.environ["PASSWORD_HASH_MAX_CONCURRENCY"] = str(args.max_concurrency)
+
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Mesure du temps « import → prêt » de l'application.
+
+Chaque essai lance un nouvel interpréteur qui importe `app.main` puis exécute
+les gestionnaires de démarrage (migrations comprises), comme le ferait un pod
+qui vient d'être planifié. Le premier essai part d'une base vide (migrations
+appliquées) ; les suivants mesurent un redémarrage sur une base à jour.
+
+Usage :
+    python benchmarks/startup_time.py --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+_CHILD = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app, startup_timings
+imported = time.perf_counter()
+asyncio.run(app.router.startup())
+print(json.dumps({"import": imported - started, "ready": time.perf_counter() - started, **startup_timings}))
+"""
+
+
+def _run_once(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD], cwd=ROOT_DIR, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Temps de démarrage de l'application")
+    parser.add_argument("--runs", type=int, default=5, help="Redémarrages mesurés sur une base à jour")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='lvn-startup-')}/startup.db"
+    env["PYTHONPATH"] = str(ROOT_DIR)
+
+    first = _run_once(env)
+    print(
+        "Base vide  : import {:.0f} ms · migrations {:.0f} ms · prêt {:.0f} ms".format(
+            1000 * first["import"], 1000 * first["migrations_seconds"], 1000 * first["ready"]
+        )
+    )
+    runs = [_run_once(env) for _ in range(args.runs)]
+    print(
+        "Base à jour : import {:.0f} ms · migrations {:.0f} ms · prêt {:.0f} ms (médianes sur {} essais)".format(
+            1000 * statistics.median(run["import"] for run in runs),
+            1000 * statistics.median(run["migrations_seconds"] for run in runs),
+            1000 * statistics.median(run["ready"] for run in runs),
+            args.runs,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
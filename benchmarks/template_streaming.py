@@ -0,0 +1,110 @@
+"""Temps jusqu'au premier octet et mémoire de pointe de `/films`.
+
+Pour plusieurs tailles de catalogue, mesure la page `/films` rendue en
+streaming (`TEMPLATE_STREAMING=true`) puis entièrement en mémoire. Chaque
+mesure tourne dans un interpréteur neuf qui appelle l'application ASGI
+directement : le premier octet est l'instant du premier bloc de corps non vide,
+la mémoire de pointe celle allouée pendant la requête (tracemalloc).
+
+Usage :
+    python benchmarks/template_streaming.py
+    python benchmarks/template_streaming.py --films 1000 5000 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+_SEED = """
+import sys
+sys.path.append("benchmarks")
+from app.database import get_engine, init_db
+from dataset import DatasetSize, seed
+init_db()
+seed(get_engine(), DatasetSize(films={films}, users=10, reviews={films}, watchlist=10))
+"""
+
+_CHILD = """
+import asyncio, json, sys, time, tracemalloc
+from app.main import app
+
+async def request(path):
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+             "headers": [(b"host", b"bench"), (b"accept-encoding", b"identity")], "client": ("127.0.0.1", 1),
+             "server": ("bench", 80)}
+    started = time.perf_counter()
+    first = None
+    size = 0
+    requested = False
+    done = asyncio.Event()
+
+    async def receive():
+        # Une seule fois le corps de la requête, puis la déconnexion en fin de réponse
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal first, size
+        if message["type"] == "http.response.body":
+            if message.get("body"):
+                first = first or time.perf_counter()
+                size += len(message["body"])
+            if not message.get("more_body"):
+                done.set()
+
+    await app(scope, receive, send)
+    return first - started, time.perf_counter() - started, size
+
+async def main():
+    await app.router.startup()
+    await request("/films")  # préchauffage (templates, caches)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    ttfb, total, size = await request("/films")
+    peak = tracemalloc.get_traced_memory()[1]
+    print(json.dumps({"ttfb": ttfb, "total": total, "size": size, "peak": peak}))
+
+asyncio.run(main())
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TTFB et mémoire de pointe de /films, streaming ou non")
+    parser.add_argument("--films", type=int, nargs="+", default=[1_000, 4_000, 16_000])
+    args = parser.parse_args()
+
+    print(f"{'films':>7} {'mode':<10} {'1er octet':>10} {'total':>9} {'taille':>9} {'mémoire':>9}")
+    for films in args.films:
+        env = dict(os.environ)
+        env["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='lvn-streaming-')}/bench.db"
+        env["PASSWORD_HASH_WORKERS"] = "0"
+        env["PYTHONPATH"] = str(ROOT_DIR)
+        subprocess.run([sys.executable, "-c", _SEED.format(films=films)], cwd=ROOT_DIR, env=env, check=True)
+        for streaming in ("true", "false"):
+            env["TEMPLATE_STREAMING"] = streaming
+            output = subprocess.run(
+                [sys.executable, "-c", _CHILD], cwd=ROOT_DIR, env=env, check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{films:>7} {'streaming' if streaming == 'true' else 'mémoire':<10} "
+                f"{1000 * result['ttfb']:8.0f}ms {1000 * result['total']:7.0f}ms "
+                f"{result['size'] / 1e6:7.1f}Mo {result['peak'] / 1e6:7.1f}Mo"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Construit les assets statiques empreintés et précompressés.
+
+Chaque fichier de `app/static` est copié dans `app/static/dist` sous un nom
+contenant l'empreinte SHA-256 de son contenu, avec ses variantes gzip et
+brotli (fichiers texte uniquement, et seulement si elles sont plus petites).
+Le manifeste `dist/manifest.json` permet à `static_url` d'émettre les URL
+empreintées. À relancer après toute modification d'un asset (fait par le
+Dockerfile à chaque image).
+
+Usage :
+    python scripts/build_static.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import shutil
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+import orjson
+
+from app.utils.assets import BUILD_DIRNAME, MANIFEST_NAME, STATIC_DIR
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    brotli = None
+
+
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".json", ".txt", ".html", ".map", ".ico"}
+# En dessous, l'en-tête de compression coûte plus qu'il ne rapporte
+MIN_COMPRESS_SIZE = 256
+
+
+def _fingerprint(source: Path, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    return source.with_name(f"{source.stem}.{digest}{source.suffix}").as_posix()
+
+
+def _write_variants(target: Path, content: bytes) -> list[str]:
+    variants = []
+    compressors = [("gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressors.append(("br", lambda data: brotli.compress(data, quality=11)))
+    for suffix, compress in compressors:
+        compressed = compress(content)
+        if len(compressed) < len(content):
+            target.with_name(f"{target.name}.{suffix}").write_bytes(compressed)
+            variants.append(f"{suffix} {len(compressed)} o")
+    return variants
+
+
+def build(static_dir: Path = STATIC_DIR) -> dict:
+    build_dir = static_dir / BUILD_DIRNAME
+    if build_dir.exists():
+        shutil.rmtree(build_dir)
+    manifest = {}
+    for source in sorted(static_dir.rglob("*")):
+        if not source.is_file() or build_dir in source.parents:
+            continue
+        relative = source.relative_to(static_dir)
+        content = source.read_bytes()
+        hashed = _fingerprint(relative, content)
+        target = build_dir / hashed
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        variants = []
+        if source.suffix in COMPRESSIBLE_SUFFIXES and len(content) >= MIN_COMPRESS_SIZE:
+            variants = _write_variants(target, content)
+        manifest[relative.as_posix()] = hashed
+        print(f"{relative.as_posix()} -> {hashed} ({len(content)} o{''.join(', ' + v for v in variants)})")
+    # Écrit en dernier : un manifeste présent désigne toujours des fichiers complets
+    (build_dir / MANIFEST_NAME).write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build des assets statiques (empreintes + gzip/brotli)")
+    parser.parse_args()
+    if brotli is None:
+        print("⚠️ Module brotli absent : seules les variantes gzip seront produites.")
+    manifest = build()
+    print(f"✅ {len(manifest)} asset(s) dans {STATIC_DIR / BUILD_DIRNAME}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Serveur de cache minimal compatible Redis, pour le développement local.
+
+Implémente le sous-ensemble du protocole RESP utilisé par `app.cache`
+(PING, GET, SET EX/PX, DEL, INCR, PEXPIRE, PUBLISH, SUBSCRIBE, FLUSHDB) afin de tester
+plusieurs instances de l'application partageant un même cache sans installer
+Redis. En production, pointer `CACHE_URL` vers un vrai serveur Redis.
+
+Usage :
+    python scripts/cache_server.py --port 6380
+    CACHE_URL=redis://localhost:6380/0 uvicorn app.main:app --port 8001
+    CACHE_URL=redis://localhost:6380/0 uvicorn app.main:app --port 8002
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+
+Store = Dict[bytes, Tuple[float, bytes]]
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _array(items: List[bytes]) -> bytes:
+    return b"*%d\r\n" % len(items) + b"".join(_bulk(item) for item in items)
+
+
+class CacheServer:
+    def __init__(self) -> None:
+        self.store: Store = {}
+        self.channels: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+        if entry[0] and entry[0] < time.monotonic():
+            del self.store[key]
+            return None
+        return entry[1]
+
+    def execute(self, args: List[bytes], writer: asyncio.StreamWriter) -> bytes:
+        command = args[0].upper()
+        if command == b"PING":
+            return b"+PONG\r\n"
+        if command in (b"SELECT", b"AUTH"):
+            return b"+OK\r\n"
+        if command == b"GET":
+            return _bulk(self._get(args[1]))
+        if command == b"SET":
+            expires_at = 0.0
+            if len(args) >= 5 and args[3].upper() in (b"EX", b"PX"):
+                seconds = int(args[4]) / (1000 if args[3].upper() == b"PX" else 1)
+                expires_at = time.monotonic() + seconds
+            self.store[args[1]] = (expires_at, args[2])
+            return b"+OK\r\n"
+        if command == b"DEL":
+            removed = sum(1 for key in args[1:] if self.store.pop(key, None) is not None)
+            return b":%d\r\n" % removed
+        if command == b"INCR":
+            value = int(self._get(args[1]) or b"0") + 1
+            expires_at = self.store[args[1]][0] if value > 1 else 0.0
+            self.store[args[1]] = (expires_at, str(value).encode())
+            return b":%d\r\n" % value
+        if command == b"PEXPIRE":
+            value = self._get(args[1])
+            if value is None:
+                return b":0\r\n"
+            self.store[args[1]] = (time.monotonic() + int(args[2]) / 1000, value)
+            return b":1\r\n"
+        if command == b"FLUSHDB":
+            self.store.clear()
+            return b"+OK\r\n"
+        if command == b"PUBLISH":
+            subscribers = self.channels.get(args[1], set())
+            for subscriber in list(subscribers):
+                subscriber.write(_array([b"message", args[1], args[2]]))
+            return b":%d\r\n" % len(subscribers)
+        if command == b"SUBSCRIBE":
+            replies = []
+            for channel in args[1:]:
+                self.channels.setdefault(channel, set()).add(writer)
+                replies.append(b"*3\r\n" + _bulk(b"subscribe") + _bulk(channel) + b":1\r\n")
+            return b"".join(replies)
+        return b"-ERR unknown command '%s'\r\n" % command
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                if not header.startswith(b"*"):
+                    # Commande « inline » (telnet, redis-cli ping…)
+                    args = header.split()
+                else:
+                    args = []
+                    for _ in range(int(header[1:])):
+                        length = int((await reader.readline())[1:])
+                        args.append((await reader.readexactly(length + 2))[:-2])
+                if args:
+                    writer.write(self.execute(args, writer))
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for subscribers in self.channels.values():
+                subscribers.discard(writer)
+            writer.close()
+
+
+async def _serve(host: str, port: int) -> None:
+    server = await asyncio.start_server(CacheServer().handle, host, port)
+    print(f"Serveur de cache à l'écoute sur {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serveur de cache local compatible Redis")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Export en flux des avis, watchlists ou du catalogue (CSV / NDJSON).
+
+Usage :
+    python scripts/export_data.py reviews --format ndjson --gzip -o reviews.ndjson.gz
+    python scripts/export_data.py films -o catalogue.csv
+    python scripts/export_data.py watchlist --email test@gmail.com
+
+Sans `--email`, les avis et watchlists de tous les utilisateurs sont exportés.
+Sans `-o`, le résultat est écrit sur la sortie standard.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from sqlmodel import Session, select
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from app.database import engine
+from app.models import User
+from app.services.exports import DATASETS, FORMATS, export_stream
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Exporter des données en CSV ou NDJSON")
+    parser.add_argument("dataset", choices=DATASETS, help="Jeu de données à exporter")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv", help="Format de sortie")
+    parser.add_argument("--email", help="Limiter l'export aux données d'un utilisateur")
+    parser.add_argument("--gzip", action="store_true", help="Compresser la sortie à la volée")
+    parser.add_argument("-o", "--output", help="Fichier de sortie (défaut : sortie standard)")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        user_id = None
+        if args.email:
+            user = session.exec(select(User).where(User.email == args.email.lower().strip())).first()
+            if not user:
+                print(f"❌ Utilisateur introuvable : {args.email}", file=sys.stderr)
+                sys.exit(1)
+            user_id = user.id
+
+        stream = export_stream(
+            session, args.dataset, args.format, user_id=user_id, compress=args.gzip
+        )
+        out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            written = 0
+            for chunk in stream:
+                out.write(chunk)
+                written += len(chunk)
+        finally:
+            if args.output:
+                out.close()
+
+    if args.output:
+        print(f"✅ {written} octets écrits dans {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ sys.path.append(str(ROOT_DIR))
 from app.config import get_settings
 from app.database import engine, init_db
 from app.models import Film, Tag
+from app.services.aggregates import primary_genre
+from app.services.catalogue import invalidate_catalogue
 
 
 SOURCES = {
@@ -112,6 +114,7 @@ def import_all_movies() -> int:
                     runtime_minutes=runtime_minutes,
                 )
                 film.tags = tags
+                film.primary_genre = primary_genre(tag.name for tag in tags)
                 session.add(film)
                 inserted += 1
                 category_inserted += 1
@@ -119,6 +122,7 @@ def import_all_movies() -> int:
             print(f"  ✅ {category_inserted} films ajoutés")
         
         session.commit()
+    invalidate_catalogue()
     
     return inserted, skipped
 
@@ -16,6 +16,8 @@ sys.path.append(str(ROOT_DIR))
 
 from app.database import engine, init_db
 from app.models import Film, Tag
+from app.services.aggregates import primary_genre
+from app.services.catalogue import invalidate_catalogue
 
 
 # Clé API TMDb (à définir en variable d'environnement ou directement ici)
@@ -147,6 +149,7 @@ def import_movie(session: Session, movie_data: dict, genres_map: dict, api_key:
         runtime_minutes=details.get("runtime"),
     )
     film.tags = tags
+    film.primary_genre = primary_genre(tag.name for tag in tags)
     session.add(film)
     return True
 
@@ -209,6 +212,7 @@ def main() -> None:
                 print(f"   ❌ {title}: {e}")
         
         session.commit()
+    invalidate_catalogue()
     
     print(f"\n{'='*40}")
     print(f"✅ {inserted} films importés")
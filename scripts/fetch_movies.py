@@ -16,6 +16,8 @@ sys.path.append(str(ROOT_DIR))
 from app.config import get_settings
 from app.database import engine, init_db
 from app.models import Film, Tag
+from app.services.aggregates import primary_genre
+from app.services.catalogue import invalidate_catalogue
 
 
 SOURCES = {
@@ -94,9 +96,11 @@ def import_movies(limit: int) -> int:
                     runtime_minutes=runtime_minutes,
                 )
                 film.tags = tags
+                film.primary_genre = primary_genre(tag.name for tag in tags)
                 session.add(film)
                 inserted += 1
         session.commit()
+    invalidate_catalogue()
     return inserted
 
 
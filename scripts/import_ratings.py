@@ -0,0 +1,50 @@
+"""Import en masse de notes depuis un CSV (export Letterboxd `ratings.csv`).
+
+Usage :
+    python scripts/import_ratings.py --email test@gmail.com --file ratings.csv
+
+Affiche le nombre de lignes rapprochées du catalogue et la liste des titres
+introuvables.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from sqlmodel import Session, select
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from app.database import engine, init_db
+from app.models import User
+from app.services.imports import import_ratings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importer des notes depuis un CSV")
+    parser.add_argument("--email", required=True, help="Email de l'utilisateur destinataire")
+    parser.add_argument("--file", required=True, help="Chemin du fichier CSV")
+    args = parser.parse_args()
+
+    init_db()
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.email == args.email.lower().strip())).first()
+        if not user:
+            print(f"❌ Utilisateur introuvable : {args.email}")
+            sys.exit(1)
+        with open(args.file, encoding="utf-8-sig", newline="") as stream:
+            report = import_ratings(session, user.id, stream)
+
+    print(f"✅ {report.matched} notes importées")
+    print(f"🗑️  {report.removed_from_watchlist} films retirés de la watchlist")
+    print(f"⏭️  {report.skipped} lignes ignorées (sans titre ou sans note)")
+    print(f"❓ {report.unmatched} lignes sans correspondance dans le catalogue")
+    for title, year in report.unmatched_rows:
+        print(f"   - {title}" + (f" ({year})" if year else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Applique les migrations de schéma (ou affiche celles en attente).
+
+À lancer une fois par déploiement (job ou initContainer Kubernetes) avec
+`MIGRATE_ON_STARTUP=false` sur les pods : ils démarrent alors sans toucher au
+schéma. Plusieurs exécutions simultanées sont sans danger (verrou consultatif).
+
+Usage :
+    python scripts/migrate.py
+    python scripts/migrate.py --status
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from app.database import get_engine
+from app.migrations import pending_migrations, run_migrations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrations de schéma")
+    parser.add_argument("--status", action="store_true", help="Affiche les migrations en attente sans les appliquer")
+    args = parser.parse_args()
+
+    if args.status:
+        pending = pending_migrations(get_engine())
+        for item in pending:
+            print(f"- {item.version} : {item.description}")
+        print(f"{len(pending)} migration(s) en attente.")
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    applied = run_migrations(get_engine())
+    print(f"{len(applied)} migration(s) appliquée(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Remplit une base vierge avec un jeu de données synthétique réaliste.
+
+Films, tags, utilisateurs, avis et watchlists suivent des lois de Zipf (voir
+`benchmarks/dataset.py`) et sont insérés en masse (`executemany` sous SQLite,
+`COPY` sous PostgreSQL). Aucun accès réseau n'est nécessaire. Les comptes
+créés sont `seed{n}@example.com`, tous avec le même mot de passe.
+
+Usage :
+    python scripts/seed_data.py --films 100000 --users 50000 --reviews 5000000 --watchlist 1000000
+    DATABASE_URL=sqlite:////tmp/lvn-big.db python scripts/seed_data.py --password secret
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from app.database import get_engine, init_db
+from benchmarks.dataset import BENCH_PASSWORD, DatasetSize, seed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Génère un jeu de données synthétique")
+    parser.add_argument("--films", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--reviews", type=int, default=200_000)
+    parser.add_argument("--watchlist", type=int, default=50_000, help="Entrées de watchlist au total")
+    parser.add_argument("--zipf", type=float, default=1.0, help="Exposant de la loi de Zipf (concentration)")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du générateur")
+    parser.add_argument("--password", default=BENCH_PASSWORD, help="Mot de passe commun des comptes")
+    args = parser.parse_args()
+
+    init_db()
+    try:
+        report = seed(
+            get_engine(),
+            DatasetSize(args.films, args.users, args.reviews, args.watchlist),
+            seed_value=args.seed,
+            zipf_s=args.zipf,
+            password=args.password,
+        )
+    except RuntimeError as exc:
+        sys.exit(f"❌ {exc}")
+    print(
+        f"✅ {report.films} films, {report.tags} tags, {report.users} utilisateurs, "
+        f"{report.reviews} avis, {report.watchlist} entrées de watchlist"
+    )
+    print(f"   {report.rows} lignes en {report.seconds:.1f}s ({report.rows / report.seconds:,.0f} lignes/s)")
+
+
+if __name__ == "__main__":
+    main()
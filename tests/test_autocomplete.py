@@ -0,0 +1,84 @@
+"""Index des titres : construction et mises à jour en tâche de fond."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from sqlmodel import Session, select
+
+from app.database import get_engine
+from app.migrations import run_migrations
+from app.models import Film
+from app.services import autocomplete
+from app.services.autocomplete import TitleIndex, autocomplete_titles, sync_title_index
+from app.services.catalogue import invalidate_catalogue
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "index des titres jamais synchronisé"
+        time.sleep(0.01)
+
+
+def _add_film(title: str) -> None:
+    with Session(get_engine()) as session:
+        session.add(Film(title=title, release_year=1999))
+        session.commit()
+
+
+def test_index_is_built_and_updated_in_background(monkeypatch) -> None:
+    run_migrations(get_engine())
+    _add_film("Matrix")
+    index = TitleIndex()
+    release = threading.Event()
+    read_rows = autocomplete._rows
+    monkeypatch.setattr(autocomplete, "_rows", lambda *args: release.wait(5) and read_rows(*args))
+
+    # Pas encore chargé : la recherche répond sans attendre la construction
+    assert autocomplete_titles("matr", index=index) == []
+    release.set()
+    _wait_for(lambda: index.loaded)
+    assert [s.title for s in autocomplete_titles("matr", index=index)] == ["Matrix"]
+
+    _add_film("Matrix Reloaded")
+    invalidate_catalogue()
+    autocomplete_titles("matr", index=index)
+    _wait_for(lambda: len(index) == 2)
+    assert {s.title for s in autocomplete_titles("matr", index=index)} == {"Matrix", "Matrix Reloaded"}
+
+
+
+def test_warm_up_starts_a_single_sync(monkeypatch) -> None:
+    release = threading.Event()
+    calls = []
+
+    def slow_sync(index):
+        calls.append(index)
+        release.wait(5)
+
+    monkeypatch.setattr(autocomplete, "sync_title_index", slow_sync)
+    index = TitleIndex()
+    # Frappes pendant la construction : une seule synchronisation lancée
+    for _ in range(20):
+        assert autocomplete_titles("gho", index=index) == []
+    release.set()
+    _wait_for(lambda: not index.warming)
+    assert len(calls) == 1
+
+
+def test_periodic_rebuild_refreshes_titles(monkeypatch) -> None:
+    run_migrations(get_engine())
+    _add_film("Ghost Dog")
+    index = sync_title_index(TitleIndex())
+    with Session(get_engine()) as session:
+        film = session.exec(select(Film).where(Film.title == "Ghost Dog")).one()
+        film.title = "Ghost Dog: la voie du samouraï"
+        session.commit()
+
+    # Pas d'import : sans reconstruction, l'index garde l'ancien titre
+    assert [s.title for s in sync_title_index(index).search("ghost")] == ["Ghost Dog"]
+    monkeypatch.setattr(autocomplete.settings, "title_index_refresh_seconds", 0.01)
+    time.sleep(0.02)
+    assert [s.title for s in sync_title_index(index).search("ghost")] == ["Ghost Dog: la voie du samouraï"]
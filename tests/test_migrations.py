@@ -0,0 +1,60 @@
+"""Migrations : une base migrée a le schéma des modèles, qu'elle soit neuve ou ancienne."""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlmodel import SQLModel
+
+from app import models  # noqa: F401  (enregistre les tables dans SQLModel.metadata)
+from app.migrations import MIGRATIONS, run_migrations
+
+# Base livrée avec le dépôt, créée avant l'introduction des migrations
+LEGACY_DATABASE = Path(__file__).resolve().parents[1] / "data" / "app.db"
+
+
+def _schema(engine):
+    inspector = inspect(engine)
+    return {
+        table: (
+            {column["name"] for column in inspector.get_columns(table)},
+            {
+                (index["name"], tuple(index["column_names"]), bool(index["unique"]))
+                for index in inspector.get_indexes(table)
+            },
+        )
+        for table in inspector.get_table_names()
+        if table != "schema_migrations"
+    }
+
+
+def _model_schema():
+    return {
+        table.name: (
+            {column.name for column in table.columns},
+            {
+                (index.name, tuple(column.name for column in index.columns), bool(index.unique))
+                for index in table.indexes
+            },
+        )
+        for table in SQLModel.metadata.sorted_tables
+    }
+
+
+@pytest.mark.parametrize("source", ["neuve", "ancienne"])
+def test_migrated_schema_matches_models(tmp_path, source: str) -> None:
+    path = tmp_path / "app.db"
+    if source == "ancienne":
+        if not LEGACY_DATABASE.exists():
+            pytest.skip("data/app.db absente")
+        shutil.copy(LEGACY_DATABASE, path)
+    engine = create_engine(f"sqlite:///{path}")
+
+    assert run_migrations(engine) == [m.version for m in MIGRATIONS]
+    # Un écart ici : un modèle a changé sans migration qui l'accompagne
+    assert _schema(engine) == _model_schema()
+    assert run_migrations(engine) == []
+    engine.dispose()
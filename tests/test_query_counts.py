@@ -0,0 +1,77 @@
+"""Nombre de requêtes SQL des pages principales, pour un utilisateur connecté.
+
+Le jeu de données donne plusieurs lignes à chaque relation (tags par film,
+avis par film, films de la watchlist) : un chargement paresseux dans une
+boucle (N+1) dépasse aussitôt le plafond. Les requêtes sont mesurées après
+une première visite, cache applicatif chaud, comme en régime établi.
+"""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.database import get_engine
+from app.main import app
+from app.models import Film, FilmTagLink, Review, Tag, User, WatchlistItem
+from app.security import hash_password
+from app.services.autocomplete import title_index
+from app.utils.queries import assert_max_queries
+
+FILMS = 30
+PASSWORD = "counts-password"
+
+
+def _seed() -> int:
+    with Session(get_engine()) as session:
+        tags = [Tag(name=f"Compte {index}") for index in range(3)]
+        films = [Film(title=f"Film compté {index:02d}", release_year=1990 + index) for index in range(FILMS)]
+        users = [
+            User(username=f"counts-{index}", email=f"counts-{index}@example.com", hashed_password=hash_password(PASSWORD))
+            for index in range(4)
+        ]
+        session.add_all([*tags, *films, *users])
+        session.flush()
+        session.add_all(FilmTagLink(film_id=film.id, tag_id=tag.id) for film in films for tag in tags)
+        session.add_all(
+            Review(user_id=user.id, film_id=film.id, rating=1 + (film.id + user.id) % 5, comment="Vu.")
+            for film in films[:10]
+            for user in users
+        )
+        session.add_all(WatchlistItem(user_id=users[0].id, film_id=film.id) for film in films[10:20])
+        session.commit()
+        return films[0].id
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        film_id = _seed()
+        client.post("/login", data={"email": "counts-0@example.com", "password": PASSWORD})
+        # L'index d'autocomplétion se construit en tâche de fond au démarrage
+        deadline = time.monotonic() + 5
+        while not title_index.loaded and time.monotonic() < deadline:
+            time.sleep(0.01)
+        client.film_id = film_id
+        yield client
+
+
+@pytest.mark.parametrize(
+    "path, max_queries",
+    [
+        ("/films", 2),
+        ("/films?tags=Compte+1", 2),
+        ("/films/{film_id}", 6),
+        ("/watchlist", 3),
+        ("/profil", 8),
+    ],
+)
+def test_page_query_count(client: TestClient, path: str, max_queries: int) -> None:
+    url = path.format(film_id=client.film_id)
+    assert client.get(url).status_code == 200
+    with assert_max_queries(max_queries):
+        response = client.get(url)
+    assert response.status_code == 200
@@ -0,0 +1,343 @@
+"""Plans d'exécution des requêtes fréquentes : aucun parcours complet de table.
+
+Chaque cas appelle le vrai code des routes et services (constructeurs de
+requêtes, fonctions de lecture, handlers de l'API) dans une transaction
+annulée à la fin, enregistre les instructions SQL qu'il exécute, puis les
+passe à `EXPLAIN` avec leurs paramètres :
+
+- SQLite (`EXPLAIN QUERY PLAN`) : tout `SCAN <table>` est un échec, y compris
+  `SCAN <table> USING [COVERING] INDEX …` (l'index entier est parcouru) ;
+- PostgreSQL (`EXPLAIN (FORMAT JSON)`, `enable_seqscan = off` pour que le
+  planificateur prenne un index s'il en existe un, même sur une petite base) :
+  `Seq Scan`, ou parcours d'index sans condition d'index.
+
+Seules les tables de `full_scan_ok` peuvent être parcourues en entier, quand
+la requête lit réellement toute la table. La recherche plein texte (`ILIKE
+'%…%'`) n'est pas couverte : aucun index B-tree ne peut la servir.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, FrozenSet, List, Optional, Tuple
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+from app.database import get_engine
+from app.migrations import run_migrations
+from app.models import Film, FilmTagLink, Review, Tag, User, WatchlistItem
+from app.routers import api, films
+from app.security import hash_password
+from app.services.aggregates import apply_review_ratings
+from app.services.imports import RatingRow, match_films
+from app.services.reviews import ReviewInput, upsert_reviews
+from app.services.stats import get_user_stats
+from app.services.users import find_user_by_email
+from app.services.watchlist import (
+    add_to_watchlist,
+    count_watchlist,
+    fetch_watchlist,
+    fetch_watchlist_ids,
+    fetch_watchlist_page,
+    remove_from_watchlist,
+)
+from app.sessions import DatabaseSessionStore
+from app.utils.pagination import encode_cursor
+
+
+@dataclass
+class Catalogue:
+    """Quelques lignes de chaque table : de quoi exécuter toutes les branches."""
+
+    user: User
+    film_id: int
+    cursor_date: datetime
+
+
+@dataclass(frozen=True)
+class HotPath:
+    name: str
+    run: Callable[[Session, Catalogue], object]
+    # Tables dont le parcours complet est attendu (toute la table est lue)
+    full_scan_ok: FrozenSet[str] = field(default_factory=frozenset)
+
+
+def _sessions_roundtrip(session: Session, data: Catalogue) -> None:
+    # Connexion du test : les écritures restent dans sa transaction
+    store = DatabaseSessionStore(session.connection())
+    store.purge_every = 1
+    store.save("test-plan", {"user_id": data.user.id}, 60)
+    store.load("test-plan")
+    store.delete("test-plan")
+
+
+HOT_PATHS = [
+    HotPath(
+        "catalogue trié par titre (/films)",
+        lambda session, data: session.exec(films._card_statement(None, [])).all(),
+        # Le catalogue entier est rendu : parcours de l'index des titres, sans tri
+        full_scan_ok=frozenset({"film"}),
+    ),
+    HotPath(
+        "catalogue filtré par tags (/films?tags=…)",
+        lambda session, data: session.exec(films._card_statement(None, ["Drame", "Comédie"])).all(),
+    ),
+    HotPath(
+        "avis d'un film (/films/{id})",
+        lambda session, data: films._reviews_page(session, data.film_id, None),
+    ),
+    HotPath(
+        "avis d'un film, page suivante (/films/{id}/reviews)",
+        lambda session, data: films._reviews_page(session, data.film_id, (data.cursor_date, 10**9)),
+    ),
+    HotPath(
+        "watchlist de l'utilisateur (en-tête, /films)",
+        lambda session, data: fetch_watchlist(session, data.user),
+    ),
+    HotPath(
+        "films de la watchlist (cartes du catalogue)",
+        lambda session, data: fetch_watchlist_ids(session, data.user),
+    ),
+    HotPath(
+        "taille de la watchlist",
+        lambda session, data: count_watchlist(session, data.user),
+    ),
+    *(
+        HotPath(
+            f"page de watchlist triée par {sort} (/watchlist)",
+            lambda session, data, sort=sort: fetch_watchlist_page(session, data.user, sort_by=sort),
+        )
+        for sort in ("date", "title", "year", "genre")
+    ),
+    HotPath(
+        "ajout et retrait de la watchlist",
+        lambda session, data: (
+            add_to_watchlist(session, data.user.id, [data.film_id]),
+            remove_from_watchlist(session, data.user.id, [data.film_id]),
+        ),
+    ),
+    HotPath(
+        "avis et agrégats (submit_review, /films/reviews/batch)",
+        lambda session, data: upsert_reviews(session, data.user.id, [ReviewInput(data.film_id, 4, "Revu.")]),
+    ),
+    HotPath(
+        "ajustement des agrégats (apply_review_ratings)",
+        lambda session, data: apply_review_ratings(session, data.user.id, {data.film_id: 3}),
+    ),
+    HotPath(
+        "statistiques du profil (get_user_stats)",
+        lambda session, data: get_user_stats(session, data.user),
+        # Quelques dizaines de tags : la jointure part de chacun d'eux
+        full_scan_ok=frozenset({"tag"}),
+    ),
+    HotPath(
+        "utilisateur par email (connexion)",
+        lambda session, data: find_user_by_email(session, "plans@example.com"),
+    ),
+    HotPath(
+        "rapprochement par titre (imports CSV)",
+        lambda session, data: match_films(session, [RatingRow("Alien", 1979, 4)]),
+    ),
+    HotPath(
+        "sessions en base (lecture, écriture, purge)",
+        _sessions_roundtrip,
+    ),
+    HotPath(
+        "API /films",
+        lambda session, data: api.api_list_films(
+            q=None, tags=[], fields=None, limit=25, cursor=None, session=session
+        ),
+        # Première page : lecture de l'index des titres dans l'ordre, arrêtée par LIMIT
+        full_scan_ok=frozenset({"film"}),
+    ),
+    HotPath(
+        "API /films, page suivante",
+        lambda session, data: api.api_list_films(
+            q=None, tags=[], fields=None, limit=25, cursor=encode_cursor(["M", 1]), session=session
+        ),
+    ),
+    HotPath(
+        "API /films filtrée par tags",
+        lambda session, data: api.api_list_films(
+            q=None, tags=["Drame"], fields=None, limit=25, cursor=encode_cursor(["M", 1]), session=session
+        ),
+    ),
+    HotPath(
+        "API /films/{id}",
+        lambda session, data: api.api_film_detail(film_id=data.film_id, fields=None, session=session),
+    ),
+    HotPath(
+        "API /films/{id}/reviews",
+        lambda session, data: api.api_film_reviews(
+            film_id=data.film_id,
+            fields=None,
+            limit=25,
+            cursor=encode_cursor([data.cursor_date, 10**9]),
+            session=session,
+        ),
+    ),
+    HotPath(
+        "API /me/reviews",
+        lambda session, data: api.api_my_reviews(
+            fields=None,
+            limit=25,
+            cursor=encode_cursor([data.cursor_date, 10**9]),
+            session=session,
+            current_user=data.user,
+        ),
+    ),
+    HotPath(
+        "API /me/watchlist",
+        lambda session, data: api.api_my_watchlist(
+            fields=None,
+            limit=25,
+            cursor=encode_cursor([data.cursor_date, 10**9]),
+            session=session,
+            current_user=data.user,
+        ),
+    ),
+]
+
+
+def _seed(session: Session) -> Catalogue:
+    user = User(username="plans", email="plans@example.com", hashed_password=hash_password("plans-password"))
+    other = User(username="plans-2", email="plans-2@example.com", hashed_password=user.hashed_password)
+    drama, comedy = Tag(name="Drame"), Tag(name="Comédie")
+    catalogue = [
+        Film(title="Alien", release_year=1979, primary_genre="Drame"),
+        Film(title="Metropolis", release_year=1927, primary_genre="Comédie"),
+        Film(title="Zodiac", release_year=2007),
+    ]
+    session.add_all([user, other, drama, comedy, *catalogue])
+    session.flush()
+    now = datetime.utcnow()
+    session.add_all(
+        [
+            FilmTagLink(film_id=catalogue[0].id, tag_id=drama.id),
+            FilmTagLink(film_id=catalogue[1].id, tag_id=comedy.id),
+            Review(user_id=user.id, film_id=catalogue[0].id, rating=5, created_at=now - timedelta(days=2)),
+            Review(user_id=other.id, film_id=catalogue[0].id, rating=3, created_at=now - timedelta(days=1)),
+            WatchlistItem(user_id=user.id, film_id=catalogue[1].id),
+            WatchlistItem(user_id=user.id, film_id=catalogue[2].id),
+        ]
+    )
+    session.flush()
+    return Catalogue(user=user, film_id=catalogue[0].id, cursor_date=now + timedelta(days=1))
+
+
+def _sqlite_full_scans(conn, sql: str, params) -> Tuple[List[str], List[str]]:
+    plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).all()]
+    scans = []
+    for detail in plan:
+        # « SCAN film » comme « SCAN film USING COVERING INDEX … » : toute la table
+        # ou tout l'index est lu ; « SEARCH … » : seule une plage l'est
+        match = re.match(r"SCAN (\w+)", detail)
+        if match and not detail.startswith("SCAN CONSTANT ROW"):
+            scans.append(match.group(1))
+    return scans, plan
+
+
+def _postgres_full_scans(conn, sql: str, params) -> Tuple[List[str], List[str]]:
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    document = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}", params).scalar()
+    scans: List[str] = []
+    plan: List[str] = []
+
+    def walk(node: dict, depth: int) -> None:
+        relation = node.get("Relation Name")
+        plan.append("  " * depth + node["Node Type"] + (f" on {relation}" if relation else ""))
+        full_index = node["Node Type"] in ("Index Scan", "Index Only Scan") and "Index Cond" not in node
+        if node["Node Type"] == "Seq Scan" or full_index:
+            scans.append(relation)
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(document[0]["Plan"], 0)
+    return scans, plan
+
+
+class PlanDatabase:
+    """Base migrée et remplie dans une transaction, annulée en fin de module."""
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.explain = _postgres_full_scans if engine.dialect.name == "postgresql" else _sqlite_full_scans
+        run_migrations(engine)
+        self.conn = engine.connect()
+        self.transaction = self.conn.begin()
+        with self._session() as session:
+            self.data = _seed(session)
+            session.commit()
+
+    def _session(self) -> Session:
+        # Les commits et rollbacks du code testé ne touchent qu'un savepoint :
+        # la transaction de la connexion reste ouverte jusqu'à `close`
+        return Session(bind=self.conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+
+    def capture(self, run: Callable[[Session, Catalogue], object]) -> List[Tuple[str, object]]:
+        """Instructions SQL (et paramètres) exécutées par `run`, sur n'importe quelle connexion."""
+        statements: List[Tuple[str, object]] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany) -> None:
+            if statement.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")):
+                statements.append((statement, parameters[0] if executemany else parameters))
+
+        event.listen(self.engine, "before_cursor_execute", record)
+        try:
+            with self._session() as session:
+                run(session, self.data)
+                session.flush()
+                session.rollback()
+        finally:
+            event.remove(self.engine, "before_cursor_execute", record)
+        return statements
+
+    def close(self) -> None:
+        self.transaction.rollback()
+        self.conn.close()
+
+
+def _postgres_engine() -> Optional[Engine]:
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        return None
+    engine = create_engine(url)
+    try:
+        engine.connect().close()
+    except OperationalError:
+        engine.dispose()
+        return None
+    return engine
+
+
+@pytest.fixture(scope="module", params=["sqlite", "postgresql"])
+def plan_db(request):
+    if request.param == "sqlite":
+        engine = get_engine()
+    else:
+        engine = _postgres_engine()
+        if engine is None:
+            pytest.skip("TEST_POSTGRES_URL absent ou serveur PostgreSQL injoignable")
+    database = PlanDatabase(engine)
+    yield database
+    database.close()
+
+
+@pytest.mark.parametrize("path", HOT_PATHS, ids=lambda path: path.name)
+def test_hot_path_uses_indexes(plan_db: PlanDatabase, path: HotPath) -> None:
+    statements = plan_db.capture(path.run)
+    assert statements, "aucune requête SQL exécutée : le cas ne teste plus rien"
+    failures = []
+    for sql, params in statements:
+        scans, plan = plan_db.explain(plan_db.conn, sql, params)
+        unexpected = [table for table in scans if table not in path.full_scan_ok]
+        if unexpected:
+            failures.append(f"parcours complet de {', '.join(unexpected)} :\n{sql}\n    " + "\n    ".join(plan))
+    assert not failures, "\n\n".join(failures)
@@ -0,0 +1,60 @@
+"""Retour sur le primaire après une écriture : seulement quand un commit a écrit."""
+
+from __future__ import annotations
+
+import pytest
+from sqlmodel import select
+from starlette.requests import Request
+
+from app import database
+from app.database import PRIMARY_UNTIL_KEY, get_engine, get_session
+from app.migrations import run_migrations
+from app.models import Tag
+from app.sessions import SessionData
+
+
+@pytest.fixture(autouse=True)
+def replica(monkeypatch):
+    run_migrations(get_engine())
+    # Le primaire sert aussi de réplica : seul l'aiguillage est testé ici
+    monkeypatch.setattr(database, "_replicas", [get_engine()])
+
+
+def _request(method: str) -> Request:
+    return Request({"type": "http", "method": method, "headers": [], "session": SessionData()})
+
+
+def _run(request: Request, handler) -> SessionData:
+    dependency = get_session(request)
+    session = next(dependency)
+    try:
+        handler(session)
+    finally:
+        dependency.close()
+    return request.scope["session"]
+
+
+def test_commit_with_writes_sticks_to_primary() -> None:
+    def handler(session):
+        tag = Tag(name="Réplication")
+        session.add(tag)
+        session.commit()
+        session.delete(tag)
+        session.commit()
+
+    data = _run(_request("POST"), handler)
+    assert PRIMARY_UNTIL_KEY in data and data.modified
+
+
+@pytest.mark.parametrize(
+    "handler",
+    [
+        lambda session: None,
+        lambda session: session.exec(select(Tag)).all(),
+        lambda session: (session.add(Tag(name="Annulé")), session.flush(), session.rollback(), session.commit()),
+    ],
+    ids=["sans requête", "lecture seule", "écriture annulée"],
+)
+def test_post_without_committed_write_leaves_session_untouched(handler) -> None:
+    data = _run(_request("POST"), handler)
+    assert PRIMARY_UNTIL_KEY not in data and not data.modified
@@ -0,0 +1,65 @@
+"""Régénération de l'identifiant de session à la connexion et à la déconnexion."""
+
+from __future__ import annotations
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.database import get_engine
+from app.migrations import run_migrations
+from app.sessions import ServerSessionMiddleware
+
+
+async def visit(request):
+    request.session["visits"] = request.session.get("visits", 0) + 1
+    return PlainTextResponse(str(request.session.get("user_id")))
+
+
+async def login(request):
+    request.session.regenerate()
+    request.session["user_id"] = 1
+    return PlainTextResponse("1")
+
+
+async def logout(request):
+    request.session.regenerate()
+    request.session.pop("user_id", None)
+    return PlainTextResponse("")
+
+
+@pytest.fixture(params=["memory", "database"])
+def client(request):
+    if request.param == "database":
+        run_migrations(get_engine())
+    app = Starlette(
+        routes=[Route("/", visit), Route("/login", login), Route("/logout", logout)]
+    )
+    app.add_middleware(ServerSessionMiddleware, secret_key="test", backend=request.param)
+    return TestClient(app)
+
+
+def test_login_issues_new_session_id(client: TestClient) -> None:
+    client.get("/")
+    planted = client.cookies["session"]
+
+    client.get("/login")
+    assert client.cookies["session"] != planted
+
+    # L'identifiant d'avant la connexion ne mène plus à aucune session
+    client.cookies.set("session", planted)
+    assert client.get("/").text == "None"
+
+
+def test_logout_discards_authenticated_session(client: TestClient) -> None:
+    client.get("/login")
+    authenticated = client.cookies["session"]
+
+    client.get("/logout")
+    # Session vide : le cookie est effacé, ou remplacé s'il reste un message flash
+    assert client.cookies.get("session") != authenticated
+
+    client.cookies.set("session", authenticated)
+    assert client.get("/").text == "None"